@@ -0,0 +1,299 @@
+"""
+Artımlı özet tabloları
+Hareket geçmişinden bir kez kurulur, sonra her kayıtta O(1) güncellenir;
+okumalar geçmişi yeniden taramaz.
+"""
+import heapq
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+GIRIS = "Giriş"
+
+
+class MonthlyAggregates:
+    """Ay x işlem tipi özet tablosu: giriş / çıkış miktarı ve harcama (giriş x birim fiyat)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.built = False
+        self._months: Dict[str, list] = {}  # "YYYY-MM" -> [giris, cikis, harcama]
+
+    def __len__(self):
+        return len(self._months)
+
+    @staticmethod
+    def _apply(months: Dict[str, list], tarih, islem_tipi: str, miktar: int, birim_fiyat: float):
+        month = str(tarih)[:7] if tarih else ""
+        if len(month) < 7:
+            return
+        bucket = months.get(month)
+        if bucket is None:
+            bucket = months[month] = [0, 0, 0.0]
+        if islem_tipi == GIRIS:
+            bucket[0] += miktar
+            bucket[2] += miktar * birim_fiyat
+        else:
+            bucket[1] += miktar
+
+    def rebuild(self, movements: Iterable[Tuple], prices: Dict[str, float]):
+        """(tarih, malzeme_kodu, islem_tipi, miktar) satırlarından yeniden kur
+
+        Geçmişte birim fiyat tutulmadığı için harcama güncel birim fiyatla hesaplanır.
+        """
+        months: Dict[str, list] = {}
+        for tarih, kod, islem_tipi, miktar in movements:
+            self._apply(months, tarih, islem_tipi, miktar or 0, prices.get(kod, 0) or 0)
+        with self._lock:
+            self._months = months
+            self.built = True
+
+    def invalidate(self):
+        with self._lock:
+            self.built = False
+
+    def add(self, tarih, islem_tipi: str, miktar: int, birim_fiyat: float):
+        """Kaydedilen tek hareketi ilgili aya ekle"""
+        with self._lock:
+            if self.built:
+                self._apply(self._months, tarih, islem_tipi, miktar, birim_fiyat or 0)
+
+    def last(self, count: int = 12) -> List[dict]:
+        """Son count ay (eskiden yeniye)"""
+        with self._lock:
+            months = sorted(heapq.nlargest(count, self._months))
+            return [{
+                "ay": ay,
+                "giris": self._months[ay][0],
+                "cikis": self._months[ay][1],
+                "harcama": round(self._months[ay][2], 2),
+            } for ay in months]
+
+
+CUBE_DIMENSIONS = ("ay", "kategori", "departman", "tedarikci")
+UNSPECIFIED = "Belirtilmemiş"
+
+
+def parse_order_items(kalemler) -> List[Tuple[str, int, float]]:
+    """'kod:miktar:birim_fiyat;...' sipariş kalemleri -> [(kod, miktar, birim_fiyat)]"""
+    items = []
+    for item in str(kalemler or "").split(";"):
+        parts = item.split(":")
+        if len(parts) == 3:
+            try:
+                items.append((parts[0], int(parts[1]), float(parts[2])))
+            except ValueError:
+                continue
+    return items
+
+
+class SpendCube:
+    """Ay x kategori x departman x tedarikçi harcama küpü
+
+    Hücre ölçüleri: [satın alma tutarı, tüketim tutarı, kayıt sayısı].
+    - Satın alma: teslim edilen siparişlerin kalemleri (sipariş birim fiyatıyla) ve
+      sipariş numarası olmayan giriş hareketleri (malzemenin birim fiyatıyla).
+      Sipariş numaralı girişler siparişin teslimiyle zaten sayıldığından atlanır.
+    - Tüketim: çıkış hareketleri x birim fiyat; departman teslim alan birimdir.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.built = False
+        self._cells: Dict[Tuple[str, str, str, str], list] = {}
+
+    def __len__(self):
+        return len(self._cells)
+
+    @staticmethod
+    def _bump(cells, ay: str, kategori: str, departman: str, tedarikci: str,
+              satin_alma: float, tuketim: float, adet: int):
+        if len(ay) < 7:
+            return
+        key = (ay, kategori or UNSPECIFIED, departman or UNSPECIFIED, tedarikci or UNSPECIFIED)
+        cell = cells.get(key)
+        if cell is None:
+            cell = cells[key] = [0.0, 0.0, 0]
+        cell[0] += satin_alma
+        cell[1] += tuketim
+        cell[2] += adet
+        if cell[2] == 0:
+            del cells[key]  # teslim geri alındıysa boş hücre kalmasın
+
+    @classmethod
+    def _apply_movement(cls, cells, tarih, islem_tipi: str, miktar: int, teslim: str,
+                        siparis_no: str, kategori: str, birim_fiyat: float):
+        ay = str(tarih or "")[:7]
+        tutar = (miktar or 0) * (birim_fiyat or 0)
+        if islem_tipi == GIRIS:
+            if not siparis_no:
+                cls._bump(cells, ay, kategori, "", teslim, tutar, 0.0, 1)
+        else:
+            cls._bump(cells, ay, kategori, teslim, "", 0.0, tutar, 1)
+
+    @classmethod
+    def _apply_order(cls, cells, tarih, tedarikci: str, items: Iterable[Tuple[str, int, float]],
+                     categories: Dict[str, str], sign: int = 1):
+        ay = str(tarih or "")[:7]
+        for kod, miktar, birim_fiyat in items:
+            cls._bump(cells, ay, categories.get(kod, ""), "", tedarikci,
+                      sign * miktar * birim_fiyat, 0.0, sign)
+
+    def rebuild(self, movements: Iterable[Tuple], orders: Iterable[Tuple], materials: Dict[str, tuple]):
+        """Tek geçişte yeniden kur
+
+        movements: (tarih, malzeme_kodu, islem_tipi, miktar, teslim, siparis_no)
+        orders: teslim edilenler için (teslim tarihi, tedarikçi adı, kalemler)
+        materials: kod -> (kategori, birim_fiyat)
+        """
+        cells: Dict[Tuple[str, str, str, str], list] = {}
+        for tarih, kod, islem_tipi, miktar, teslim, siparis_no in movements:
+            kategori, birim_fiyat = materials.get(kod, ("", 0))
+            self._apply_movement(cells, tarih, islem_tipi, miktar, teslim, siparis_no, kategori, birim_fiyat)
+        categories = {kod: m[0] for kod, m in materials.items()}
+        for tarih, tedarikci, kalemler in orders:
+            self._apply_order(cells, tarih, tedarikci, parse_order_items(kalemler), categories)
+        with self._lock:
+            self._cells = cells
+            self.built = True
+
+    def invalidate(self):
+        with self._lock:
+            self.built = False
+
+    def add_movement(self, tarih, islem_tipi: str, miktar: int, teslim: str, siparis_no: str,
+                     kategori: str, birim_fiyat: float):
+        with self._lock:
+            if self.built:
+                self._apply_movement(self._cells, tarih, islem_tipi, miktar, teslim, siparis_no,
+                                     kategori, birim_fiyat)
+
+    def add_order(self, tarih, tedarikci: str, items: List[Tuple[str, int, float]],
+                  categories: Dict[str, str], sign: int = 1):
+        """Teslim edilen siparişi ekle (sign=-1: teslim durumu geri alındı)"""
+        with self._lock:
+            if self.built:
+                self._apply_order(self._cells, tarih, tedarikci, items, categories, sign)
+
+    def query(self, boyutlar: Iterable[str] = (), filtreler: Dict[str, str] = None,
+              ay_baslangic: str = None, ay_bitis: str = None) -> List[dict]:
+        """Dilimle (filtreler, ay aralığı) ve seçilen boyutlara topla (rollup)
+
+        Boyut verilmezse tek satırlık genel toplam döner. Sonuç satın alma tutarına göre azalan.
+        """
+        boyutlar = tuple(boyutlar)
+        indexes = [CUBE_DIMENSIONS.index(b) for b in boyutlar]
+        checks = [(CUBE_DIMENSIONS.index(b), v) for b, v in (filtreler or {}).items() if v]
+        groups: Dict[tuple, list] = {}
+        with self._lock:
+            for key, (satin_alma, tuketim, adet) in self._cells.items():
+                if ay_baslangic and key[0] < ay_baslangic:
+                    continue
+                if ay_bitis and key[0] > ay_bitis:
+                    continue
+                if any(key[i] != v for i, v in checks):
+                    continue
+                group_key = tuple(key[i] for i in indexes)
+                bucket = groups.get(group_key)
+                if bucket is None:
+                    bucket = groups[group_key] = [0.0, 0.0, 0]
+                bucket[0] += satin_alma
+                bucket[1] += tuketim
+                bucket[2] += adet
+        if not indexes and not groups:
+            groups[()] = [0.0, 0.0, 0]
+        rows = []
+        for group_key, (satin_alma, tuketim, adet) in groups.items():
+            row = dict(zip(boyutlar, group_key))
+            row.update(satin_alma=round(satin_alma, 2), tuketim=round(tuketim, 2), kayit_sayisi=adet)
+            rows.append(row)
+        rows.sort(key=lambda r: (-r["satin_alma"], -r["tuketim"]))
+        return rows
+
+
+def parse_datetime(value) -> Optional[datetime]:
+    """'2025-01-31 10:00' / '2025-01-31' / datetime -> datetime"""
+    try:
+        return datetime.fromisoformat(str(value)[:16]) if value else None
+    except ValueError:
+        return None
+
+
+class SupplierKPIs:
+    """Tedarikçi bazında sipariş göstergeleri
+
+    Kayıt: [sipariş sayısı, toplam tutar, son sipariş, teslim sayısı, teslim süresi toplamı (gün),
+    tahmini tarihi olan teslim sayısı, zamanında teslim sayısı]
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.built = False
+        self._suppliers: Dict[str, list] = {}
+
+    def __len__(self):
+        return len(self._suppliers)
+
+    def _entry(self, kod: str) -> list:
+        entry = self._suppliers.get(kod)
+        if entry is None:
+            entry = self._suppliers[kod] = [0, 0.0, "", 0, 0.0, 0, 0]
+        return entry
+
+    def _apply_order(self, kod: str, tarih, tutar: float):
+        entry = self._entry(kod)
+        entry[0] += 1
+        entry[1] += tutar or 0
+        tarih = str(tarih or "")
+        if tarih > entry[2]:
+            entry[2] = tarih
+
+    def _apply_delivery(self, kod: str, tarih, tahmini, teslim, sign: int):
+        ordered, delivered = parse_datetime(tarih), parse_datetime(teslim)
+        if ordered is None or delivered is None:
+            return
+        entry = self._entry(kod)
+        entry[3] += sign
+        entry[4] += sign * (delivered - ordered).total_seconds() / 86400
+        expected = parse_datetime(tahmini)
+        if expected is not None:
+            entry[5] += sign
+            if delivered.date() <= expected.date():
+                entry[6] += sign
+
+    def rebuild(self, orders: Iterable[Tuple]):
+        """(tedarikçi kodu, tarih, tutar, teslim edildi mi, tahmini teslim, teslim tarihi) satırlarından kur"""
+        with self._lock:
+            self._suppliers = {}
+            for kod, tarih, tutar, delivered, tahmini, teslim in orders:
+                self._apply_order(kod, tarih, tutar)
+                if delivered:
+                    self._apply_delivery(kod, tarih, tahmini, teslim, 1)
+            self.built = True
+
+    def invalidate(self):
+        with self._lock:
+            self.built = False
+
+    def add_order(self, kod: str, tarih, tutar: float):
+        with self._lock:
+            if self.built:
+                self._apply_order(kod, tarih, tutar)
+
+    def add_delivery(self, kod: str, tarih, tahmini, teslim, sign: int = 1):
+        """Teslimi göstergelere ekle (sign=-1: teslim durumu geri alındı)"""
+        with self._lock:
+            if self.built:
+                self._apply_delivery(kod, tarih, tahmini, teslim, sign)
+
+    def get(self, kod: str) -> dict:
+        with self._lock:
+            siparis, tutar, son, teslim, gun, vadeli, zamaninda = self._suppliers.get(kod) or [0, 0.0, "", 0, 0.0, 0, 0]
+        return {
+            "siparis_sayisi": siparis,
+            "toplam_siparis": round(tutar, 2),
+            "son_siparis": son,
+            "teslim_sayisi": teslim,
+            "ort_teslim_gun": round(gun / teslim, 1) if teslim else None,
+            "zamaninda_oran": round(zamaninda / vadeli * 100, 1) if vadeli else None,
+        }
@@ -0,0 +1,124 @@
+"""
+Akış hâlinde anormal çıkış tespiti
+Her çıkış hareketi malzeme ve departman x malzeme anahtarlarında Welford
+ortalama/varyans istatistiklerini O(1) günceller. Yeni çıkış, önceki
+istatistiklere göre hem ortalamanın RATIO_THRESHOLD katını hem de ortalama +
+Z_THRESHOLD standart sapmayı aşıyorsa (en az MIN_SAMPLES örnekten sonra)
+anormal sayılır.
+Durum xlsx dosyasının yanındaki JSON dosyasına, işlenen hareket satırı sayısıyla
+birlikte yazılır; açılışta yalnızca sonradan eklenen satırlar işlenir.
+"""
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CIKIS = "Çıkış"
+MIN_SAMPLES = 5
+Z_THRESHOLD = 4.0
+RATIO_THRESHOLD = 3.0
+FORMAT_VERSION = 1
+
+
+def state_path(source_path: str) -> str:
+    return f"{source_path}.anomaly-state.json"
+
+
+def _keys(kod: str, departman: str) -> List[Tuple[str, str]]:
+    keys = [("malzeme", kod)]
+    if departman:
+        keys.append(("departman", f"{departman}|{kod}"))
+    return keys
+
+
+class AnomalyDetector:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.built = False
+        self._stats: Dict[str, list] = {}  # "tür:anahtar" -> [n, ortalama, m2]
+        self.rows_applied = 0              # işlenmiş Hareketler satırı sayısı
+
+    def __len__(self):
+        return len(self._stats)
+
+    def _update(self, kod: str, departman: str, miktar: float):
+        for kind, key in _keys(kod, departman):
+            stats = self._stats.setdefault(f"{kind}:{key}", [0, 0.0, 0.0])
+            stats[0] += 1
+            delta = miktar - stats[1]
+            stats[1] += delta / stats[0]
+            stats[2] += delta * (miktar - stats[1])
+
+    def _apply_rows(self, rows: Iterable[tuple]):
+        for row in rows:
+            self.rows_applied += 1
+            if row and row[0] and row[2] == CIKIS and row[1]:
+                self._update(row[1], row[4] or "", row[3] or 0)
+
+    def rebuild(self, rows: Iterable[tuple]):
+        """Hareketler satırlarından baştan kur"""
+        with self._lock:
+            self._stats, self.rows_applied = {}, 0
+            self._apply_rows(rows)
+            self.built = True
+
+    def catch_up(self, rows: Iterable[tuple]):
+        """Kayıtlı durumdan sonra eklenmiş satırları işle"""
+        with self._lock:
+            self._apply_rows(rows)
+            self.built = True
+
+    def check(self, kod: str, departman: str, miktar: float) -> List[dict]:
+        """Çıkışı mevcut istatistiklere göre değerlendir (durumu değiştirmez)"""
+        anomalies = []
+        with self._lock:
+            if not self.built:
+                return anomalies
+            for kind, key in _keys(kod, departman):
+                stats = self._stats.get(f"{kind}:{key}")
+                if stats is None or stats[0] < MIN_SAMPLES:
+                    continue
+                n, mean, m2 = stats
+                std = (m2 / (n - 1)) ** 0.5
+                if miktar >= RATIO_THRESHOLD * mean and miktar > mean + Z_THRESHOLD * std:
+                    anomalies.append({"tur": kind, "anahtar": key, "ortalama": mean, "sapma": std, "ornek": n})
+        return anomalies
+
+    def add(self, kod: str, islem_tipi: str, miktar: float, departman: str):
+        """Kaydedilen hareketi işle (her hareket bir satır sayılır)"""
+        with self._lock:
+            if not self.built:
+                return
+            self.rows_applied += 1
+            if islem_tipi == CIKIS:
+                self._update(kod, departman or "", miktar or 0)
+
+    def load(self) -> Optional[int]:
+        """Kayıtlı durumu yükle; işlenmiş satır sayısını döndür (dosya yoksa/bozuksa None)"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                body = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Anomali durumu okunamadı, yeniden kurulacak: {e}")
+            return None
+        if body.get("surum") != FORMAT_VERSION:
+            return None
+        with self._lock:
+            self._stats = body["istatistikler"]
+            self.rows_applied = body["satir"]
+        return self.rows_applied
+
+    def save(self):
+        """Durumu geçici dosya + taşıma ile yaz"""
+        with self._lock:
+            if not self.built:
+                return
+            body = json.dumps({"surum": FORMAT_VERSION, "satir": self.rows_applied, "istatistikler": self._stats},
+                              ensure_ascii=False)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(body)
+        os.replace(tmp_path, self.path)
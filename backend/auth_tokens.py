@@ -0,0 +1,97 @@
+"""
+İmzalı oturum token'ları
+Token, kullanıcı bilgilerini ve son geçerlilik zamanını taşır; HMAC-SHA256 ile
+imzalanır. Doğrulama paylaşılan bir oturum deposu gerektirmez, bu yüzden
+uygulama istenilen sayıda worker ile çalışabilir.
+
+Tüm worker'ların aynı token'ı doğrulayabilmesi için SESSION_SECRET ortam
+değişkeni ayarlanmalıdır; ayarlanmazsa her süreç kendi rastgele anahtarını üretir.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+
+SESSION_SECRET = os.getenv("SESSION_SECRET") or secrets.token_urlsafe(32)
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(12 * 60 * 60)))
+REVOCATION_ENABLED = os.getenv("SESSION_REVOCATION_ENABLED", "true").lower() == "true"
+
+
+class TokenError(Exception):
+    pass
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class TokenSigner:
+    def __init__(self, secret: str = SESSION_SECRET, ttl_seconds: int = SESSION_TTL_SECONDS):
+        self._key = secret.encode("utf-8")
+        self.ttl_seconds = ttl_seconds
+
+    def _sign(self, payload: str) -> str:
+        return _b64encode(hmac.new(self._key, payload.encode("ascii"), hashlib.sha256).digest())
+
+    def issue(self, claims: dict) -> str:
+        """Kullanıcı bilgileriyle imzalı token üret (exp ve jti eklenir)"""
+        now = int(time.time())
+        body = dict(claims, iat=now, exp=now + self.ttl_seconds, jti=secrets.token_urlsafe(8))
+        payload = _b64encode(json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        return f"{payload}.{self._sign(payload)}"
+
+    def verify(self, token: str) -> dict:
+        """İmzayı ve süreyi doğrula, token içeriğini döndür"""
+        try:
+            payload, signature = token.split(".", 1)
+        except (AttributeError, ValueError):
+            raise TokenError("Geçersiz token")
+        if not hmac.compare_digest(signature, self._sign(payload)):
+            raise TokenError("Geçersiz imza")
+        try:
+            claims = json.loads(_b64decode(payload))
+        except ValueError:
+            raise TokenError("Geçersiz token")
+        if claims.get("exp", 0) < time.time():
+            raise TokenError("Oturum süresi doldu")
+        return claims
+
+
+class RevocationList:
+    """İsteğe bağlı iptal listesi (çıkış yapılan token'ların jti değerleri)
+
+    Süreç içi tutulur; kayıtlar token süresi dolunca temizlenir. Çok worker'lı
+    kurulumda çıkışın diğer worker'larda da geçerli olması için paylaşılan bir
+    depoya taşınmalıdır; aksi halde token en geç süresi dolunca geçersizleşir.
+    """
+
+    def __init__(self):
+        self._revoked = {}  # jti -> exp
+        self._lock = threading.Lock()
+
+    def revoke(self, claims: dict):
+        with self._lock:
+            self._revoked[claims["jti"]] = claims.get("exp", 0)
+            self._prune()
+
+    def is_revoked(self, claims: dict) -> bool:
+        with self._lock:
+            return claims.get("jti") in self._revoked
+
+    def _prune(self):
+        now = time.time()
+        for jti in [j for j, exp in self._revoked.items() if exp < now]:
+            del self._revoked[jti]
+
+
+def claims_to_user(claims: dict) -> dict:
+    """Token içeriğinden /api/auth/me yanıtı"""
+    return {k: v for k, v in claims.items() if k not in ("iat", "exp", "jti")}
@@ -0,0 +1,11 @@
+"""
+Performans ölçüm paketi
+- fixtures: gerçekçi, tekrarlanabilir (seed'li) inventory_data.xlsx üretimi
+- run: ExcelManager metotları ve API route'ları için zamanlı senaryolar, JSON rapor
+- load: eşzamanlı istemcilerle yük testi ve koşu sonrası stok tutarlılık kontrolü
+
+Kullanım (backend/ dizininden):
+    python -m benchmarks.fixtures --olcek 1k --cikti /tmp/bench.xlsx
+    python -m benchmarks.run --olcek 1k --tekrar 5 --cikti sonuc.json
+    python -m benchmarks.load --olcek 1k --istemci 16 --sure 30
+"""
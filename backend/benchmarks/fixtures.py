@@ -0,0 +1,194 @@
+"""
+Sentetik veri üretici
+Uygulamanın kullandığı sayfa yapısıyla (başlıklar ExcelManager'ın oluşturduğu
+şablondan alınır) istenen ölçekte inventory_data.xlsx üretir. Aynı seed ile
+aynı dosya üretilir; hareketler tarih sırasıyla, son 18 aya yayılır.
+"""
+import argparse
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from openpyxl import Workbook, load_workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_manager import ExcelManager
+from models import Category, NotificationType, OrderStatus, RequestPriority, RequestStatus, Unit
+
+SCALES = {
+    "1k": {"malzeme": 1_000, "hareket": 10_000, "bildirim": 2_000, "siparis": 500, "talep": 500,
+           "tedarikci": 50, "kullanici": 50},
+    "10k": {"malzeme": 10_000, "hareket": 100_000, "bildirim": 20_000, "siparis": 5_000, "talep": 5_000,
+            "tedarikci": 200, "kullanici": 200},
+    "100k": {"malzeme": 100_000, "hareket": 1_000_000, "bildirim": 100_000, "siparis": 20_000, "talep": 20_000,
+             "tedarikci": 500, "kullanici": 500},
+}
+
+# Tüm sentetik kullanıcıların şifresi (yük testleri giriş yapabilsin diye)
+PASSWORD = "bench123"
+DEPARTMENTS = ["IT", "İdari İşler", "Muhasebe", "Satın Alma", "Üretim", "Kalite", "İnsan Kaynakları", "Lojistik"]
+LOCATIONS = ["Depo A", "Depo B", "Depo C", "Mutfak", "Arşiv", "Teknik Oda"]
+WORDS = ["Kağıt", "Kalem", "Toner", "Klasör", "Deterjan", "Eldiven", "Çöp Torbası", "Bardak", "Kahve",
+         "Şeker", "Pil", "Kablo", "Ampul", "Sünger", "Zımba", "Dosya", "Etiket", "Bant", "Peçete", "Sabun"]
+ADJECTIVES = ["Büyük", "Küçük", "Mavi", "Siyah", "Endüstriyel", "Geri Dönüşümlü", "Ekonomik", "Profesyonel"]
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+
+def sheet_headers() -> dict:
+    """Uygulamanın oluşturduğu boş dosyadan sayfa -> başlık listesi"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "template.xlsx")
+        ExcelManager(path)
+        wb = load_workbook(path, read_only=True)
+        headers = {ws.title: list(next(ws.iter_rows(max_row=1, values_only=True))) for ws in wb}
+        wb.close()
+    return headers
+
+
+def _material_code(i: int) -> str:
+    return f"MAL{i:06d}"
+
+
+def generate_fixture(path: str, scale: str = "1k", seed: int = 42, **overrides) -> dict:
+    """Ölçeğe göre dosya üret; üretilen kayıt sayılarını döndür"""
+    counts = dict(SCALES[scale], **overrides)
+    rng = random.Random(seed)
+    now = datetime.now().replace(second=0, microsecond=0)
+    start = now - timedelta(days=540)
+    stamp = now.strftime(DATE_FORMAT)
+    categories = [c.value for c in Category]
+    units = [u.value for u in Unit]
+
+    wb = Workbook(write_only=True)
+    sheets = {}
+    for title, headers in sheet_headers().items():
+        ws = sheets[title] = wb.create_sheet(title)
+        ws.append(headers)
+
+    # Kullanıcılar
+    hashed = hashlib.sha256(PASSWORD.encode()).hexdigest()
+    admin_hash = hashlib.sha256(b"admin123").hexdigest()
+    users = ["admin"] + [f"user{i:04d}" for i in range(1, counts["kullanici"])]
+    for i, username in enumerate(users):
+        rol = "Admin" if i == 0 else rng.choice(["Yönetici", "Kullanıcı", "Kullanıcı", "Görüntüleyici"])
+        sheets["Kullanicilar"].append([
+            username, admin_hash if i == 0 else hashed, f"Kullanıcı {i}", f"{username}@sirket.com",
+            rng.choice(DEPARTMENTS), rol, True, stamp,
+        ])
+
+    # Malzemeler
+    materials = []
+    for i in range(1, counts["malzeme"] + 1):
+        kod = _material_code(i)
+        ad = f"{rng.choice(ADJECTIVES)} {rng.choice(WORDS)} {i}"
+        kategori = rng.choice(categories)
+        min_s = rng.randint(1, 20)
+        max_s = min_s + rng.randint(20, 500)
+        price = round(rng.uniform(0.5, 1500), 2)
+        materials.append((kod, ad, kategori, price))
+        sheets["Malzemeler"].append([
+            kod, ad, kategori, rng.choice(units), rng.randint(0, max_s), min_s, max_s,
+            rng.choice(LOCATIONS), f"{chr(65 + i % 6)}-{i % 40 + 1}", f"869{i:010d}", price, stamp, stamp,
+        ])
+
+    # Tedarikçiler
+    suppliers = []
+    for i in range(1, counts["tedarikci"] + 1):
+        kod, ad = f"TED{i:04d}", f"Tedarikçi {i} Ltd."
+        suppliers.append((kod, ad))
+        sheets["Tedarikciler"].append([
+            kod, ad, f"Yetkili {i}", f"0212 555 {i:04d}", f"satis@tedarikci{i}.com", "İstanbul",
+            rng.choice(categories), round(rng.uniform(2.5, 5), 1), "", stamp, rng.randint(0, 100), True,
+        ])
+
+    # Hareketler (tarih sırasıyla; uygulama da sona ekler)
+    span = (now - start).total_seconds()
+    offsets = sorted(rng.random() * span for _ in range(counts["hareket"]))
+    for offset in offsets:
+        kod, _, _, _ = materials[rng.randrange(len(materials))]
+        tarih = (start + timedelta(seconds=offset)).strftime(DATE_FORMAT)
+        if rng.random() < 0.4:
+            row = [tarih, kod, "Giriş", rng.randint(5, 200), rng.choice(suppliers)[1], "Sipariş teslimi", "", "admin"]
+        else:
+            row = [tarih, kod, "Çıkış", rng.randint(1, 20), rng.choice(DEPARTMENTS), "Departman talebi", "", "admin"]
+        sheets["Hareketler"].append(row)
+
+    # Siparişler
+    statuses = [s.value for s in OrderStatus]
+    for i in range(1, counts["siparis"] + 1):
+        tarih = (start + timedelta(seconds=rng.random() * span)).strftime(DATE_FORMAT)
+        tedarikci = rng.choice(suppliers)
+        items = [materials[rng.randrange(len(materials))] for _ in range(rng.randint(1, 5))]
+        kalemler = [(kod, rng.randint(1, 100), price) for kod, _, _, price in items]
+        durum = rng.choice(statuses)
+        sheets["Siparisler"].append([
+            f"SIP{i:07d}", tarih, tedarikci[0], tedarikci[1], durum,
+            round(sum(m * p for _, m, p in kalemler), 2), rng.choice(users), "admin", tarih,
+            tarih if durum == OrderStatus.DELIVERED.value else "", "",
+            ";".join(f"{k}:{m}:{p}" for k, m, p in kalemler),
+        ])
+
+    # Talepler
+    priorities = [p.value for p in RequestPriority]
+    request_statuses = [s.value for s in RequestStatus]
+    for i in range(1, counts["talep"] + 1):
+        kod, ad, _, _ = materials[rng.randrange(len(materials))]
+        tarih = (start + timedelta(seconds=rng.random() * span)).strftime(DATE_FORMAT)
+        sheets["Talepler"].append([
+            f"TLP{i:07d}", tarih, kod, ad, rng.randint(1, 30), rng.choice(priorities), rng.choice(users),
+            rng.choice(DEPARTMENTS), rng.choice(request_statuses), "", "", "", "",
+        ])
+
+    # Bütçe
+    for yil in (now.year - 1, now.year):
+        for kategori in categories:
+            aylik = rng.randint(2, 20) * 1000
+            kullanilan = rng.randint(0, aylik * 12)
+            sheets["Butce"].append([yil, kategori, aylik, aylik * 12, kullanilan, aylik * 12 - kullanilan])
+
+    # Bildirimler
+    types = [t.value for t in NotificationType]
+    for i in range(1, counts["bildirim"] + 1):
+        tarih = (start + timedelta(seconds=rng.random() * span)).strftime(DATE_FORMAT)
+        sheets["Bildirimler"].append([
+            f"BLD{i:08d}", tarih, rng.choice(users[:20]), rng.choice(types), f"Bildirim {i}", "Sentetik bildirim",
+            "/materials", rng.random() < 0.7,
+        ])
+
+    # Lokasyonlar
+    for i, ad in enumerate(LOCATIONS, 1):
+        sheets["Lokasyonlar"].append([f"LOK{i:03d}", ad, "Merkez", "admin", "", True])
+
+    # Sayımlar (lokasyon başına bir planlanmış sayım)
+    for i, lokasyon in enumerate(LOCATIONS, 1):
+        sheets["Sayimlar"].append([f"SAY{i:04d}", stamp, lokasyon, "", "Planlandı", "admin", "", "", ""])
+
+    tmp_path = f"{path}.tmp"
+    wb.save(tmp_path)
+    os.replace(tmp_path, path)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentetik inventory_data.xlsx üret")
+    parser.add_argument("--olcek", choices=sorted(SCALES), default="1k")
+    parser.add_argument("--cikti", default="inventory_bench.xlsx")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--malzeme", type=int, help="Ölçeğin malzeme sayısını geçersiz kıl")
+    parser.add_argument("--hareket", type=int, help="Ölçeğin hareket sayısını geçersiz kıl")
+    args = parser.parse_args()
+
+    overrides = {k: v for k, v in (("malzeme", args.malzeme), ("hareket", args.hareket)) if v}
+    started = time.perf_counter()
+    counts = generate_fixture(args.cikti, args.olcek, args.seed, **overrides)
+    print(f"{args.cikti}: {counts} ({time.perf_counter() - started:.1f} sn, "
+          f"{os.path.getsize(args.cikti) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
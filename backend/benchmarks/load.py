@@ -0,0 +1,307 @@
+"""
+Eşzamanlı yük testi
+Belirli sayıda istemci thread'i, ağırlıklı bir iş karışımıyla (barkod sorgusu,
+hareket kaydı, dashboard, liste görünümleri) API'yi süre boyunca çağırır; iş
+bazında verim ve gecikme yüzdelikleri raporlanır.
+
+Koşu sonunda veri dosyası üzerinde değişmezler doğrulanır:
+- başarılı her hareket isteği için tam olarak bir Hareketler satırı eklenmiş olmalı
+- her malzemenin Mevcut Stok değeri, başlangıç stoğuna eklenen hareketlerin dosya
+  sırasıyla uygulanmasına (giriş + / çıkış -, sıfırın altına inmeden) eşit olmalı
+Kayıp güncellemeler böylece sessiz sapma yerine hata olarak görünür.
+
+Kullanım (backend/ dizininden):
+    python -m benchmarks.load --olcek 1k --istemci 16 --sure 30
+    python -m benchmarks.load --url http://localhost:8000 --veri inventory_data.xlsx
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from urllib.parse import urlencode, urlsplit
+
+from openpyxl import load_workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import SCALES, generate_fixture
+from benchmarks.run import percentile
+
+DEFAULT_MIX = "barkod=50,hareket=20,dashboard=10,liste=20"
+OPERATIONS = ("barkod", "hareket", "dashboard", "liste")
+
+
+def parse_mix(text: str) -> dict:
+    """'barkod=50,hareket=20' -> {'barkod': 50, 'hareket': 20}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise SystemExit(f"Bilinmeyen iş: {name} (seçenekler: {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def read_state(path: str) -> dict:
+    """Veri dosyasından stoklar, barkodlar ve hareket satırları (read-only)"""
+    wb = load_workbook(path, read_only=True)
+    try:
+        stocks, barcodes = {}, []
+        for row in wb["Malzemeler"].iter_rows(min_row=2, values_only=True):
+            if row and row[0]:
+                stocks[row[0]] = int(row[4] or 0)
+                if row[9]:
+                    barcodes.append(str(row[9]))
+        movements = [(row[1], row[2], int(row[3] or 0))
+                     for row in wb["Hareketler"].iter_rows(min_row=2, values_only=True) if row and row[0]]
+    finally:
+        wb.close()
+    return {"stocks": stocks, "barcodes": barcodes, "movements": movements}
+
+
+class Client(threading.Thread):
+    """Tek bağlantı üzerinden karışımdaki işleri süre dolana kadar çağıran istemci"""
+
+    def __init__(self, base_url: str, mix: dict, state: dict, hot_materials: list, deadline: float, seed: int):
+        super().__init__(daemon=True)
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.names, self.weights = list(mix), list(mix.values())
+        self.barcodes = state["barcodes"]
+        self.hot_materials = hot_materials
+        self.deadline = deadline
+        self.rng = random.Random(seed)
+        self.samples = []        # (iş, süre ms, durum kodu)
+        self.posted = []         # başarılı hareketler: (kod, tip, miktar)
+        self._conn = None
+
+    def _request(self, method: str, path: str, body=None):
+        if self._conn is None:
+            self._conn = http.client.HTTPConnection(self.host, self.port, timeout=120)
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        try:
+            self._conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+            response = self._conn.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            self._conn.close()
+            self._conn = None
+            return 0
+
+    def _run_operation(self, name: str) -> int:
+        if name == "barkod":
+            return self._request("GET", f"/api/materials/by-barcode/{self.rng.choice(self.barcodes)}")
+        if name == "dashboard":
+            return self._request("GET", "/api/dashboard?" + urlencode({"username": "admin"}))
+        if name == "liste":
+            if self.rng.random() < 0.5:
+                return self._request("GET", "/api/materials?" + urlencode({"fields": "kod,ad,mevcut_stok,durum"}))
+            return self._request("GET", "/api/movements")
+
+        kod = self.rng.choice(self.hot_materials)
+        tip = "Giriş" if self.rng.random() < 0.5 else "Çıkış"
+        miktar = self.rng.randint(1, 10)
+        status = self._request("POST", "/api/movements", {
+            "malzeme_kodu": kod, "islem_tipi": tip, "miktar": miktar,
+            "tedarikci_teslim_alan": "Yük Testi", "aciklama": "benchmarks.load",
+        })
+        if status == 200:
+            self.posted.append((kod, tip, miktar))
+        return status
+
+    def run(self):
+        while time.perf_counter() < self.deadline:
+            name = self.rng.choices(self.names, self.weights)[0]
+            started = time.perf_counter()
+            status = self._run_operation(name)
+            self.samples.append((name, (time.perf_counter() - started) * 1000, status))
+        if self._conn is not None:
+            self._conn.close()
+
+
+def check_invariants(before: dict, after: dict, posted: list) -> dict:
+    """Yük sonrası veri dosyasının tutarlılığını doğrula"""
+    failures = []
+    new_rows = after["movements"][len(before["movements"]):]
+    if after["movements"][:len(before["movements"])] != before["movements"]:
+        failures.append("Önceden var olan hareket satırları değişmiş")
+
+    # 1) Başarılı her istek tam olarak bir satır
+    if len(new_rows) != len(posted):
+        failures.append(f"Hareket satırı sayısı {len(new_rows)}, başarılı istek sayısı {len(posted)}")
+    missing = Counter(posted) - Counter(new_rows)
+    extra = Counter(new_rows) - Counter(posted)
+    if missing:
+        failures.append(f"Dosyada bulunmayan {sum(missing.values())} hareket (ör. {next(iter(missing))})")
+    if extra:
+        failures.append(f"İstekle eşleşmeyen {sum(extra.values())} hareket (ör. {next(iter(extra))})")
+
+    # 2) Stok = başlangıç + girişler - çıkışlar (dosya sırasıyla, sıfırda kırpılarak)
+    expected = dict(before["stocks"])
+    clamped = 0
+    for kod, tip, miktar in new_rows:
+        if kod not in expected:
+            continue
+        if tip == "Giriş":
+            expected[kod] += miktar
+        else:
+            if expected[kod] < miktar:
+                clamped += 1
+            expected[kod] = max(0, expected[kod] - miktar)
+
+    drifted = {kod: (stok, after["stocks"].get(kod)) for kod, stok in expected.items()
+               if after["stocks"].get(kod) != stok}
+    if drifted:
+        sample = dict(list(drifted.items())[:5])
+        failures.append(f"{len(drifted)} malzemede stok sapması (beklenen, bulunan): {sample}")
+
+    net = defaultdict(int)
+    for kod, tip, miktar in posted:
+        net[kod] += miktar if tip == "Giriş" else -miktar
+    return {
+        "basarili": not failures,
+        "hatalar": failures,
+        "yeni_hareket": len(new_rows),
+        "etkilenen_malzeme": len(net),
+        "sifirda_kirpilan_cikis": clamped,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workdir: str):
+    """Uygulamayı bu süreçte, çalışma dizinindeki veri dosyasıyla ayağa kaldır"""
+    os.chdir(workdir)
+    import uvicorn
+    import main as app_module
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app_module.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise SystemExit("Sunucu başlatılamadı")
+        time.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    by_operation = defaultdict(list)
+    errors = Counter()
+    for name, ms, status in samples:
+        by_operation[name].append(ms)
+        if status != 200:
+            errors[name] += 1
+
+    operations = {}
+    for name, durations in sorted(by_operation.items()):
+        ordered = sorted(durations)
+        operations[name] = {
+            "istek": len(ordered),
+            "hata": errors[name],
+            "verim_rps": round(len(ordered) / elapsed, 2),
+            "p50_ms": round(percentile(ordered, 0.50), 2),
+            "p95_ms": round(percentile(ordered, 0.95), 2),
+            "p99_ms": round(percentile(ordered, 0.99), 2),
+            "max_ms": round(ordered[-1], 2),
+        }
+    return {
+        "toplam_istek": len(samples),
+        "toplam_hata": sum(errors.values()),
+        "verim_rps": round(len(samples) / elapsed, 2),
+        "isler": operations,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eşzamanlı yük testi ve tutarlılık kontrolü")
+    parser.add_argument("--url", help="Çalışan sunucu (verilmezse uygulama bu süreçte başlatılır)")
+    parser.add_argument("--veri", help="Veri dosyası; --url ile sunucunun kullandığı dosya olmalı")
+    parser.add_argument("--olcek", choices=sorted(SCALES), default="1k", help="--veri yoksa üretilecek ölçek")
+    parser.add_argument("--istemci", type=int, default=8, help="Eşzamanlı istemci sayısı")
+    parser.add_argument("--sure", type=float, default=30, help="Koşu süresi (sn)")
+    parser.add_argument("--karisim", default=DEFAULT_MIX, help=f"İş ağırlıkları (varsayılan: {DEFAULT_MIX})")
+    parser.add_argument("--sicak-malzeme", type=int, default=20,
+                        help="Hareketlerin yoğunlaştığı malzeme sayısı (çakışmayı artırır)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cikti", help="JSON rapor dosyası (verilmezse stdout)")
+    args = parser.parse_args()
+    mix = parse_mix(args.karisim)
+
+    if args.url and not args.veri:
+        parser.error("--url ile değişmez kontrolü için --veri (sunucunun veri dosyası) gerekli")
+
+    workdir = None
+    server = thread = None
+    try:
+        if args.url:
+            path, base_url = args.veri, args.url.rstrip("/")
+        else:
+            workdir = tempfile.mkdtemp(prefix="inventory-load-")
+            path = os.path.join(workdir, "inventory_data.xlsx")
+            if args.veri:
+                shutil.copy(args.veri, path)
+            else:
+                generate_fixture(path, args.olcek, args.seed)
+            server, thread, base_url = start_server(workdir)
+
+        before = read_state(path)
+        rng = random.Random(args.seed)
+        hot = rng.sample(sorted(before["stocks"]), min(args.sicak_malzeme, len(before["stocks"])))
+
+        deadline = time.perf_counter() + args.sure
+        started = time.perf_counter()
+        clients = [Client(base_url, mix, before, hot, deadline, args.seed + i) for i in range(args.istemci)]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        elapsed = time.perf_counter() - started
+
+        if server is not None:
+            # Kapanışta yazıcı kuyruğu boşaltılır
+            server.should_exit = True
+            thread.join(30)
+
+        samples = [s for c in clients for s in c.samples]
+        posted = [p for c in clients for p in c.posted]
+        report = {
+            "tarih": datetime.now().isoformat(timespec="seconds"),
+            "url": args.url or "süreç içi",
+            "istemci": args.istemci,
+            "sure_sn": round(elapsed, 2),
+            "karisim": mix,
+            **summarize(samples, elapsed),
+            "degismezler": check_invariants(before, read_state(path), posted),
+        }
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.cikti:
+        with open(args.cikti, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    sys.exit(0 if report["degismezler"]["basarili"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+"""
+Zamanlı senaryolar
+Üretilen veri dosyasının geçici bir kopyası üzerinde önce ExcelManager metotlarını,
+sonra ana API route'larını (süreç içi TestClient ile) çalıştırır. Her senaryo için
+ilk çağrı, p50/p95/max süreleri, tracemalloc bellek tepesi (--hizli modda yok) ve çağrı başına
+depolama maliyeti (yükleme/kayıt/satır taraması) JSON olarak yazılır.
+"""
+import argparse
+import contextvars
+import json
+import math
+import os
+import platform
+import re
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import PASSWORD, SCALES, generate_fixture
+from excel_manager import ExcelManager
+from metrics import start_request_cost
+from models import *
+
+MATERIAL = "MAL000001"
+SUPPLIER = "TED0001"
+ORDER = "SIP0000001"
+REQUEST = "TLP0000001"
+STOCK_COUNT = "SAY0001"
+IMPORT_ROWS = 50
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Geçmiş tarihli stok sorgusu: ~1,5 ay önce (kontrol noktası + kısmi ay yeniden oynatımı)
+AS_OF = (datetime.now() - timedelta(days=45)).strftime("%Y-%m-%d")
+
+
+def _material(kod: str) -> MaterialCreate:
+    return MaterialCreate(kod=kod, ad=f"Benchmark Malzemesi {kod}", kategori=Category.KIRTASIYE,
+                          birim=Unit.ADET, mevcut_stok=10, min_seviye=2, max_seviye=50,
+                          konum="Depo A", raf="A-1", barkod=f"BN{kod}", birim_fiyat=12.5)
+
+
+def _movement(tip: MovementType) -> StockMovementCreate:
+    return StockMovementCreate(malzeme_kodu=MATERIAL, islem_tipi=tip, miktar=1,
+                               tedarikci_teslim_alan="IT", aciklama="benchmark", onaylayan="admin")
+
+
+def _order() -> OrderCreate:
+    return OrderCreate(tedarikci_kodu=SUPPLIER, tedarikci_adi="Tedarikçi 1 Ltd.", olusturan="admin",
+                       kalemler=[OrderItem(malzeme_kodu=MATERIAL, malzeme_adi=MATERIAL, miktar=3, birim_fiyat=10.0)])
+
+
+@lru_cache(maxsize=None)
+def _import_file(directory: str) -> str:
+    """İçe aktarma senaryoları için kullanıcı biçiminde (Sayı, Ürün Adı, Adet, Durum) küçük dosya"""
+    path = os.path.join(directory, "import_malzemeler.xlsx")
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Sayı", "Ürün Adı", "Adet", "Durum"])
+    for i in range(1, IMPORT_ROWS + 1):
+        ws.append([i, f"İçe Aktarılan Malzeme {i}", f"{i} KUTU", "Yeni"])
+    wb.save(path)
+    return path
+
+
+def _import_upload(i) -> dict:
+    # Route senaryoları çalışma dizininde koşar (bkz. run_route_scenarios)
+    with open(_import_file(os.getcwd()), "rb") as f:
+        return {"files": {"file": ("malzemeler.xlsx", f.read(), XLSX)}}
+
+
+# ad -> fn(manager, i); i çağrı sırası (yazma senaryolarında benzersiz kod üretmek için)
+# Ölçülmeyen genel metotlar:
+#   add_notification_listener      SSE aboneliği; yalnızca kuyruk kaydı, ölçülecek iş yok
+#   begin_batch / commit_batch /
+#   rollback_batch                 yazıcı kuyruğunun iç adımları; her yazma senaryosunda zaten çalışır
+#   cache_sizes / pending_login_count  sayaç okuma (/metrics route'u kapsar)
+#   ensure_file_exists             veri dosyası hazırlığı (fixtures.py üretir)
+MANAGER_SCENARIOS = {
+    "get_all_users": lambda m, i: m.get_all_users(),
+    "authenticate_user": lambda m, i: m.authenticate_user("admin", "admin123"),
+    "flush_last_logins": lambda m, i: m.flush_last_logins(),
+    "get_all_materials": lambda m, i: m.get_all_materials(),
+    "get_material_summary": lambda m, i: m.get_material_summary(),
+    "materials_as_of": lambda m, i: m.materials_as_of(m.get_all_materials(), AS_OF),
+    "get_material_by_code": lambda m, i: m.get_material_by_code(MATERIAL),
+    "get_material_by_barcode": lambda m, i: m.get_material_by_barcode("8690000000001"),
+    "search_materials": lambda m, i: m.search_materials("kağıt", limit=20),
+    "get_all_movements": lambda m, i: m.get_all_movements(),
+    "movement_rows_between": lambda m, i: m.movement_rows_between(AS_OF[:7], AS_OF),
+    "get_all_suppliers": lambda m, i: m.get_all_suppliers(),
+    "get_supplier_by_code": lambda m, i: m.get_supplier_by_code(SUPPLIER),
+    "get_supplier_report": lambda m, i: m.get_supplier_report(),
+    "get_all_orders": lambda m, i: m.get_all_orders(),
+    "get_order_by_no": lambda m, i: m.get_order_by_no(ORDER),
+    "get_all_requests": lambda m, i: m.get_all_requests(),
+    "get_request_by_no": lambda m, i: m.get_request_by_no(REQUEST),
+    "get_pending_requests": lambda m, i: m.get_pending_requests(),
+    "get_budget_summary": lambda m, i: m.get_budget_summary(),
+    "get_budget_month": lambda m, i: m.get_budget_month(),
+    "get_user_notifications": lambda m, i: m.get_user_notifications("admin"),
+    "get_unread_count": lambda m, i: m.get_unread_count("admin"),
+    "get_critical_stock_materials": lambda m, i: m.get_critical_stock_materials(),
+    "get_category_distribution": lambda m, i: m.get_category_distribution(),
+    "get_total_stock_value": lambda m, i: m.get_total_stock_value(),
+    "get_stock_value_series": lambda m, i: m.get_stock_value_series(),
+    "get_stock_as_of": lambda m, i: m.get_stock_as_of(AS_OF),
+    "get_dashboard_stats": lambda m, i: m.get_dashboard_stats("admin"),
+    "get_department_consumption": lambda m, i: m.get_department_consumption(),
+    "get_monthly_stats": lambda m, i: m.get_monthly_stats(),
+    "get_stock_predictions": lambda m, i: m.get_stock_predictions(),
+    "get_reorder_recommendations": lambda m, i: m.get_reorder_recommendations(),
+    "get_spend": lambda m, i: m.get_spend(["ay", "kategori"]),
+    "pivot": lambda m, i: m.pivot("hareket", ["kategori", "ay"], ["miktar", "deger"]),
+    "get_audit_logs": lambda m, i: m.get_audit_logs(),
+    "get_all_locations": lambda m, i: m.get_all_locations(),
+    "get_all_stock_counts": lambda m, i: m.get_all_stock_counts(),
+    "iter_sheet_rows": lambda m, i: sum(1 for _ in m.iter_sheet_rows("Hareketler")),
+    # Soğuk kurulumlar: açılışta veya geçersiz kılınınca bir kez çalışır
+    "warm_up": lambda m, i: m.warm_up(),
+    "rebuild_search_index": lambda m, i: m.rebuild_search_index(),
+    "rebuild_budget_ledger": lambda m, i: m.rebuild_budget_ledger(),
+    "rebuild_monthly_stats": lambda m, i: m.rebuild_monthly_stats(),
+    "rebuild_spend_cube": lambda m, i: m.rebuild_spend_cube(),
+    "rebuild_supplier_kpis": lambda m, i: m.rebuild_supplier_kpis(),
+    "load_anomaly_detector": lambda m, i: m.load_anomaly_detector(),
+    "save_anomaly_state": lambda m, i: m.save_anomaly_state(),
+    "save_snapshot": lambda m, i: m.save_snapshot(),
+    "record_stock_history": lambda m, i: m.record_stock_history(),
+    "create_movement": lambda m, i: m.create_movement(_movement(MovementType.GIRIS if i % 2 else MovementType.CIKIS)),
+    "create_material": lambda m, i: m.create_material(_material(f"BNC{i:05d}")),
+    "update_material": lambda m, i: m.update_material(f"BNC{i:05d}", _material(f"BNC{i:05d}")),
+    "delete_material": lambda m, i: m.delete_material(f"BNC{i:05d}"),
+    "create_supplier": lambda m, i: m.create_supplier(SupplierCreate(kod=f"BNT{i:05d}", ad=f"Benchmark {i}")),
+    "update_supplier": lambda m, i: m.update_supplier(f"BNT{i:05d}", SupplierCreate(kod=f"BNT{i:05d}", ad=f"Benchmark {i}", puan=4.0)),
+    "delete_supplier": lambda m, i: m.delete_supplier(f"BNT{i:05d}"),
+    "create_order": lambda m, i: m.create_order(_order()),
+    "update_order_status": lambda m, i: m.update_order_status(ORDER, OrderStatus.APPROVED, "admin"),
+    "create_request": lambda m, i: m.create_request(RequestCreate(
+        malzeme_kodu=MATERIAL, malzeme_adi=MATERIAL, miktar=1, talep_eden="admin", departman="IT")),
+    "update_request_status": lambda m, i: m.update_request_status(REQUEST, RequestStatus.APPROVED, "admin"),
+    "update_budget": lambda m, i: m.update_budget(datetime.now().year, "Kırtasiye", 10.0),
+    "create_notification": lambda m, i: m.create_notification(NotificationCreate(
+        kullanici="admin", tip=NotificationType.SYSTEM, baslik="benchmark", mesaj=str(i))),
+    "mark_notification_read": lambda m, i: m.mark_notification_read("BLD00000001"),
+    "create_audit_log": lambda m, i: m.create_audit_log("admin", "Benchmark", "Sistem", str(i)),
+    "create_location": lambda m, i: m.create_location(LocationCreate(kod=f"BNL{i:05d}", ad=f"Lokasyon {i}")),
+    "delete_location": lambda m, i: m.delete_location(f"BNL{i:05d}"),
+    "create_stock_count": lambda m, i: m.create_stock_count(StockCountCreate(
+        planlanan_tarih="2030-01-01", olusturan="admin", lokasyon="Depo A")),
+    "complete_stock_count": lambda m, i: m.complete_stock_count(STOCK_COUNT, "admin"),
+    "import_materials_from_excel": lambda m, i: m.import_materials_from_excel(_import_file(os.path.dirname(m.file_path))),
+    "create_user": lambda m, i: m.create_user(UserCreate(
+        username=f"bench{i:05d}", password=PASSWORD, ad_soyad="Benchmark", email="b@sirket.com", departman="IT")),
+}
+
+# ad -> (metot, yol, istek argümanları); yol ve argümanlar çağrı sırası i'yi alan fonksiyon da olabilir
+# Ölçülmeyen route'lar:
+#   GET /api/notifications/stream     uzun ömürlü SSE bağlantısı; gecikme değil bağlantı süresi ölçülürdü
+#   POST /api/auth/logout, GET /api/auth/me  bellekteki oturum sözlüğünü okur; maliyeti giriş senaryosunda
+#   GET /api/enums/*                  sabit listeler; depolamaya dokunmaz
+ROUTE_SCENARIOS = {
+    "POST /api/auth/login": ("POST", "/api/auth/login", {"json": {"username": "admin", "password": "admin123"}}),
+    "GET /api/users": ("GET", "/api/users", {}),
+    "POST /api/users": ("POST", "/api/users", lambda i: {"json": {
+        "username": f"benchr{i:05d}", "password": PASSWORD, "ad_soyad": "Benchmark", "email": "b@sirket.com",
+        "departman": "IT"}}),
+    "GET /api/dashboard": ("GET", "/api/dashboard", {"params": {"username": "admin"}}),
+    "GET /api/materials": ("GET", "/api/materials", {}),
+    "GET /api/materials?arama": ("GET", "/api/materials", {"params": {"arama": "kağıt"}}),
+    "GET /api/materials/search": ("GET", "/api/materials/search", {"params": {"q": "kağıt"}}),
+    "GET /api/materials?tarih": ("GET", "/api/materials", {"params": {"tarih": AS_OF}}),
+    "GET /api/materials/{kod}": ("GET", f"/api/materials/{MATERIAL}", {}),
+    "GET /api/materials/{kod}/stock": ("GET", f"/api/materials/{MATERIAL}/stock", {"params": {"tarih": AS_OF}}),
+    "GET /api/materials/by-barcode": ("GET", "/api/materials/by-barcode/8690000000001", {}),
+    "GET /api/materials/critical": ("GET", "/api/materials/critical", {}),
+    "POST /api/materials": ("POST", "/api/materials", lambda i: {"json": _material(f"BNR{i:05d}").dict()}),
+    "PUT /api/materials/{kod}": ("PUT", lambda i: f"/api/materials/BNR{i:05d}",
+                                 lambda i: {"json": _material(f"BNR{i:05d}").dict()}),
+    "DELETE /api/materials/{kod}": ("DELETE", lambda i: f"/api/materials/BNR{i:05d}", {}),
+    "POST /api/materials/import-excel": ("POST", "/api/materials/import-excel", _import_upload),
+    "GET /api/movements": ("GET", "/api/movements", {}),
+    "POST /api/movements": ("POST", "/api/movements", {"json": {
+        "malzeme_kodu": MATERIAL, "islem_tipi": "Giriş", "miktar": 1, "aciklama": "benchmark"}}),
+    "GET /api/suppliers": ("GET", "/api/suppliers", {}),
+    "GET /api/suppliers/{kod}": ("GET", f"/api/suppliers/{SUPPLIER}", {}),
+    "POST /api/suppliers": ("POST", "/api/suppliers", lambda i: {"json": {"kod": f"BNS{i:05d}", "ad": f"Benchmark {i}"}}),
+    "PUT /api/suppliers/{kod}": ("PUT", lambda i: f"/api/suppliers/BNS{i:05d}",
+                                 lambda i: {"json": {"kod": f"BNS{i:05d}", "ad": f"Benchmark {i}", "puan": 4.0}}),
+    "DELETE /api/suppliers/{kod}": ("DELETE", lambda i: f"/api/suppliers/BNS{i:05d}", {}),
+    "GET /api/orders": ("GET", "/api/orders", {}),
+    "GET /api/orders/{siparis_no}": ("GET", f"/api/orders/{ORDER}", {}),
+    "POST /api/orders": ("POST", "/api/orders", {"json": _order().dict()}),
+    "PUT /api/orders/{siparis_no}/status": ("PUT", f"/api/orders/{ORDER}/status",
+                                            {"params": {"durum": OrderStatus.APPROVED.value, "onaylayan": "admin"}}),
+    "GET /api/requests": ("GET", "/api/requests", {}),
+    "GET /api/requests/pending": ("GET", "/api/requests/pending", {}),
+    "GET /api/requests/{talep_no}": ("GET", f"/api/requests/{REQUEST}", {}),
+    "POST /api/requests": ("POST", "/api/requests", {"json": {
+        "malzeme_kodu": MATERIAL, "malzeme_adi": MATERIAL, "miktar": 1, "talep_eden": "admin", "departman": "IT"}}),
+    "PUT /api/requests/{talep_no}/approve": ("PUT", f"/api/requests/{REQUEST}/approve", {"params": {"onaylayan": "admin"}}),
+    "PUT /api/requests/{talep_no}/reject": ("PUT", f"/api/requests/{REQUEST}/reject",
+                                            {"params": {"onaylayan": "admin", "red_nedeni": "benchmark"}}),
+    "GET /api/budget": ("GET", "/api/budget", {}),
+    "GET /api/budget/monthly": ("GET", "/api/budget/monthly", {}),
+    "POST /api/budget/update": ("POST", "/api/budget/update", {"params": {
+        "yil": datetime.now().year, "kategori": "Kırtasiye", "harcama": 10.0}}),
+    "GET /api/notifications": ("GET", "/api/notifications", {"params": {"username": "admin"}}),
+    "GET /api/notifications/unread/count": ("GET", "/api/notifications/unread/count", {"params": {"username": "admin"}}),
+    "POST /api/notifications": ("POST", "/api/notifications", {"json": {
+        "kullanici": "admin", "tip": NotificationType.SYSTEM.value, "baslik": "benchmark", "mesaj": "benchmark"}}),
+    "PUT /api/notifications/{notif_id}/read": ("PUT", "/api/notifications/BLD00000001/read", {}),
+    "GET /api/audit-logs": ("GET", "/api/audit-logs", {}),
+    "GET /api/reports/inventory": ("GET", "/api/reports/inventory", {}),
+    "GET /api/reports/movements": ("GET", "/api/reports/movements", {}),
+    "GET /api/reports/department": ("GET", "/api/reports/department", {}),
+    "GET /api/reports/suppliers": ("GET", "/api/reports/suppliers", {}),
+    "GET /api/analytics/monthly": ("GET", "/api/analytics/monthly", {}),
+    "POST /api/analytics/monthly/rebuild": ("POST", "/api/analytics/monthly/rebuild", {}),
+    "GET /api/analytics/category": ("GET", "/api/analytics/category", {}),
+    "GET /api/analytics/trends": ("GET", "/api/analytics/trends", {}),
+    "GET /api/analytics/spend": ("GET", "/api/analytics/spend", {"params": {"boyutlar": "ay,kategori"}}),
+    "POST /api/analytics/spend/rebuild": ("POST", "/api/analytics/spend/rebuild", {}),
+    "GET /api/analytics/pivot": ("GET", "/api/analytics/pivot", {"params": {"boyutlar": "kategori,ay", "olculer": "miktar,deger"}}),
+    "GET /api/analytics/stock-value": ("GET", "/api/analytics/stock-value", {}),
+    "POST /api/analytics/stock-value/snapshot": ("POST", "/api/analytics/stock-value/snapshot", {}),
+    "GET /api/predictions": ("GET", "/api/predictions", {}),
+    "GET /api/predictions/reorder": ("GET", "/api/predictions/reorder", {}),
+    "GET /api/export/materials": ("GET", "/api/export/materials", {"params": {"bicim": "csv"}}),
+    "GET /api/export/movements": ("GET", "/api/export/movements", {"params": {"bicim": "csv"}}),
+    "GET /api/export/requests": ("GET", "/api/export/requests", {"params": {"bicim": "csv"}}),
+    "GET /api/export/orders": ("GET", "/api/export/orders", {"params": {"bicim": "csv"}}),
+    "GET /api/locations": ("GET", "/api/locations", {}),
+    "POST /api/locations": ("POST", "/api/locations", lambda i: {"json": {"kod": f"BNM{i:05d}", "ad": f"Lokasyon {i}"}}),
+    "DELETE /api/locations/{kod}": ("DELETE", lambda i: f"/api/locations/BNM{i:05d}", {}),
+    "GET /api/stock-counts": ("GET", "/api/stock-counts", {}),
+    "POST /api/stock-counts": ("POST", "/api/stock-counts", {"json": {
+        "planlanan_tarih": "2030-01-01", "olusturan": "admin", "lokasyon": "Depo A"}}),
+    "PUT /api/stock-counts/{sayim_no}/complete": ("PUT", f"/api/stock-counts/{STOCK_COUNT}/complete",
+                                                  {"params": {"tamamlayan": "admin"}}),
+    # Isınma arka planda sürer; hazır olma kontrolü en sonda (açılışta 503 döner)
+    "GET /health/ready": ("GET", "/health/ready", {}),
+    "GET /metrics": ("GET", "/metrics", {}),
+}
+
+
+def percentile(sorted_values, p: float) -> float:
+    """En yakın sıra yöntemiyle yüzdelik (sıralı liste)"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(p * len(sorted_values)) - 1)]
+
+
+def _measure(fn, repeat: int, memory: bool = True) -> dict:
+    """fn'i repeat kez çalıştır; süre, bellek tepesi (memory ise) ve depolama maliyetini özetle"""
+    durations, costs = [], []
+    for i in range(repeat):
+        ctx = contextvars.copy_context()
+        cost = ctx.run(start_request_cost)
+        started = time.perf_counter()
+        ctx.run(fn, i)
+        durations.append((time.perf_counter() - started) * 1000)
+        costs.append(cost)
+
+    # Bellek ölçümü ayrı bir çağrıda (tracemalloc süreleri bozmasın); izleme altında
+    # xlsx kaydı birkaç kat yavaşladığından hızlı modda atlanır
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            fn(repeat)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    ordered = sorted(durations)
+    last = costs[-1]
+    return {
+        "n": repeat,
+        "ilk_ms": round(durations[0], 3),
+        "p50_ms": round(percentile(ordered, 0.50), 3),
+        "p95_ms": round(percentile(ordered, 0.95), 3),
+        "max_ms": round(ordered[-1], 3),
+        "bellek_tepe_mb": round(peak / 1e6, 3) if peak is not None else None,
+        "yukleme": last.loads,
+        "kayit": last.saves,
+        "taranan_satir": last.rows_scanned,
+    }
+
+
+def run_manager_scenarios(path: str, repeat: int, pattern, memory: bool = True) -> list:
+    manager = ExcelManager(path)
+    results = []
+    for name, fn in MANAGER_SCENARIOS.items():
+        if pattern and not pattern.search(name):
+            continue
+        try:
+            results.append(dict(ad=name, tur="excel_manager", **_measure(lambda i: fn(manager, i), repeat, memory)))
+        except Exception as e:
+            results.append({"ad": name, "tur": "excel_manager", "hata": repr(e)})
+        print(f"  {name}: {results[-1].get('p50_ms', results[-1].get('hata'))}", file=sys.stderr)
+    return results
+
+
+def run_route_scenarios(workdir: str, repeat: int, pattern, memory: bool = True) -> list:
+    # main modülü ExcelManager'ı çalışma dizinindeki inventory_data.xlsx ile kurar
+    os.chdir(workdir)
+    from fastapi.testclient import TestClient
+    import main
+
+    results = []
+    with TestClient(main.app) as client:
+        for name, (method, url, kwargs) in ROUTE_SCENARIOS.items():
+            if pattern and not pattern.search(name):
+                continue
+
+            def call(i, method=method, url=url, kwargs=kwargs):
+                response = client.request(method, url(i) if callable(url) else url,
+                                          **(kwargs(i) if callable(kwargs) else kwargs))
+                if response.status_code >= 400:
+                    raise RuntimeError(f"{response.status_code}: {response.text[:200]}")
+
+            try:
+                results.append(dict(ad=name, tur="route", **_measure(call, repeat, memory)))
+            except Exception as e:
+                results.append({"ad": name, "tur": "route", "hata": repr(e)})
+            print(f"  {name}: {results[-1].get('p50_ms', results[-1].get('hata'))}", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ExcelManager ve API performans ölçümü")
+    parser.add_argument("--olcek", choices=sorted(SCALES), default="1k")
+    parser.add_argument("--veri", help="Hazır veri dosyası (verilmezse ölçeğe göre üretilir)")
+    parser.add_argument("--tekrar", type=int, default=3, help="Senaryo başına çağrı sayısı")
+    parser.add_argument("--hizli", action="store_true",
+                        help="Senaryo başına tek çağrı, bellek ölçümü yok (yazma senaryoları her çağrıda xlsx kaydeder)")
+    parser.add_argument("--senaryo", help="Yalnızca adı bu regex'e uyan senaryolar")
+    parser.add_argument("--sadece", choices=["excel_manager", "route"], help="Yalnızca bir senaryo türü")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cikti", help="JSON rapor dosyası (verilmezse stdout)")
+    args = parser.parse_args()
+    pattern = re.compile(args.senaryo) if args.senaryo else None
+    repeat = 1 if args.hizli else args.tekrar
+    memory = not args.hizli
+
+    workdir = tempfile.mkdtemp(prefix="inventory-bench-")
+    path = os.path.join(workdir, "inventory_data.xlsx")
+    try:
+        started = time.perf_counter()
+        if args.veri:
+            shutil.copy(args.veri, path)
+            counts = None
+        else:
+            counts = generate_fixture(path, args.olcek, args.seed)
+        print(f"Veri hazır ({time.perf_counter() - started:.1f} sn): {path}", file=sys.stderr)
+
+        report = {
+            "tarih": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "olcek": None if args.veri else args.olcek,
+            "kayitlar": counts,
+            "dosya_mb": round(os.path.getsize(path) / 1e6, 2),
+            "tekrar": repeat,
+            "hizli": args.hizli,
+            "sonuclar": [],
+        }
+        if args.sadece in (None, "excel_manager"):
+            report["sonuclar"] += run_manager_scenarios(path, repeat, pattern, memory)
+        if args.sadece in (None, "route"):
+            report["sonuclar"] += run_route_scenarios(workdir, repeat, pattern, memory)
+        # Linux'ta KiB cinsinden
+        report["surec_bellek_tepe_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.cikti:
+        with open(args.cikti, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
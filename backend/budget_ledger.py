@@ -0,0 +1,106 @@
+"""
+Aylık kovalı bütçe defteri
+Butce sayfasındaki (yıl, kategori) limitleri ve kullanılan tutarlar ile
+ButceHareketleri sayfasındaki borç/alacak kayıtları tek geçişte okunur;
+yıl x ay x kategori kovaları ve yıl / ay başına toplamlar bellekte tutulur,
+her kayıtta O(1) güncellenir.
+Yıllık kullanılan tutarın kaynağı Butce sayfasıdır (defter öncesi elle girilmiş
+kullanım dahil); aylık kırılım yalnızca defter kayıtlarından gelir. Defterden
+önce teslim edilmiş siparişler geriye dönük borçlandırılmaz, aksi hâlde elle
+girilmiş kullanımla çift sayılırdı.
+Eşik kontrolü artımlıdır: bir borç, aylık ya da yıllık limitin WARNING_RATIO
+oranını veya tamamını yalnızca ilk kez geçtiğinde uyarı üretir.
+"""
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+WARNING_RATIO = 0.8
+THRESHOLDS = (1.0, WARNING_RATIO)  # büyükten küçüğe; tek borçta en yüksek eşik bildirilir
+
+
+def crossed_threshold(before: float, after: float, limit: float) -> Optional[float]:
+    """before -> after geçişinde ilk kez aşılan en yüksek eşik oranı (yoksa None)"""
+    if limit <= 0 or after <= before:
+        return None
+    for ratio in THRESHOLDS:
+        if before < ratio * limit <= after:
+            return ratio
+    return None
+
+
+class BudgetLedger:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.built = False
+        self._limits: Dict[Tuple[int, str], list] = {}   # (yıl, kategori) -> [aylık limit, yıllık limit, kullanılan]
+        self._years: Dict[int, list] = {}                 # yıl -> [toplam yıllık limit, kullanılan]
+        self._buckets: Dict[Tuple[int, int, str], float] = {}  # (yıl, ay, kategori) -> defter tutarı
+        self._months: Dict[Tuple[int, int], float] = {}   # (yıl, ay) -> defter tutarı
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _apply(self, yil: int, ay: int, kategori: str, tutar: float):
+        bucket = (yil, ay, kategori)
+        self._buckets[bucket] = self._buckets.get(bucket, 0.0) + tutar
+        self._months[(yil, ay)] = self._months.get((yil, ay), 0.0) + tutar
+        limits = self._limits.get((yil, kategori))
+        if limits is not None:
+            limits[2] += tutar
+            self._years[yil][1] += tutar
+
+    def rebuild(self, budgets: Iterable[Tuple], entries: Iterable[Tuple]):
+        """Butce (yıl, kategori, aylık, yıllık, kullanılan) ve defter (yıl, ay, kategori, tutar) satırlarından kur"""
+        limits, years, buckets, months = {}, {}, {}, {}
+        for yil, kategori, aylik, yillik, kullanilan in budgets:
+            limits[(yil, kategori)] = [aylik or 0, yillik or 0, kullanilan or 0]
+            totals = years.setdefault(yil, [0, 0])
+            totals[0] += yillik or 0
+            totals[1] += kullanilan or 0
+        for yil, ay, kategori, tutar in entries:
+            bucket = (yil, ay, kategori)
+            buckets[bucket] = buckets.get(bucket, 0.0) + (tutar or 0)
+            months[(yil, ay)] = months.get((yil, ay), 0.0) + (tutar or 0)
+        with self._lock:
+            self._limits, self._years, self._buckets, self._months = limits, years, buckets, months
+            self.built = True
+
+    def invalidate(self):
+        with self._lock:
+            self.built = False
+
+    def add(self, yil: int, ay: int, kategori: str, tutar: float):
+        """Kaydedilen defter satırını uygula (Butce satırındaki kullanılan da aynı tutarla değişmiştir)"""
+        with self._lock:
+            if self.built:
+                self._apply(yil, ay, kategori, tutar)
+
+    def has_budget(self, yil: int, kategori: str) -> bool:
+        with self._lock:
+            return (yil, kategori) in self._limits
+
+    def spent(self, yil: int, ay: int, kategori: str) -> float:
+        with self._lock:
+            return self._buckets.get((yil, ay, kategori), 0.0)
+
+    def year(self, yil: int) -> Tuple[List[tuple], float, float]:
+        """([(kategori, aylık limit, yıllık limit, kullanılan)], toplam yıllık limit, kullanılan)"""
+        with self._lock:
+            rows = [(kategori, *values) for (y, kategori), values in self._limits.items() if y == yil]
+            toplam, kullanilan = self._years.get(yil, (0, 0))
+        return rows, toplam, kullanilan
+
+    def month(self, yil: int, ay: int) -> Tuple[List[tuple], float, float]:
+        """([(kategori, aylık limit, harcama)], toplam aylık limit, harcama); bütçesiz harcamalar limit 0 ile"""
+        with self._lock:
+            rows = [
+                (kategori, values[0], self._buckets.get((yil, ay, kategori), 0.0))
+                for (y, kategori), values in self._limits.items() if y == yil
+            ]
+            budgeted = {row[0] for row in rows}
+            rows.extend(
+                (kategori, 0, tutar) for (y, a, kategori), tutar in self._buckets.items()
+                if y == yil and a == ay and kategori not in budgeted
+            )
+            harcama = self._months.get((yil, ay), 0.0)
+        return rows, sum(row[1] for row in rows), harcama
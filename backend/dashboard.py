@@ -0,0 +1,41 @@
+"""
+Dashboard hesaplama motoru
+Tüm kutucuklar tek bir tablo görüntüsünden (aynı veri sürümü) ve her tablo
+üzerinde tek geçişle hesaplanır; malzeme kutucukları aynı görüntünün malzeme
+özetinden, sipariş ve talep tabloları birer kez taranarak gelir. Aylık harcama
+hesaplanmaz; /api/analytics/spend ile aynı kaynaktan, harcama küpünden okunur.
+"""
+from typing import Dict
+
+PENDING_ORDER_STATUSES = ("Onay Bekliyor", "Yolda")
+PENDING_REQUEST_STATUS = "Beklemede"
+
+
+def compute_dashboard(summary: dict, tables: Dict[str, list], aylik_harcama: float, yil: int) -> dict:
+    """summary: tables'ın malzeme özeti (material_summary); aylik_harcama: bu ayın satın alma tutarı (SpendCube)"""
+    bekleyen_siparis = sum(1 for row in tables.get("Siparisler", ()) if row[0] and row[4] in PENDING_ORDER_STATUSES)
+
+    bekleyen_talep = sum(1 for row in tables.get("Talepler", ()) if row[0] and row[8] == PENDING_REQUEST_STATUS)
+
+    toplam_butce = kullanilan = 0
+    for row in tables.get("Butce", ()):
+        if row[0] == yil:
+            toplam_butce += row[3] or 0
+            kullanilan += row[4] or 0
+
+    return {
+        "toplam_malzeme": summary["toplam"]["adet"],
+        "toplam_stok_degeri": summary["toplam"]["deger"],
+        "kritik_stok_sayisi": summary["toplam"]["kritik"],
+        "bekleyen_talep_sayisi": bekleyen_talep,
+        "bekleyen_siparis_sayisi": bekleyen_siparis,
+        "kategori_dagilimi": {k: v["adet"] for k, v in summary["kategori"].items()},
+        "aylik_harcama": round(aylik_harcama, 2),
+        "butce_durumu": {
+            "toplam": toplam_butce,
+            "kullanilan": kullanilan,
+            "kalan": toplam_butce - kullanilan,
+            "oran": (kullanilan / toplam_butce * 100) if toplam_butce > 0 else 0
+        }
+    }
+
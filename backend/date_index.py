@@ -0,0 +1,64 @@
+"""
+Hareket tarih indeksi
+Hareketler tablosunun satır sıraları tarih anahtarına göre sıralı tutulur;
+tarih aralığı sorguları ikili arama ile yalnızca aralıktaki satırlara dokunur
+(O(log n + k)). Tablo her kayıtta yeniden oluşturulduğundan indeks eşitlenir:
+hareketler yalnızca eklendiği için mevcut satırlar değişmemişse sadece yeni
+satırlar sıraya yerleştirilir, aksi hâlde indeks baştan kurulur.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Sequence, Tuple
+
+_MAX_SUFFIX = "\uffff"
+
+
+def date_key(value) -> str:
+    """'2025-01-31 10:00' / datetime -> sözlük sırasıyla karşılaştırılabilir anahtar"""
+    return str(value) if value is not None else ""
+
+
+def range_bounds(baslangic: Optional[str], bitis: Optional[str]) -> Tuple[str, Optional[str]]:
+    """Sınırlar önek olarak yorumlanır: bitis='2025-01' Ocak'ın tamamını, '2025-01-31' o günü kapsar"""
+    return (baslangic or ""), (bitis + _MAX_SUFFIX if bitis else None)
+
+
+class MovementDateIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: Sequence[tuple] = ()
+        self._entries: List[Tuple[str, int]] = []  # (tarih anahtarı, satır sırası), sıralı
+        self._keys: List[str] = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _sync(self, rows: Sequence[tuple]):
+        if rows is self._rows:
+            return
+        count = len(self._rows)
+        appended = count and len(rows) >= count and rows[count - 1] == self._rows[count - 1]
+        if appended:
+            for idx in range(count, len(rows)):
+                if rows[idx][0]:
+                    entry = (date_key(rows[idx][0]), idx)
+                    pos = bisect_right(self._entries, entry)
+                    self._entries.insert(pos, entry)
+                    self._keys.insert(pos, entry[0])
+        else:
+            self._entries = sorted((date_key(row[0]), idx) for idx, row in enumerate(rows) if row[0])
+            self._keys = [key for key, _ in self._entries]
+        self._rows = rows
+
+    def between(self, rows: Sequence[tuple], baslangic: Optional[str] = None,
+                bitis: Optional[str] = None, newest_first: bool = False) -> List[tuple]:
+        """rows tablosunun [baslangic, bitis] aralığındaki satırları, tarih sırasıyla"""
+        low, high = range_bounds(baslangic, bitis)
+        with self._lock:
+            self._sync(rows)
+            start = bisect_left(self._keys, low)
+            end = bisect_right(self._keys, high) if high is not None else len(self._keys)
+            selected = self._entries[start:end]
+        if newest_first:
+            selected.reverse()
+        return [rows[idx] for _, idx in selected]
@@ -1,16 +1,76 @@
 import os
 import uuid
 import hashlib
+import threading
+import time
+from collections import deque
+from itertools import zip_longest
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from datetime import datetime
-from typing import List, Optional
+from typing import Callable, List, Optional
 from models import *
+from search_index import MaterialSearchIndex
+from aggregates import UNSPECIFIED, MonthlyAggregates, SpendCube, SupplierKPIs, parse_datetime, parse_order_items
+from pivot import run_pivot
+from dashboard import compute_dashboard
+from material_summary import summarize_materials
+from stock_history import StockHistory, history_path
+from stock_checkpoints import StockCheckpoints, applied_quantity, signed_quantity
+from reorder import LeadTimeModel, build_recommendations, sort_recommendations
+from anomaly import AnomalyDetector, state_path
+from budget_ledger import BudgetLedger, crossed_threshold
+from date_index import MovementDateIndex
+from predictions import ConsumptionModel, build_predictions, sort_predictions
+from metrics import StorageStats
+from snapshot import load_snapshot, save_snapshot
+
+OPTIONAL_SHEETS = ("AuditLog", "Lokasyonlar", "Sayimlar", "ButceHareketleri")
+# Envanter sürümü başına değişen malzeme kodları bu kadar kayıt geriye tutulur
+INVENTORY_LOG_SIZE = 256
 
 class ExcelManager:
-    def __init__(self, file_path: str = "inventory_data.xlsx"):
+    def __init__(self, file_path: str = "inventory_data.xlsx", initialize: bool = True):
         self.file_path = file_path
-        self.ensure_file_exists()
+        self.stats = StorageStats()
+        # Sayfa -> veri satırları; okumalar bu tablolardan yapılır, her kayıtta yenilenir
+        self._tables = None
+        self._tables_lock = threading.Lock()
+        self.tables_source = None   # "snapshot" veya "xlsx"
+        self._snapshot_current = False  # diskteki görüntü tablolarla aynı mı
+        self.ready = False
+        self.warm_seconds = None
+        self._unread_counts = None  # {kullanici: okunmamış sayısı}, ilk ihtiyaçta doldurulur
+        self._notification_lock = threading.Lock()
+        self._notification_listeners: List[Callable] = []
+        self.search_index = MaterialSearchIndex()
+        self.monthly = MonthlyAggregates()  # ay x işlem tipi özeti, ilk ihtiyaçta kurulur
+        self.spend = SpendCube()  # ay x kategori x departman x tedarikçi harcama küpü
+        self.supplier_kpis = SupplierKPIs()  # tedarikçi bazında sipariş/teslim göstergeleri
+        self.movement_index = MovementDateIndex()  # hareket satırları tarih sırasıyla
+        self.anomalies = AnomalyDetector(state_path(file_path))  # çıkışlar için akış istatistikleri
+        self.checkpoints = StockCheckpoints()  # geçmiş tarihli stok için aylık kümülatif net hareket
+        self.budget = BudgetLedger()  # yıl x ay x kategori bütçe kullanımı
+        self.consumption = ConsumptionModel()  # malzeme bazında pencere içi günlük çıkışlar
+        self._predictions = None  # (gün, envanter sürümü, önerilerin tam hesap sürümü, {kod: tahmin}, sıralı liste)
+        self.lead_times = LeadTimeModel()  # malzeme bazında sipariş -> teslim süreleri
+        self._reorder = None      # (gün, envanter sürümü, genel teslim süresi, tam hesap sürümü, {kod: öneri}, sıralı liste)
+        self._dashboard = None    # ((veri sürümü, ay), dashboard)
+        self._material_summary = None  # (veri sürümü, malzeme özeti)
+        self.stock_history = StockHistory(history_path(file_path))  # günlük stok değeri serisi
+        self._history_key = None  # son kaydın (veri sürümü, gün) anahtarı
+        self.data_version = 0     # her kayıtta artar; türetilmiş önbellekler bununla doğrulanır
+        self.inventory_version = 0  # yalnızca malzeme, hareket veya teslim edilmiş sipariş değişince artar
+        self._inventory_log = deque(maxlen=INVENTORY_LOG_SIZE)  # (envanter sürümü, değişen kodlar; None = bilinmiyor)
+        self._user_directory = None  # {username: (şifre hash, User)}, ilk girişte doldurulur
+        self._pending_logins = {}    # {username: "Son Giriş"}, toplu olarak diske yazılır
+        self._user_lock = threading.Lock()
+        self._commit_lock = threading.RLock()
+        self._batch_thread = None   # toplu yazım yapan thread (tek yazıcı)
+        self._batch_wb = None
+        if initialize:
+            self.ensure_file_exists()
+            self._ensure_optional_sheets()
     
     def ensure_file_exists(self):
         """Excel dosyası yoksa oluştur ve başlık satırlarını ekle"""
@@ -28,7 +88,7 @@ class ExcelManager:
             
             # Hareketler
             ws_movements = wb.create_sheet("Hareketler")
-            self._set_headers(ws_movements, ["Tarih", "Malzeme Kodu", "İşlem Tipi", "Miktar", "Tedarikçi/Teslim Alan", "Açıklama", "Sipariş No", "Onaylayan"])
+            self._set_headers(ws_movements, ["Tarih", "Malzeme Kodu", "İşlem Tipi", "Miktar", "Tedarikçi/Teslim Alan", "Açıklama", "Sipariş No", "Onaylayan", "Uygulanan"])
             
             # Tedarikçiler
             ws_suppliers = wb.create_sheet("Tedarikciler")
@@ -52,9 +112,279 @@ class ExcelManager:
             
             # Örnek verileri ekle
             self._add_sample_data(wb)
+            self._ensure_audit_sheet(wb)
+            self._ensure_location_sheet(wb)
+            self._ensure_count_sheet(wb)
             
             wb.save(self.file_path)
     
+    def _ensure_optional_sheets(self):
+        """Sonradan eklenen sayfaları açılışta bir kez oluştur (okuma yolları dosyaya yazmasın)
+
+        Yazıcı kuyruğu çalışırken yalnızca kuyruk üzerinden çağrılmalı; aksi hâlde araya
+        giren bir batch kaydıyla birbirinin değişikliğini ezebilirler.
+        """
+        if all(name in self._load_tables() for name in OPTIONAL_SHEETS):
+            return
+        wb = self._open()
+        self._ensure_audit_sheet(wb)
+        self._ensure_location_sheet(wb)
+        self._ensure_count_sheet(wb)
+        self._ensure_budget_ledger_sheet(wb)
+        self._commit(wb)
+    
+    def warm_up(self):
+        """Açılış: tabloları (görüntüden veya xlsx'ten) ve önbellekleri doldur
+
+        Dosyaya yazmaz; dosya ve sonradan eklenen sayfalar önceden hazırlanmış olmalı
+        (bkz. ensure_file_exists, _ensure_optional_sheets).
+        """
+        started = time.perf_counter()
+        self._load_tables()
+        self._load_user_directory()
+        self._load_unread_counts()
+        if not self.search_index.built:
+            self.rebuild_search_index()
+        if not self.monthly.built:
+            self.rebuild_monthly_stats()
+        if not self.spend.built:
+            self.rebuild_spend_cube()
+        if not self.supplier_kpis.built:
+            self.rebuild_supplier_kpis()
+        self.get_stock_predictions()
+        self.record_stock_history()
+        self.load_anomaly_detector()
+        if not self.budget.built:
+            self.rebuild_budget_ledger()
+        self.save_snapshot()
+        self.warm_seconds = time.perf_counter() - started
+        self.ready = True
+    
+    def save_snapshot(self) -> bool:
+        """Bellekteki tabloları xlsx'in yanına ikili görüntü olarak yaz"""
+        with self._commit_lock:
+            if self._tables is None or self._snapshot_current:
+                return False
+            try:
+                self._snapshot_current = save_snapshot(self.file_path, self._tables)
+            except (OSError, TypeError) as e:
+                print(f"Snapshot yazılamadı: {e}")
+            return self._snapshot_current
+    
+    # ==================== DEPOLAMA ====================
+    
+    def _in_batch(self) -> bool:
+        return self._batch_thread == threading.get_ident()
+    
+    def _open(self):
+        """Çalışma kitabını aç; toplu yazım içindeysek ortak kitabı döndür"""
+        if self._in_batch():
+            if self._batch_wb is None:
+                self._batch_wb = self._load_workbook()
+            return self._batch_wb
+        return self._load_workbook()
+    
+    def _load_workbook(self, read_only: bool = False):
+        """Çalışma kitabını yükle ve yükleme maliyetini kaydet"""
+        started = time.perf_counter()
+        wb = load_workbook(self.file_path, read_only=read_only)
+        self.stats.record_load(os.path.getsize(self.file_path), time.perf_counter() - started,
+                               "read_only" if read_only else "full")
+        return wb
+    
+    def _rows(self, ws):
+        """Başlık hariç satırları döndür ve taranan satır sayısını kaydet"""
+        count = 0
+        try:
+            for row in ws.iter_rows(min_row=2, values_only=True):
+                count += 1
+                yield row
+        finally:
+            self.stats.record_rows(ws.title, count)
+    
+    @staticmethod
+    def _extract_tables(wb) -> dict:
+        return {ws.title: list(ws.iter_rows(min_row=2, values_only=True)) for ws in wb.worksheets}
+    
+    def _load_tables(self) -> dict:
+        """Sayfa tablolarını ilk ihtiyaçta hazırla (güncel görüntü varsa ondan, yoksa xlsx'ten)"""
+        tables = self._tables
+        if tables is not None:
+            return tables
+        with self._tables_lock:
+            if self._tables is None:
+                # Ayrıştırma sırasında araya kayıt girmesin (tablolar dosyayla aynı olmalı)
+                with self._commit_lock:
+                    tables = load_snapshot(self.file_path)
+                    source = "snapshot"
+                    if tables is None:
+                        wb = self._load_workbook(read_only=True)
+                        try:
+                            tables = self._extract_tables(wb)
+                        finally:
+                            wb.close()
+                        source = "xlsx"
+                    self._tables = tables
+                    self.tables_source = source
+                    self._snapshot_current = source == "snapshot"
+            return self._tables
+    
+    def _sheet_rows(self, sheet: str, committed: bool = False):
+        """Sayfanın veri satırları (başlık hariç)
+        
+        Toplu yazım içindeki yazıcı thread'i henüz kaydedilmemiş değişiklikleri görmek
+        için ortak kitabı okur; diğer tüm okumalar (ve committed=True) bellekteki
+        kaydedilmiş tablolardan yapılır.
+        """
+        if self._in_batch() and not committed:
+            wb = self._open()
+            if sheet in wb.sheetnames:
+                yield from self._rows(wb[sheet])
+            return
+        count = 0
+        try:
+            for row in self._load_tables().get(sheet, ()):
+                count += 1
+                yield row
+        finally:
+            self.stats.record_rows(sheet, count)
+    
+    def _release(self, wb):
+        """Değişiklik yapılmadan kitabı bırak"""
+        if wb is not self._batch_wb:
+            wb.close()
+    
+    def _on_commit(self, wb, callback: Callable):
+        """Kitap diske yazıldıktan sonra çalışacak işlem (bellek içi indeks/sayaç güncellemeleri)"""
+        if not hasattr(wb, "_after_commit"):
+            wb._after_commit = []
+        wb._after_commit.append(callback)
+    
+    def _commit(self, wb):
+        """Değişiklikleri kaydet; toplu yazım içinde kayıt batch sonuna ertelenir"""
+        if wb is self._batch_wb:
+            return
+        with self._commit_lock:
+            self._save_atomic(wb)
+            self._refresh_tables(wb)
+            wb.close()
+            self._run_after_commit(wb)
+    
+    def _save_atomic(self, wb):
+        """Önce geçici dosyaya yaz, sonra taşı; okuyucular yarım dosya görmez"""
+        started = time.perf_counter()
+        tmp_path = f"{self.file_path}.tmp"
+        wb.save(tmp_path)
+        os.replace(tmp_path, self.file_path)
+        self.stats.record_save(os.path.getsize(self.file_path), time.perf_counter() - started)
+    
+    def _refresh_tables(self, wb):
+        """Kaydedilen kitaptan tabloları yenile (tablolar henüz yüklenmediyse gerek yok)"""
+        changes = None
+        if self._tables is not None:
+            old = self._tables
+            self._tables = self._extract_tables(wb)
+            self._snapshot_current = False
+            changes = self._inventory_changes(old, self._tables)
+        if changes is None or changes:
+            self._inventory_log.append((self.inventory_version + 1, changes))
+            self.inventory_version += 1
+        # Sürüm tablolardan sonra artar: sürümü okuyup sonra tabloları alan okuyucu
+        # eski tabloları yeni sürümle eşleştiremez (bkz. _tables_snapshot)
+        self.data_version += 1
+    
+    @staticmethod
+    def _inventory_changes(old: dict, new: dict) -> Optional[set]:
+        """İki tablo görüntüsü arasında stok, talep veya tedarik süresi değişen malzeme kodları
+
+        None: değişiklik kod bazında çıkarılamadı (hareket satırı eklenmek dışında değişti).
+        """
+        def same(a, b):
+            # Boş metin hücreleri diske yazılıp yeniden okununca None olur; sayfaya sütun
+            # eklenince eski satırlar da boş hücrelerle uzar
+            return a == b or (a is not None and b is not None
+                              and all((x if x != "" else None) == (y if y != "" else None) for x, y in zip_longest(a, b)))
+        
+        codes = set()
+        before, after = old.get("Hareketler", ()), new.get("Hareketler", ())
+        if len(after) < len(before) or (before and not same(after[len(before) - 1], before[-1])):
+            return None
+        codes.update(row[1] for row in after[len(before):] if row[1])
+        
+        materials = {row[0]: row for row in old.get("Malzemeler", ()) if row[0]}
+        for row in new.get("Malzemeler", ()):
+            if row[0] and not same(materials.pop(row[0], None), row):
+                codes.add(row[0])
+        codes.update(materials)  # silinen malzemeler
+        
+        delivered = OrderStatus.DELIVERED.value
+        orders = {row[0]: row for row in old.get("Siparisler", ()) if row[0]}
+        changed_orders = []
+        for row in new.get("Siparisler", ()):
+            if row[0]:
+                previous = orders.pop(row[0], None)
+                if not same(previous, row):
+                    changed_orders += [previous, row]
+        changed_orders += orders.values()
+        for row in changed_orders:
+            if row is not None and row[4] == delivered:
+                codes.update(kod for kod, _, _ in parse_order_items(row[11]))
+        return codes
+    
+    def _changed_since(self, version: int) -> Optional[set]:
+        """version'dan bu yana değişen malzeme kodları (commit kilidi altında); None: hepsi yeniden hesaplanmalı"""
+        changed = set()
+        expected = version + 1
+        for entry_version, codes in self._inventory_log:
+            if entry_version <= version:
+                continue
+            if entry_version != expected or codes is None:
+                return None
+            changed |= codes
+            expected += 1
+        return changed if expected == self.inventory_version + 1 else None
+    
+    def _tables_snapshot(self):
+        """(veri sürümü, tablolar): tek kayıt anına ait, kilitsiz tutarlı görüntü"""
+        version = self.data_version
+        return version, self._load_tables()
+    
+    def _run_after_commit(self, wb):
+        for callback in getattr(wb, "_after_commit", ()):
+            try:
+                callback()
+            except Exception as e:
+                print(f"After-commit callback failed: {e}")
+    
+    def begin_batch(self):
+        """Bu thread'in sonraki değişikliklerini tek kitapta topla (WriteQueue kullanır)"""
+        self._batch_wb = None
+        self._batch_thread = threading.get_ident()
+    
+    def commit_batch(self) -> bool:
+        """Toplanan değişiklikleri tek kayıtla diske yaz (kayıt yapıldıysa True)"""
+        wb = self._batch_wb
+        self._batch_wb = None
+        self._batch_thread = None
+        if wb is None:
+            return False
+        with self._commit_lock:
+            try:
+                self._save_atomic(wb)
+                self._refresh_tables(wb)
+            finally:
+                wb.close()
+            self._run_after_commit(wb)
+        return True
+    
+    def rollback_batch(self):
+        """Toplanan değişiklikleri at"""
+        wb = self._batch_wb
+        self._batch_wb = None
+        self._batch_thread = None
+        if wb is not None:
+            wb.close()
+    
     def _set_headers(self, ws, headers):
         """Başlık satırını formatla"""
         header_fill = PatternFill(start_color="1F4E79", end_color="1F4E79", fill_type="solid")
@@ -80,6 +410,21 @@ class ExcelManager:
     def _generate_id(self, prefix: str = "") -> str:
         return f"{prefix}{datetime.now().strftime('%Y%m%d%H%M%S')}{str(uuid.uuid4())[:4].upper()}"
     
+    @staticmethod
+    def _stock_status(mevcut: int, min_s: int, max_s: int) -> str:
+        """Stok seviyesine göre durum etiketi"""
+        if mevcut <= min_s:
+            return "Kritik"
+        if mevcut >= max_s:
+            return "Fazla"
+        return "Normal"
+    
+    def iter_sheet_rows(self, sheet: str):
+        """Sayfa satırlarını dosya sırasıyla döndür (bellekteki tablodan, kopyalamadan)"""
+        for row in self._sheet_rows(sheet):
+            if row and row[0]:
+                yield row
+    
     def _add_sample_data(self, wb):
         """Örnek veriler ekle"""
         now = datetime.now().strftime("%Y-%m-%d %H:%M")
@@ -171,39 +516,16 @@ class ExcelManager:
 
     # ==================== KULLANICI İŞLEMLERİ ====================
     
-    def authenticate_user(self, username: str, password: str) -> Optional[User]:
-        """Kullanıcı girişi"""
-        wb = load_workbook(self.file_path)
-        ws = wb["Kullanicilar"]
-        hashed = self._hash_password(password)
-        
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-            if row[0] == username and row[1] == hashed and row[6]:
-                # Son giriş güncelle
-                ws.cell(row=row_idx, column=8, value=datetime.now().strftime("%Y-%m-%d %H:%M"))
-                wb.save(self.file_path)
-                wb.close()
-                return User(
-                    username=row[0],
-                    ad_soyad=row[2],
-                    email=row[3],
-                    departman=row[4],
-                    rol=row[5],
-                    aktif=row[6],
-                    son_giris=datetime.now().strftime("%Y-%m-%d %H:%M")
-                )
-        wb.close()
-        return None
-    
-    def get_all_users(self) -> List[User]:
-        """Tüm kullanıcıları getir"""
-        wb = load_workbook(self.file_path)
-        ws = wb["Kullanicilar"]
-        users = []
+    def _load_user_directory(self) -> dict:
+        """Kullanıcı dizinini bellekte hazırla (create_user sonrası yeniden okunur)"""
+        with self._user_lock:
+            if self._user_directory is not None:
+                return self._user_directory
         
-        for row in ws.iter_rows(min_row=2, values_only=True):
+        directory = {}
+        for row in self._sheet_rows("Kullanicilar"):
             if row[0]:
-                users.append(User(
+                directory[row[0]] = (row[1], User(
                     username=row[0],
                     ad_soyad=row[2],
                     email=row[3],
@@ -212,12 +534,86 @@ class ExcelManager:
                     aktif=row[6],
                     son_giris=row[7] or ""
                 ))
-        wb.close()
-        return users
+        
+        with self._user_lock:
+            if self._user_directory is None:
+                # Henüz diske yazılmamış son giriş zamanlarını koru
+                for username, son_giris in self._pending_logins.items():
+                    if username in directory:
+                        hashed, user = directory[username]
+                        directory[username] = (hashed, user.model_copy(update={"son_giris": son_giris}))
+                self._user_directory = directory
+            return self._user_directory
+    
+    def cache_sizes(self) -> dict:
+        """Bellek içi önbelleklerin kayıt sayıları (metrikler için)"""
+        return {
+            "search_index": len(self.search_index),
+            "user_directory": len(self._user_directory or {}),
+            "unread_counts": len(self._unread_counts or {}),
+            "monthly_aggregates": len(self.monthly),
+            "spend_cube": len(self.spend),
+            "supplier_kpis": len(self.supplier_kpis),
+            "consumption_model": len(self.consumption),
+            "lead_times": len(self.lead_times),
+            "movement_date_index": len(self.movement_index),
+            "stock_history_days": len(self.stock_history),
+            "stock_checkpoints": len(self.checkpoints),
+            "anomaly_detector": len(self.anomalies),
+            "budget_ledger": len(self.budget),
+        }
+    
+    def _invalidate_user_directory(self):
+        with self._user_lock:
+            self._user_directory = None
+    
+    def authenticate_user(self, username: str, password: str) -> Optional[User]:
+        """Kullanıcı girişi (bellek içi dizinden; Son Giriş toplu yazılır)"""
+        directory = self._load_user_directory()
+        entry = directory.get(username)
+        if not entry or entry[0] != self._hash_password(password) or not entry[1].aktif:
+            return None
+        
+        now = datetime.now().strftime("%Y-%m-%d %H:%M")
+        with self._user_lock:
+            user = entry[1].model_copy(update={"son_giris": now})
+            directory[username] = (entry[0], user)
+            self._pending_logins[username] = now
+        return user
+    
+    def pending_login_count(self) -> int:
+        with self._user_lock:
+            return len(self._pending_logins)
+    
+    def flush_last_logins(self) -> int:
+        """Bekleyen Son Giriş güncellemelerini tek kayıtla yaz"""
+        with self._user_lock:
+            pending = dict(self._pending_logins)
+        if not pending:
+            return 0
+        
+        wb = self._open()
+        ws = wb["Kullanicilar"]
+        for row_idx, row in enumerate(self._rows(ws), start=2):
+            if row[0] in pending:
+                ws.cell(row=row_idx, column=8, value=pending[row[0]])
+        
+        def clear_flushed():
+            with self._user_lock:
+                for username, son_giris in pending.items():
+                    if self._pending_logins.get(username) == son_giris:
+                        del self._pending_logins[username]
+        self._on_commit(wb, clear_flushed)
+        self._commit(wb)
+        return len(pending)
+    
+    def get_all_users(self) -> List[User]:
+        """Tüm kullanıcıları getir"""
+        return [user for _, user in self._load_user_directory().values()]
     
     def create_user(self, user: UserCreate) -> User:
         """Yeni kullanıcı oluştur"""
-        wb = load_workbook(self.file_path)
+        wb = self._open()
         ws = wb["Kullanicilar"]
         
         ws.append([
@@ -230,30 +626,22 @@ class ExcelManager:
             user.aktif,
             ""
         ])
-        wb.save(self.file_path)
-        wb.close()
+        self._on_commit(wb, self._invalidate_user_directory)
+        self._commit(wb)
         return User(**user.dict(exclude={'password'}))
 
     # ==================== MALZEME İŞLEMLERİ ====================
     
-    def get_all_materials(self) -> List[Material]:
-        """Tüm malzemeleri getir"""
-        wb = load_workbook(self.file_path)
-        ws = wb["Malzemeler"]
+    def get_all_materials(self, committed: bool = False) -> List[Material]:
+        """Tüm malzemeleri getir (committed: toplu yazım içinde de yalnızca kaydedilmiş satırlar)"""
         materials = []
         
-        for row in ws.iter_rows(min_row=2, values_only=True):
+        for row in self._sheet_rows("Malzemeler", committed=committed):
             if row[0]:
                 mevcut = int(row[4]) if row[4] else 0
                 min_s = int(row[5]) if row[5] else 0
                 max_s = int(row[6]) if row[6] else 100
-                
-                if mevcut <= min_s:
-                    durum = "Kritik"
-                elif mevcut >= max_s:
-                    durum = "Fazla"
-                else:
-                    durum = "Normal"
+                durum = self._stock_status(mevcut, min_s, max_s)
                 
                 materials.append(Material(
                     kod=row[0],
@@ -271,7 +659,6 @@ class ExcelManager:
                     son_sayim=row[12] or "",
                     durum=durum
                 ))
-        wb.close()
         return materials
     
     def get_material_by_code(self, kod: str) -> Optional[Material]:
@@ -290,9 +677,22 @@ class ExcelManager:
                 return m
         return None
     
+    def search_materials(self, query: str, limit: Optional[int] = 20) -> List[Material]:
+        """İndeks üzerinden Türkçe duyarlı malzeme araması (alaka sırasına göre)"""
+        if not self.search_index.built:
+            self.rebuild_search_index()
+        return self.search_index.search(query, limit)
+    
+    def rebuild_search_index(self) -> int:
+        """Arama indeksini kaydedilmiş malzemelerden yeniden kur"""
+        # Okuma ile kurulum arasına kayıt girerse o kaydın upsert'i kaybolur (indeks henüz kurulmamış)
+        with self._commit_lock:
+            self.search_index.rebuild(self.get_all_materials(committed=True))
+        return len(self.search_index)
+    
     def create_material(self, material: MaterialCreate) -> Material:
         """Yeni malzeme ekle"""
-        wb = load_workbook(self.file_path)
+        wb = self._open()
         ws = wb["Malzemeler"]
         now = datetime.now().strftime("%Y-%m-%d %H:%M")
         
@@ -311,16 +711,18 @@ class ExcelManager:
             now,
             now
         ])
-        wb.save(self.file_path)
-        wb.close()
-        return Material(**material.dict(), son_guncelleme=now, son_sayim=now, durum="Normal")
+        created = Material(**material.dict(), son_guncelleme=now, son_sayim=now,
+                           durum=self._stock_status(material.mevcut_stok, material.min_seviye, material.max_seviye))
+        self._on_commit(wb, lambda: self.search_index.upsert(created))
+        self._commit(wb)
+        return created
     
     def update_material(self, kod: str, material: MaterialCreate) -> Optional[Material]:
         """Malzeme güncelle"""
-        wb = load_workbook(self.file_path)
+        wb = self._open()
         ws = wb["Malzemeler"]
         
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+        for row_idx, row in enumerate(self._rows(ws), start=2):
             if row[0] == kod:
                 now = datetime.now().strftime("%Y-%m-%d %H:%M")
                 ws.cell(row=row_idx, column=1, value=material.kod)
@@ -335,79 +737,81 @@ class ExcelManager:
                 ws.cell(row=row_idx, column=10, value=material.barkod)
                 ws.cell(row=row_idx, column=11, value=material.birim_fiyat)
                 ws.cell(row=row_idx, column=12, value=now)
-                wb.save(self.file_path)
-                wb.close()
-                return Material(**material.dict(), son_guncelleme=now, durum="Normal")
-        wb.close()
+                updated = Material(**material.dict(), son_guncelleme=now, son_sayim=row[12] or "",
+                                   durum=self._stock_status(material.mevcut_stok, material.min_seviye, material.max_seviye))
+                self._on_commit(wb, lambda: self.search_index.upsert(updated, old_kod=kod))
+                self._commit(wb)
+                return updated
+        self._release(wb)
         return None
     
     def delete_material(self, kod: str) -> bool:
         """Malzeme sil"""
-        wb = load_workbook(self.file_path)
+        wb = self._open()
         ws = wb["Malzemeler"]
         
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+        for row_idx, row in enumerate(self._rows(ws), start=2):
             if row[0] == kod:
                 ws.delete_rows(row_idx)
-                wb.save(self.file_path)
-                wb.close()
+                self._on_commit(wb, lambda: self.search_index.remove(kod))
+                self._commit(wb)
                 return True
-        wb.close()
+        self._release(wb)
         return False
 
     # ==================== STOK HAREKETLERİ ====================
     
-    def get_all_movements(self) -> List[StockMovement]:
-        """Tüm hareketleri getir"""
-        wb = load_workbook(self.file_path)
-        ws = wb["Hareketler"]
-        movements = []
-        
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            if row[0]:
-                movements.append(StockMovement(
-                    tarih=str(row[0]),
-                    malzeme_kodu=row[1],
-                    islem_tipi=row[2],
-                    miktar=row[3] or 0,
-                    tedarikci_teslim_alan=row[4] or "",
-                    aciklama=row[5] or "",
-                    siparis_no=row[6] or "",
-                    onaylayan=row[7] or ""
-                ))
-        wb.close()
-        return list(reversed(movements))
+    def get_all_movements(self, baslangic: str = None, bitis: str = None) -> List[StockMovement]:
+        """Hareketleri yeniden eskiye getir (isteğe bağlı tarih aralığı; sınırlar önek olarak)"""
+        return [
+            StockMovement(
+                tarih=str(row[0]),
+                malzeme_kodu=row[1],
+                islem_tipi=row[2],
+                miktar=row[3] or 0,
+                tedarikci_teslim_alan=row[4] or "",
+                aciklama=row[5] or "",
+                siparis_no=row[6] or "",
+                onaylayan=row[7] or ""
+            )
+            for row in self.movement_rows_between(baslangic, bitis, newest_first=True)
+        ]
+    
+    def movement_rows_between(self, baslangic: str = None, bitis: str = None,
+                              newest_first: bool = False) -> List[tuple]:
+        """Tarih aralığındaki kaydedilmiş hareket satırları; tarih indeksinde ikili arama ile"""
+        rows = self._load_tables().get("Hareketler", ())
+        selected = self.movement_index.between(rows, baslangic, bitis, newest_first)
+        self.stats.record_rows("Hareketler", len(selected))
+        return selected
     
     def create_movement(self, movement: StockMovementCreate) -> StockMovement:
         """Yeni hareket ekle ve stok güncelle"""
-        wb = load_workbook(self.file_path)
+        wb = self._open()
         now = datetime.now().strftime("%Y-%m-%d %H:%M")
         
-        # Hareketi ekle
-        ws_movements = wb["Hareketler"]
-        ws_movements.append([
-            now,
-            movement.malzeme_kodu,
-            movement.islem_tipi.value,
-            movement.miktar,
-            movement.tedarikci_teslim_alan,
-            movement.aciklama,
-            movement.siparis_no,
-            movement.onaylayan
-        ])
-        
         # Stoku güncelle
+        birim_fiyat = 0
+        kategori = ""
+        uygulanan = movement.miktar  # çıkış sıfırda kırpılırsa stoktan gerçekten düşen miktar
         ws_materials = wb["Malzemeler"]
-        for row_idx, row in enumerate(ws_materials.iter_rows(min_row=2, values_only=True), start=2):
+        for row_idx, row in enumerate(self._rows(ws_materials), start=2):
             if row[0] == movement.malzeme_kodu:
+                birim_fiyat = row[10] or 0
+                kategori = row[2] or ""
                 current_stock = row[4] or 0
                 if movement.islem_tipi == MovementType.GIRIS:
                     new_stock = current_stock + movement.miktar
                 else:
                     new_stock = max(0, current_stock - movement.miktar)
+                    uygulanan = current_stock - new_stock
                 
                 ws_materials.cell(row=row_idx, column=5, value=new_stock)
                 ws_materials.cell(row=row_idx, column=12, value=now)
+                durum = self._stock_status(new_stock, row[5] or 0, row[6] or 100)
+                self._on_commit(wb, lambda: self.search_index.update_document(
+                    movement.malzeme_kodu, mevcut_stok=new_stock, son_guncelleme=now, durum=durum
+                ))
                 
                 # Kritik stok kontrolü
                 min_level = row[5] or 0
@@ -421,19 +825,57 @@ class ExcelManager:
                     ))
                 break
         
-        wb.save(self.file_path)
-        wb.close()
+        # Hareketi ekle
+        ws_movements = wb["Hareketler"]
+        if ws_movements.cell(row=1, column=9).value is None:
+            ws_movements.cell(row=1, column=9, value="Uygulanan")  # sütundan önce oluşturulmuş dosyalar
+        ws_movements.append([
+            now,
+            movement.malzeme_kodu,
+            movement.islem_tipi.value,
+            movement.miktar,
+            movement.tedarikci_teslim_alan,
+            movement.aciklama,
+            movement.siparis_no,
+            movement.onaylayan,
+            uygulanan
+        ])
+        
+        self._on_commit(wb, lambda: self.monthly.add(now, movement.islem_tipi.value, movement.miktar, birim_fiyat))
+        self._on_commit(wb, lambda: self.spend.add_movement(
+            now, movement.islem_tipi.value, movement.miktar, movement.tedarikci_teslim_alan,
+            movement.siparis_no, kategori, birim_fiyat
+        ))
+        # Olağandışı çıkış: kayıttan önceki istatistiklere göre değerlendirilir
+        if movement.islem_tipi == MovementType.CIKIS:
+            anomalies = self.anomalies.check(movement.malzeme_kodu, movement.tedarikci_teslim_alan, movement.miktar)
+            if anomalies:
+                detay = ", ".join(
+                    f"{a['tur']} ortalaması {a['ortalama']:.1f} ({a['ornek']} çıkış)" for a in anomalies
+                )
+                kim = movement.tedarikci_teslim_alan or "Bilinmeyen birim"
+                self._create_notification_internal(wb, NotificationCreate(
+                    kullanici="admin",
+                    tip=NotificationType.ANOMALY,
+                    baslik=f"{movement.malzeme_kodu} için olağandışı çıkış: {movement.miktar}",
+                    mesaj=f"{kim} - {detay}",
+                    link="/movements"
+                ))
+        self._on_commit(wb, lambda: self.anomalies.add(
+            movement.malzeme_kodu, movement.islem_tipi.value, movement.miktar, movement.tedarikci_teslim_alan
+        ))
+        self._on_commit(wb, lambda: self.checkpoints.add(now, movement.malzeme_kodu, movement.islem_tipi.value, uygulanan))
+        self._on_commit(wb, lambda: self.consumption.add(now, movement.malzeme_kodu, movement.islem_tipi.value, movement.miktar))
+        self._commit(wb)
         return StockMovement(**movement.dict(), tarih=now)
 
     # ==================== TEDARİKÇİ İŞLEMLERİ ====================
     
     def get_all_suppliers(self) -> List[Supplier]:
         """Tüm tedarikçileri getir"""
-        wb = load_workbook(self.file_path)
-        ws = wb["Tedarikciler"]
         suppliers = []
         
-        for row in ws.iter_rows(min_row=2, values_only=True):
+        for row in self._sheet_rows("Tedarikciler"):
             if row[0]:
                 suppliers.append(Supplier(
                     kod=row[0],
@@ -449,7 +891,6 @@ class ExcelManager:
                     toplam_siparis=row[10] or 0,
                     aktif=row[11] if row[11] is not None else True
                 ))
-        wb.close()
         return suppliers
     
     def get_supplier_by_code(self, kod: str) -> Optional[Supplier]:
@@ -462,7 +903,7 @@ class ExcelManager:
     
     def create_supplier(self, supplier: SupplierCreate) -> Supplier:
         """Yeni tedarikçi ekle"""
-        wb = load_workbook(self.file_path)
+        wb = self._open()
         ws = wb["Tedarikciler"]
         
         ws.append([
@@ -479,16 +920,15 @@ class ExcelManager:
             0,
             True
         ])
-        wb.save(self.file_path)
-        wb.close()
+        self._commit(wb)
         return Supplier(**supplier.dict(), son_siparis="", toplam_siparis=0, aktif=True)
     
     def update_supplier(self, kod: str, supplier: SupplierCreate) -> Optional[Supplier]:
         """Tedarikçi güncelle"""
-        wb = load_workbook(self.file_path)
+        wb = self._open()
         ws = wb["Tedarikciler"]
         
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+        for row_idx, row in enumerate(self._rows(ws), start=2):
             if row[0] == kod:
                 ws.cell(row=row_idx, column=1, value=supplier.kod)
                 ws.cell(row=row_idx, column=2, value=supplier.ad)
@@ -499,35 +939,31 @@ class ExcelManager:
                 ws.cell(row=row_idx, column=7, value=supplier.kategori)
                 ws.cell(row=row_idx, column=8, value=supplier.puan)
                 ws.cell(row=row_idx, column=9, value=supplier.notlar)
-                wb.save(self.file_path)
-                wb.close()
+                self._commit(wb)
                 return Supplier(**supplier.dict(), son_siparis=row[9] or "", toplam_siparis=row[10] or 0, aktif=True)
-        wb.close()
+        self._release(wb)
         return None
     
     def delete_supplier(self, kod: str) -> bool:
         """Tedarikçi sil"""
-        wb = load_workbook(self.file_path)
+        wb = self._open()
         ws = wb["Tedarikciler"]
         
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+        for row_idx, row in enumerate(self._rows(ws), start=2):
             if row[0] == kod:
                 ws.delete_rows(row_idx)
-                wb.save(self.file_path)
-                wb.close()
+                self._commit(wb)
                 return True
-        wb.close()
+        self._release(wb)
         return False
 
     # ==================== SİPARİŞ İŞLEMLERİ ====================
     
     def get_all_orders(self) -> List[Order]:
         """Tüm siparişleri getir"""
-        wb = load_workbook(self.file_path)
-        ws = wb["Siparisler"]
         orders = []
         
-        for row in ws.iter_rows(min_row=2, values_only=True):
+        for row in self._sheet_rows("Siparisler"):
             if row[0]:
                 # Kalemleri parse et
                 kalemler = []
@@ -557,12 +993,11 @@ class ExcelManager:
                     notlar=row[10] or "",
                     kalemler=kalemler
                 ))
-        wb.close()
         return list(reversed(orders))
     
     def create_order(self, order: OrderCreate) -> Order:
         """Yeni sipariş oluştur"""
-        wb = load_workbook(self.file_path)
+        wb = self._open()
         ws = wb["Siparisler"]
         now = datetime.now().strftime("%Y-%m-%d %H:%M")
         siparis_no = self._generate_id("SIP")
@@ -580,13 +1015,21 @@ class ExcelManager:
             toplam,
             order.olusturan,
             "",
-            "",
+            order.tahmini_teslim,
             "",
             order.notlar,
             kalem_str
         ])
-        wb.save(self.file_path)
-        wb.close()
+        
+        # Tedarikçinin son sipariş tarihi ve sipariş sayısı
+        ws_suppliers = wb["Tedarikciler"]
+        for row_idx, row in enumerate(self._rows(ws_suppliers), start=2):
+            if row[0] == order.tedarikci_kodu:
+                ws_suppliers.cell(row=row_idx, column=10, value=now)
+                ws_suppliers.cell(row=row_idx, column=11, value=(row[10] or 0) + 1)
+                break
+        self._on_commit(wb, lambda: self.supplier_kpis.add_order(order.tedarikci_kodu, now, toplam))
+        self._commit(wb)
         
         return Order(
             siparis_no=siparis_no,
@@ -597,26 +1040,58 @@ class ExcelManager:
             notlar=order.notlar,
             toplam_tutar=toplam,
             olusturan=order.olusturan,
+            tahmini_teslim=order.tahmini_teslim,
             durum=OrderStatus.PENDING
         )
     
     def update_order_status(self, siparis_no: str, durum: OrderStatus, onaylayan: str = "") -> Optional[Order]:
         """Sipariş durumu güncelle"""
-        wb = load_workbook(self.file_path)
+        wb = self._open()
         ws = wb["Siparisler"]
         now = datetime.now().strftime("%Y-%m-%d %H:%M")
         
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+        for row_idx, row in enumerate(self._rows(ws), start=2):
             if row[0] == siparis_no:
                 ws.cell(row=row_idx, column=5, value=durum.value)
                 if onaylayan:
                     ws.cell(row=row_idx, column=8, value=onaylayan)
                 if durum == OrderStatus.DELIVERED:
                     ws.cell(row=row_idx, column=10, value=now)
-                wb.save(self.file_path)
-                wb.close()
+                
+                # Harcama küpü ve tedarikçi göstergeleri: teslim edilen sipariş teslim ayına satın
+                # alma olarak eklenir; teslim geri alınır ya da tarihi değişirse eski kayıt düşülür
+                was_delivered = row[4] == OrderStatus.DELIVERED.value
+                if was_delivered or durum == OrderStatus.DELIVERED:
+                    items = parse_order_items(row[11])
+                    categories = {r[0]: r[2] or "" for r in self._rows(wb["Malzemeler"]) if r[0]}
+                    tedarikci_kodu, tedarikci = row[2] or "", row[3] or ""
+                    tarih, tahmini, eski_teslim = row[1], row[8], row[9]
+                    kodlar = [kod for kod, _, _ in items]
+                    # Bütçe defteri: teslim ayına kategori bazında borç, teslim geri alınırsa aynı aya alacak
+                    tutarlar = {}
+                    for kod, miktar, fiyat in items:
+                        kategori = categories.get(kod) or UNSPECIFIED
+                        tutarlar[kategori] = tutarlar.get(kategori, 0) + miktar * fiyat
+                    if was_delivered:
+                        eski = parse_datetime(eski_teslim or tarih)
+                        if eski is not None:
+                            for kategori, tutar in tutarlar.items():
+                                self._budget_entry(wb, eski.year, eski.month, kategori, -tutar,
+                                                   "Sipariş", f"{siparis_no} teslimi geri alındı")
+                        self._on_commit(wb, lambda: self.spend.add_order(eski_teslim or tarih, tedarikci, items, categories, -1))
+                        self._on_commit(wb, lambda: self.supplier_kpis.add_delivery(tedarikci_kodu, tarih, tahmini, eski_teslim, -1))
+                        self._on_commit(wb, lambda: self.lead_times.add(tarih, eski_teslim, kodlar, -1))
+                    if durum == OrderStatus.DELIVERED:
+                        teslim = datetime.now()
+                        for kategori, tutar in tutarlar.items():
+                            self._budget_entry(wb, teslim.year, teslim.month, kategori, tutar,
+                                               "Sipariş", f"{siparis_no} teslim edildi")
+                        self._on_commit(wb, lambda: self.spend.add_order(now, tedarikci, items, categories))
+                        self._on_commit(wb, lambda: self.supplier_kpis.add_delivery(tedarikci_kodu, tarih, tahmini, now))
+                        self._on_commit(wb, lambda: self.lead_times.add(tarih, now, kodlar))
+                self._commit(wb)
                 return self.get_order_by_no(siparis_no)
-        wb.close()
+        self._release(wb)
         return None
     
     def get_order_by_no(self, siparis_no: str) -> Optional[Order]:
@@ -631,11 +1106,9 @@ class ExcelManager:
     
     def get_all_requests(self) -> List[Request]:
         """Tüm talepleri getir"""
-        wb = load_workbook(self.file_path)
-        ws = wb["Talepler"]
         requests = []
         
-        for row in ws.iter_rows(min_row=2, values_only=True):
+        for row in self._sheet_rows("Talepler"):
             if row[0]:
                 requests.append(Request(
                     talep_no=row[0],
@@ -652,12 +1125,11 @@ class ExcelManager:
                     red_nedeni=row[11] or "",
                     aciklama=row[12] or ""
                 ))
-        wb.close()
         return list(reversed(requests))
     
     def create_request(self, request: RequestCreate) -> Request:
         """Yeni talep oluştur"""
-        wb = load_workbook(self.file_path)
+        wb = self._open()
         ws = wb["Talepler"]
         now = datetime.now().strftime("%Y-%m-%d %H:%M")
         talep_no = self._generate_id("TLP")
@@ -687,8 +1159,7 @@ class ExcelManager:
             link="/requests"
         ))
         
-        wb.save(self.file_path)
-        wb.close()
+        self._commit(wb)
         
         return Request(
             talep_no=talep_no,
@@ -705,11 +1176,11 @@ class ExcelManager:
     
     def update_request_status(self, talep_no: str, durum: RequestStatus, onaylayan: str = "", red_nedeni: str = "") -> Optional[Request]:
         """Talep durumu güncelle"""
-        wb = load_workbook(self.file_path)
+        wb = self._open()
         ws = wb["Talepler"]
         now = datetime.now().strftime("%Y-%m-%d %H:%M")
         
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+        for row_idx, row in enumerate(self._rows(ws), start=2):
             if row[0] == talep_no:
                 ws.cell(row=row_idx, column=9, value=durum.value)
                 ws.cell(row=row_idx, column=10, value=onaylayan)
@@ -736,10 +1207,9 @@ class ExcelManager:
                         link="/requests"
                     ))
                 
-                wb.save(self.file_path)
-                wb.close()
+                self._commit(wb)
                 return self.get_request_by_no(talep_no)
-        wb.close()
+        self._release(wb)
         return None
     
     def get_request_by_no(self, talep_no: str) -> Optional[Request]:
@@ -756,29 +1226,39 @@ class ExcelManager:
 
     # ==================== BÜTÇE İŞLEMLERİ ====================
     
+    def rebuild_budget_ledger(self) -> int:
+        """Bütçe defterini Butce ve ButceHareketleri sayfalarından yeniden kur"""
+        with self._commit_lock:
+            self.budget.rebuild(
+                ((row[0], row[1], row[2], row[3], row[4]) for row in self._sheet_rows("Butce", committed=True) if row[0]),
+                (
+                    (row[1], row[2], row[3], row[4])
+                    for row in self._sheet_rows("ButceHareketleri", committed=True) if row[0]
+                )
+            )
+        return len(self.budget)
+    
+    def _ensure_budget(self):
+        if not self.budget.built:
+            self.rebuild_budget_ledger()
+    
     def get_budget_summary(self, yil: int = None) -> BudgetSummary:
-        """Bütçe özeti"""
+        """Bütçe özeti (defterdeki yıl toplamlarından)"""
         if yil is None:
             yil = datetime.now().year
-            
-        wb = load_workbook(self.file_path)
-        ws = wb["Butce"]
-        budgets = []
-        
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            if row[0] == yil:
-                budgets.append(Budget(
-                    yil=row[0],
-                    kategori=row[1],
-                    aylik_limit=row[2] or 0,
-                    yillik_limit=row[3] or 0,
-                    kullanilan=row[4] or 0,
-                    kalan=row[5] or 0
-                ))
-        wb.close()
-        
-        toplam = sum(b.yillik_limit for b in budgets)
-        kullanilan = sum(b.kullanilan for b in budgets)
+        self._ensure_budget()
+        rows, toplam, kullanilan = self.budget.year(yil)
+        budgets = [
+            Budget(
+                yil=yil,
+                kategori=kategori,
+                aylik_limit=aylik,
+                yillik_limit=yillik,
+                kullanilan=used,
+                kalan=yillik - used
+            )
+            for kategori, aylik, yillik, used in rows
+        ]
         
         return BudgetSummary(
             yil=yil,
@@ -789,53 +1269,137 @@ class ExcelManager:
             kategoriler=budgets
         )
     
-    def update_budget(self, yil: int, kategori: str, harcama: float):
-        """Bütçe kullanımı güncelle"""
-        wb = load_workbook(self.file_path)
-        ws = wb["Butce"]
+    def get_budget_month(self, yil: int = None, ay: int = None) -> dict:
+        """Tek ayın kategori bazında aylık limit ve defter harcaması"""
+        now = datetime.now()
+        yil = yil or now.year
+        ay = ay or now.month
+        self._ensure_budget()
+        rows, limit, harcama = self.budget.month(yil, ay)
+        return {
+            "yil": yil,
+            "ay": ay,
+            "aylik_limit": limit,
+            "harcama": round(harcama, 2),
+            "kalan": round(limit - harcama, 2),
+            "oran": round(harcama / limit * 100, 1) if limit > 0 else 0,
+            "kategoriler": [
+                {
+                    "kategori": kategori,
+                    "aylik_limit": aylik,
+                    "harcama": round(tutar, 2),
+                    "kalan": round(aylik - tutar, 2),
+                    "oran": round(tutar / aylik * 100, 1) if aylik > 0 else 0,
+                }
+                for kategori, aylik, tutar in rows
+            ],
+        }
+    
+    def _budget_entry(self, wb, yil: int, ay: int, kategori: str, tutar: float, kaynak: str, aciklama: str = ""):
+        """Deftere borç (tutar > 0) / alacak kaydı yaz, Butce satırını güncelle, aşılan eşikleri bildir"""
+        self._ensure_budget()
+        # Aynı toplu yazımdaki, henüz deftere işlenmemiş kayıtlar
+        if not hasattr(wb, "_budget_pending"):
+            wb._budget_pending = {}
+        bucket = (yil, ay, kategori)
+        ay_once = self.budget.spent(yil, ay, kategori) + wb._budget_pending.get(bucket, 0.0)
+        wb._budget_pending[bucket] = wb._budget_pending.get(bucket, 0.0) + tutar
         
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+        self._ensure_budget_ledger_sheet(wb).append(
+            [datetime.now().strftime("%Y-%m-%d %H:%M"), yil, ay, kategori, tutar, kaynak, aciklama]
+        )
+        self._on_commit(wb, lambda: self.budget.add(yil, ay, kategori, tutar))
+        
+        ws = wb["Butce"]
+        for row_idx, row in enumerate(self._rows(ws), start=2):
             if row[0] == yil and row[1] == kategori:
-                kullanilan = (row[4] or 0) + harcama
-                kalan = (row[3] or 0) - kullanilan
+                aylik, yillik, yil_once = row[2] or 0, row[3] or 0, row[4] or 0
+                kullanilan = yil_once + tutar
+                kalan = yillik - kullanilan
                 ws.cell(row=row_idx, column=5, value=kullanilan)
                 ws.cell(row=row_idx, column=6, value=kalan)
                 
-                # Limit aşımı kontrolü
-                if kalan < 0:
+                # Artımlı eşik kontrolü: yalnızca bu kayıtla ilk kez aşılan eşikler
+                for donem, once, limit in ((f"{ay:02d}/{yil} aylık", ay_once, aylik), (f"{yil} yıllık", yil_once, yillik)):
+                    sonra = once + tutar
+                    oran = crossed_threshold(once, sonra, limit)
+                    if oran is None:
+                        continue
+                    if oran >= 1:
+                        baslik = f"{kategori} {donem} bütçe limiti aşıldı!"
+                        mesaj = f"Aşım miktarı: {sonra - limit:.2f} TL"
+                    else:
+                        baslik = f"{kategori} {donem} bütçesinin %{oran * 100:.0f}'i kullanıldı"
+                        mesaj = f"Kullanılan: {sonra:.2f} / {limit:.2f} TL"
                     self._create_notification_internal(wb, NotificationCreate(
                         kullanici="admin",
                         tip=NotificationType.BUDGET_WARNING,
-                        baslik=f"{kategori} bütçe limiti aşıldı!",
-                        mesaj=f"Aşım miktarı: {abs(kalan):.2f} TL",
+                        baslik=baslik,
+                        mesaj=mesaj,
                         link="/budget"
                     ))
                 break
-        
-        wb.save(self.file_path)
-        wb.close()
+    
+    def update_budget(self, yil: int, kategori: str, harcama: float, ay: Optional[int] = None):
+        """Bütçe kullanımını elle güncelle (ay defter kaydı olarak; verilmezse içinde bulunulan
+        yıl için bu ay, diğer yıllar için Aralık)"""
+        self._ensure_budget()
+        if not self.budget.has_budget(yil, kategori):
+            return
+        if ay is None:
+            now = datetime.now()
+            ay = now.month if yil == now.year else 12
+        wb = self._open()
+        self._budget_entry(wb, yil, ay, kategori, harcama, "Manuel")
+        self._commit(wb)
 
     # ==================== BİLDİRİM İŞLEMLERİ ====================
     
-    def _create_notification_internal(self, wb, notification: NotificationCreate):
-        """İç kullanım için bildirim oluştur (wb açık olmalı)"""
-        ws = wb["Bildirimler"]
-        now = datetime.now().strftime("%Y-%m-%d %H:%M")
+    def add_notification_listener(self, listener: Callable):
+        """Bildirim olaylarına abone ol: listener(kullanici, notification_or_None)"""
+        self._notification_listeners.append(listener)
+    
+    def _emit_notification(self, kullanici: str, notification: Optional[Notification] = None):
+        for listener in self._notification_listeners:
+            try:
+                listener(kullanici, notification)
+            except Exception as e:
+                print(f"Notification listener failed: {e}")
+    
+    def _load_unread_counts(self) -> dict:
+        """Kullanıcı bazlı okunmamış sayaçları (tek tarama ile) hazırla"""
+        with self._notification_lock:
+            if self._unread_counts is not None:
+                return self._unread_counts
         
-        ws.append([
-            self._generate_id("BLD"),
-            now,
-            notification.kullanici,
-            notification.tip.value,
-            notification.baslik,
-            notification.mesaj,
-            notification.link,
-            False
-        ])
+        # Kayıt ile sayaç güncellemesi arasına düşmemek için commit kilidi altında say
+        counts = {}
+        with self._commit_lock:
+            for row in self._sheet_rows("Bildirimler", committed=True):
+                if row and row[0] and not row[7]:
+                    counts[row[2]] = counts.get(row[2], 0) + 1
+        
+        with self._notification_lock:
+            if self._unread_counts is None:
+                self._unread_counts = counts
+            return self._unread_counts
     
-    def create_notification(self, notification: NotificationCreate) -> Notification:
-        """Bildirim oluştur"""
-        wb = load_workbook(self.file_path)
+    def _adjust_unread(self, kullanici: str, delta: int):
+        self._load_unread_counts()
+        with self._notification_lock:
+            self._unread_counts[kullanici] = max(0, self._unread_counts.get(kullanici, 0) + delta)
+    
+    def get_unread_count(self, username: str) -> int:
+        """Okunmamış bildirim sayısı ("all" bildirimleri dahil)"""
+        counts = self._load_unread_counts()
+        with self._notification_lock:
+            count = counts.get(username, 0)
+            if username != "all":
+                count += counts.get("all", 0)
+            return count
+    
+    def _create_notification_internal(self, wb, notification: NotificationCreate) -> Notification:
+        """İç kullanım için bildirim oluştur (wb açık olmalı)"""
         ws = wb["Bildirimler"]
         now = datetime.now().strftime("%Y-%m-%d %H:%M")
         notif_id = self._generate_id("BLD")
@@ -850,10 +1414,8 @@ class ExcelManager:
             notification.link,
             False
         ])
-        wb.save(self.file_path)
-        wb.close()
         
-        return Notification(
+        created = Notification(
             id=notif_id,
             tarih=now,
             kullanici=notification.kullanici,
@@ -863,14 +1425,25 @@ class ExcelManager:
             link=notification.link,
             okundu=False
         )
+        
+        def publish():
+            self._adjust_unread(notification.kullanici, 1)
+            self._emit_notification(notification.kullanici, created)
+        self._on_commit(wb, publish)
+        return created
+    
+    def create_notification(self, notification: NotificationCreate) -> Notification:
+        """Bildirim oluştur"""
+        wb = self._open()
+        created = self._create_notification_internal(wb, notification)
+        self._commit(wb)
+        return created
     
     def get_user_notifications(self, username: str) -> List[Notification]:
         """Kullanıcı bildirimlerini getir"""
-        wb = load_workbook(self.file_path)
-        ws = wb["Bildirimler"]
         notifications = []
         
-        for row in ws.iter_rows(min_row=2, values_only=True):
+        for row in self._sheet_rows("Bildirimler"):
             if row[2] == username or row[2] == "all":
                 notifications.append(Notification(
                     id=row[0],
@@ -882,21 +1455,26 @@ class ExcelManager:
                     link=row[6] or "",
                     okundu=row[7] or False
                 ))
-        wb.close()
         return list(reversed(notifications))
     
     def mark_notification_read(self, notif_id: str) -> bool:
         """Bildirimi okundu olarak işaretle"""
-        wb = load_workbook(self.file_path)
+        wb = self._open()
         ws = wb["Bildirimler"]
         
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+        for row_idx, row in enumerate(self._rows(ws), start=2):
             if row[0] == notif_id:
                 ws.cell(row=row_idx, column=8, value=True)
-                wb.save(self.file_path)
-                wb.close()
+                if not row[7]:
+                    kullanici = row[2]
+                    
+                    def publish():
+                        self._adjust_unread(kullanici, -1)
+                        self._emit_notification(kullanici)
+                    self._on_commit(wb, publish)
+                self._commit(wb)
                 return True
-        wb.close()
+        self._release(wb)
         return False
 
     # ==================== RAPORLAMA ====================
@@ -906,64 +1484,83 @@ class ExcelManager:
         materials = self.get_all_materials()
         return [m for m in materials if m.mevcut_stok <= m.min_seviye]
     
+    def get_material_summary(self) -> dict:
+        """Kategori / lokasyon / durum bazında malzeme özeti (bkz. material_summary.py)"""
+        version, tables = self._tables_snapshot()
+        return self._summary_for(version, tables)
+    
+    def _summary_for(self, version: int, tables: dict) -> dict:
+        cached = self._material_summary
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        rows = tables.get("Malzemeler", ())
+        summary = summarize_materials(rows, self._stock_status)
+        self.stats.record_rows("Malzemeler", len(rows))
+        self._material_summary = (version, summary)
+        return summary
+    
     def get_category_distribution(self) -> dict:
         """Kategori bazlı dağılım"""
-        materials = self.get_all_materials()
-        distribution = {}
-        for m in materials:
-            cat = m.kategori
-            if cat not in distribution:
-                distribution[cat] = 0
-            distribution[cat] += 1
-        return distribution
+        return {k: v["adet"] for k, v in self.get_material_summary()["kategori"].items()}
     
     def get_total_stock_value(self) -> float:
         """Toplam stok değeri"""
-        materials = self.get_all_materials()
-        return sum(m.mevcut_stok * m.birim_fiyat for m in materials)
+        return self.get_material_summary()["toplam"]["deger"]
     
     def get_dashboard_stats(self, username: str = None) -> dict:
-        """Dashboard istatistikleri"""
-        materials = self.get_all_materials()
-        movements = self.get_all_movements()
-        requests = self.get_pending_requests()
-        orders = [o for o in self.get_all_orders() if o.durum in ["Onay Bekliyor", "Yolda"]]
-        budget = self.get_budget_summary()
+        """Dashboard istatistikleri (tek tablo görüntüsünden; veri değişene kadar önbellekten)"""
+        now = datetime.now()
+        ay = now.strftime("%Y-%m")
+        version, tables = self._tables_snapshot()
+        cached = self._dashboard
+        if cached is not None and cached[0] == (version, ay):
+            return cached[1]
         
-        return {
-            "toplam_malzeme": len(materials),
-            "toplam_stok_degeri": self.get_total_stock_value(),
-            "kritik_stok_sayisi": len(self.get_critical_stock_materials()),
-            "bekleyen_talep_sayisi": len(requests),
-            "bekleyen_siparis_sayisi": len(orders),
-            "kategori_dagilimi": self.get_category_distribution(),
-            "aylik_harcama": budget.kullanilan / 12 if budget.kullanilan else 0,
-            "butce_durumu": {
-                "toplam": budget.toplam_butce,
-                "kullanilan": budget.kullanilan,
-                "kalan": budget.kalan,
-                "oran": budget.oran
-            }
-        }
+        # Aylık harcama harcama küpünden; küp kayıt sonrası güncellendiğinden görüntüyle
+        # aynı sürüme ait olması için ikisi commit kilidi altında birlikte okunur
+        with self._commit_lock:
+            version, tables = self._tables_snapshot()
+            harcama = self.get_spend((), None, ay, ay)[0]["satin_alma"]
+        summary = self._summary_for(version, tables)
+        stats = compute_dashboard(summary, tables, harcama, now.year)
+        for sheet in ("Siparisler", "Talepler", "Butce"):
+            self.stats.record_rows(sheet, len(tables.get(sheet, ())))
+        self._dashboard = ((version, ay), stats)
+        return stats
     
     def get_department_consumption(self, departman: str = None) -> List[dict]:
         """Departman tüketim raporu"""
-        movements = [m for m in self.get_all_movements() if m.islem_tipi == "Çıkış"]
-        
+        # Teslim alanı boş çıkışlar "" anahtarıyla gruplanır ve yalnızca çıktıda "Bilinmiyor"
+        # olarak adlandırılır; gerçek "Bilinmiyor" departmanıyla aynı gruba düşmez.
+        # Departman filtresi görünen ada uygulanır.
+        rows = self.pivot("hareket", ["departman", "malzeme"], ["miktar"],
+                          {"islem_tipi": MovementType.CIKIS.value})
         dept_data = {}
-        for m in movements:
-            dept = m.tedarikci_teslim_alan or "Bilinmiyor"
-            if departman and dept != departman:
+        for row in rows:
+            if departman and (row["departman"] or "Bilinmiyor") != departman:
                 continue
-            if dept not in dept_data:
-                dept_data[dept] = {"miktar": 0, "kalem": set()}
-            dept_data[dept]["miktar"] += m.miktar
-            dept_data[dept]["kalem"].add(m.malzeme_kodu)
+            data = dept_data.setdefault(row["departman"], {"miktar": 0, "kalem": 0})
+            data["miktar"] += row["miktar"]
+            data["kalem"] += 1
         
         return [
-            {"departman": k, "toplam_miktar": v["miktar"], "kalem_sayisi": len(v["kalem"])}
+            {"departman": k or "Bilinmiyor", "toplam_miktar": v["miktar"], "kalem_sayisi": v["kalem"]}
             for k, v in dept_data.items()
         ]
+    
+    def pivot(self, kaynak: str, boyutlar: List[str], olculer: List[str], filtreler: dict = None,
+              ay_baslangic: str = None, ay_bitis: str = None) -> List[dict]:
+        """Hareket veya malzeme tablosu üzerinde tek geçişte gruplama (bkz. pivot.py)"""
+        materials = {
+            row[0]: (row[2] or "", row[7] or "", row[10] or 0)
+            for row in self._sheet_rows("Malzemeler") if row[0]
+        }
+        if kaynak == "hareket":
+            # Pivot ay düzeyinde filtreler; indeks taraması da aynı ay sınırlarını kullanır
+            rows = self.movement_rows_between((ay_baslangic or "")[:7] or None, (ay_bitis or "")[:7] or None)
+        else:
+            rows = self._sheet_rows("Malzemeler")
+        return run_pivot(kaynak, rows, materials, boyutlar, olculer, filtreler, ay_baslangic, ay_bitis)
 
     # ==================== AUDIT LOG ====================
     
@@ -976,7 +1573,7 @@ class ExcelManager:
     
     def create_audit_log(self, kullanici: str, islem: str, modul: str, kayit_id: str = "", eski: str = "", yeni: str = "", detay: str = ""):
         """Audit log oluştur"""
-        wb = load_workbook(self.file_path)
+        wb = self._open()
         ws = self._ensure_audit_sheet(wb)
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
@@ -992,19 +1589,12 @@ class ExcelManager:
             "",
             detay
         ])
-        wb.save(self.file_path)
-        wb.close()
+        self._commit(wb)
     
     def get_audit_logs(self) -> List[dict]:
         """Audit logları getir"""
-        wb = load_workbook(self.file_path)
-        if "AuditLog" not in wb.sheetnames:
-            wb.close()
-            return []
-        
-        ws = wb["AuditLog"]
         logs = []
-        for row in ws.iter_rows(min_row=2, values_only=True):
+        for row in self._sheet_rows("AuditLog"):
             if row[0]:
                 logs.append({
                     "id": row[0],
@@ -1018,7 +1608,6 @@ class ExcelManager:
                     "ip_adresi": row[8] or "",
                     "detay": row[9] or ""
                 })
-        wb.close()
         return list(reversed(logs))
 
     # ==================== LOKASYONLAR ====================
@@ -1035,11 +1624,9 @@ class ExcelManager:
     
     def get_all_locations(self) -> List[dict]:
         """Tüm lokasyonları getir"""
-        wb = load_workbook(self.file_path)
-        ws = self._ensure_location_sheet(wb)
         locations = []
         
-        for row in ws.iter_rows(min_row=2, values_only=True):
+        for row in self._sheet_rows("Lokasyonlar"):
             if row[0]:
                 locations.append({
                     "kod": row[0],
@@ -1049,13 +1636,11 @@ class ExcelManager:
                     "telefon": row[4] or "",
                     "aktif": row[5] if row[5] is not None else True
                 })
-        wb.save(self.file_path)
-        wb.close()
         return locations
     
     def create_location(self, location) -> dict:
         """Yeni lokasyon ekle"""
-        wb = load_workbook(self.file_path)
+        wb = self._open()
         ws = self._ensure_location_sheet(wb)
         
         ws.append([
@@ -1066,25 +1651,23 @@ class ExcelManager:
             location.telefon,
             location.aktif
         ])
-        wb.save(self.file_path)
-        wb.close()
+        self._commit(wb)
         return {"kod": location.kod, "ad": location.ad}
     
     def delete_location(self, kod: str) -> bool:
         """Lokasyon sil"""
-        wb = load_workbook(self.file_path)
+        wb = self._open()
         if "Lokasyonlar" not in wb.sheetnames:
-            wb.close()
+            self._release(wb)
             return False
         
         ws = wb["Lokasyonlar"]
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+        for row_idx, row in enumerate(self._rows(ws), start=2):
             if row[0] == kod:
                 ws.delete_rows(row_idx)
-                wb.save(self.file_path)
-                wb.close()
+                self._commit(wb)
                 return True
-        wb.close()
+        self._release(wb)
         return False
 
     # ==================== STOK SAYIM ====================
@@ -1096,13 +1679,18 @@ class ExcelManager:
             self._set_headers(ws, ["Sayım No", "Tarih", "Lokasyon", "Kategori", "Durum", "Oluşturan", "Tamamlayan", "Tamamlanma", "Açıklama"])
         return wb["Sayimlar"]
     
+    def _ensure_budget_ledger_sheet(self, wb):
+        """Bütçe defteri sayfasını kontrol et/oluştur"""
+        if "ButceHareketleri" not in wb.sheetnames:
+            ws = wb.create_sheet("ButceHareketleri")
+            self._set_headers(ws, ["Tarih", "Yıl", "Ay", "Kategori", "Tutar", "Kaynak", "Açıklama"])
+        return wb["ButceHareketleri"]
+    
     def get_all_stock_counts(self) -> List[dict]:
         """Tüm sayımları getir"""
-        wb = load_workbook(self.file_path)
-        ws = self._ensure_count_sheet(wb)
         counts = []
         
-        for row in ws.iter_rows(min_row=2, values_only=True):
+        for row in self._sheet_rows("Sayimlar"):
             if row[0]:
                 counts.append({
                     "sayim_no": row[0],
@@ -1115,13 +1703,11 @@ class ExcelManager:
                     "tamamlanma_tarihi": str(row[7]) if row[7] else "",
                     "aciklama": row[8] or ""
                 })
-        wb.save(self.file_path)
-        wb.close()
         return list(reversed(counts))
     
     def create_stock_count(self, count) -> dict:
         """Yeni sayım planla"""
-        wb = load_workbook(self.file_path)
+        wb = self._open()
         ws = self._ensure_count_sheet(wb)
         now = datetime.now().strftime("%Y-%m-%d %H:%M")
         sayim_no = self._generate_id("SAY")
@@ -1137,29 +1723,27 @@ class ExcelManager:
             "",
             count.aciklama
         ])
-        wb.save(self.file_path)
-        wb.close()
+        self._commit(wb)
         return {"sayim_no": sayim_no, "tarih": now, "durum": "Planlandı"}
     
     def complete_stock_count(self, sayim_no: str, tamamlayan: str) -> dict:
         """Sayımı tamamla"""
-        wb = load_workbook(self.file_path)
+        wb = self._open()
         if "Sayimlar" not in wb.sheetnames:
-            wb.close()
+            self._release(wb)
             return None
         
         ws = wb["Sayimlar"]
         now = datetime.now().strftime("%Y-%m-%d %H:%M")
         
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+        for row_idx, row in enumerate(self._rows(ws), start=2):
             if row[0] == sayim_no:
                 ws.cell(row=row_idx, column=5, value="Tamamlandı")
                 ws.cell(row=row_idx, column=7, value=tamamlayan)
                 ws.cell(row=row_idx, column=8, value=now)
-                wb.save(self.file_path)
-                wb.close()
+                self._commit(wb)
                 return {"sayim_no": sayim_no, "durum": "Tamamlandı"}
-        wb.close()
+        self._release(wb)
         return None
 
     # ==================== ANALİTİK ====================
@@ -1219,14 +1803,14 @@ class ExcelManager:
                     }
             
             # Ana Excel dosyasını aç
-            wb = load_workbook(self.file_path)
+            wb = self._open()
             ws = wb["Malzemeler"]
             now = datetime.now().strftime("%Y-%m-%d %H:%M")
             
             # Mevcut malzeme kodlarını al
             existing_codes = set()
             existing_names = set()
-            for row in ws.iter_rows(min_row=2, values_only=True):
+            for row in self._rows(ws):
                 if row[0]:
                     existing_codes.add(row[0])
                 if row[1]:
@@ -1332,8 +1916,8 @@ class ExcelManager:
                 existing_names.add(urun_adi.lower())
                 imported_count += 1
             
-            wb.save(self.file_path)
-            wb.close()
+            self._on_commit(wb, self.search_index.invalidate)
+            self._commit(wb)
             import_wb.close()
             
             return {
@@ -1347,31 +1931,253 @@ class ExcelManager:
         except Exception as e:
             return {"success": False, "error": str(e), "imported": 0, "skipped": 0}
 
-    def get_monthly_stats(self) -> List[dict]:
-        """Aylık istatistikler"""
-        movements = self.get_all_movements()
-        months = {}
-        
-        for m in movements:
-            month = m.tarih[:7] if m.tarih and len(m.tarih) >= 7 else ""
-            if not month:
-                continue
-            
-            if month not in months:
-                months[month] = {"giris": 0, "cikis": 0, "harcama": 0}
-            
-            if m.islem_tipi == "Giriş":
-                months[month]["giris"] += m.miktar
-            else:
-                months[month]["cikis"] += m.miktar
+    def get_monthly_stats(self, months: int = 12) -> List[dict]:
+        """Aylık istatistikler (son N ay; özet tablosundan)"""
+        if not self.monthly.built:
+            self.rebuild_monthly_stats()
+        return self.monthly.last(months)
+    
+    def _ensure_consumption(self):
+        """Tüketim modelini gerekirse kaydedilmiş hareketlerden kur (commit kilidi altında çağrılır)"""
+        if not self.consumption.built:
+            self.consumption.rebuild(
+                (row[0], row[1], row[2], row[3]) for row in self._sheet_rows("Hareketler", committed=True) if row[0]
+            )
+    
+    def _ensure_lead_times(self):
+        """Teslim süresi modelini gerekirse kaydedilmiş siparişlerden kur (commit kilidi altında çağrılır)"""
+        if not self.lead_times.built:
+            self.lead_times.rebuild(
+                (row[1], row[9], [kod for kod, _, _ in parse_order_items(row[11])])
+                for row in self._sheet_rows("Siparisler", committed=True)
+                if row[0] and row[4] == OrderStatus.DELIVERED.value
+            )
+    
+    @staticmethod
+    def _merge_entries(codes: List[str], changed: Optional[set], previous: dict, updated: dict) -> dict:
+        """Malzeme sırasıyla kod -> kayıt: değişen kodlar yeni hesaptan, diğerleri önceki sonuçtan
+        (eşit sıralama anahtarlarında tam hesapla aynı sıra korunur)"""
+        entries = {}
+        for kod in codes:
+            entry = updated.get(kod) if changed is None or kod in changed else previous.get(kod)
+            if entry is not None:
+                entries[kod] = entry
+        return entries
+    
+    def get_stock_predictions(self) -> List[dict]:
+        """Stok tükenme tahminleri; kayıtlarda yalnızca değişen malzemeler, gün dönünce tümü yeniden hesaplanır"""
+        today = datetime.now().date()
+        cached = self._predictions
+        if cached is not None and cached[0] == today and cached[1] == self.inventory_version:
+            return cached[4]
+        
+        self.get_reorder_recommendations()
+        reorder = self._reorder
+        with self._commit_lock:
+            # Öneriler daha eski bir sürüme aitse tahminler de o sürümle işaretlenir (sonra yetişir)
+            version = min(self.inventory_version, reorder[1])
+            self._ensure_consumption()
+            changed = None
+            if cached is not None and cached[0] == today and cached[2] == reorder[3]:
+                changed = self._changed_since(cached[1])
+            codes, materials = [], []
+            for row in self._sheet_rows("Malzemeler", committed=True):
+                if row[0]:
+                    codes.append(row[0])
+                    if changed is None or row[0] in changed:
+                        materials.append((row[0], row[1], int(row[4]) if row[4] else 0, int(row[6]) if row[6] else 100))
+        order_quantities = {kod: r["onerilen_siparis"] for kod, r in reorder[4].items()
+                            if changed is None or kod in changed}
+        updated = {
+            p["malzeme_kodu"]: p
+            for p in build_predictions(materials, self.consumption.daily_rates(today.toordinal(), changed),
+                                       today, order_quantities)
+        }
+        entries = self._merge_entries(codes, changed, cached[3] if changed is not None else {}, updated)
+        predictions = sort_predictions(entries.values())
+        self._predictions = (today, version, reorder[3], entries, predictions)
+        return predictions
+    
+    def get_reorder_recommendations(self) -> List[dict]:
+        """Tüm malzemeler için emniyet stoku, sipariş noktası ve EOQ
+
+        Kayıtlarda yalnızca değişen malzemelerin önerisi yeniden hesaplanır; gün dönünce
+        ya da genel teslim süresi değişince (geçmişi olmayan malzemeleri etkiler) tümü.
+        """
+        today = datetime.now().date()
+        cached = self._reorder
+        if cached is not None and cached[0] == today and cached[1] == self.inventory_version:
+            return cached[5]
         
+        with self._commit_lock:
+            version = self.inventory_version
+            self._ensure_consumption()
+            self._ensure_lead_times()
+            _, default_lead = self.lead_times.lead_days(())
+            changed = None
+            if cached is not None and cached[0] == today and cached[2] == default_lead:
+                changed = self._changed_since(cached[1])
+            codes, materials = [], []
+            for row in self._sheet_rows("Malzemeler", committed=True):
+                if row[0]:
+                    codes.append(row[0])
+                    if changed is None or row[0] in changed:
+                        materials.append((row[0], row[1], int(row[4]) if row[4] else 0, int(row[5]) if row[5] else 0,
+                                          int(row[6]) if row[6] else 100, row[10] or 0))
+            lead_days, _ = self.lead_times.lead_days(changed)
+        updated = {
+            r["malzeme_kodu"]: r
+            for r in build_recommendations(
+                materials, self.consumption.demand_stats(today.toordinal(), changed), lead_days, default_lead
+            )
+        }
+        if changed is None:
+            entries, full_version = updated, version
+        else:
+            entries, full_version = self._merge_entries(codes, changed, cached[4], updated), cached[3]
+        recommendations = sort_recommendations(entries.values())
+        self._reorder = (today, version, default_lead, full_version, entries, recommendations)
+        return recommendations
+    
+    def get_spend(self, boyutlar: List[str] = (), filtreler: dict = None,
+                  ay_baslangic: str = None, ay_bitis: str = None) -> List[dict]:
+        """Harcama küpünden dilim / toplam (ilk çağrıda küp kurulur)"""
+        if not self.spend.built:
+            self.rebuild_spend_cube()
+        return self.spend.query(boyutlar, filtreler, ay_baslangic, ay_bitis)
+    
+    def rebuild_spend_cube(self) -> int:
+        """Harcama küpünü hareket ve sipariş geçmişinden yeniden kur"""
+        with self._commit_lock:
+            materials = {
+                row[0]: (row[2] or "", row[10] or 0)
+                for row in self._sheet_rows("Malzemeler", committed=True) if row[0]
+            }
+            self.spend.rebuild(
+                (
+                    (row[0], row[1], row[2], row[3], row[4] or "", row[6] or "")
+                    for row in self._sheet_rows("Hareketler", committed=True) if row[0]
+                ),
+                (
+                    (row[9] or row[1], row[3] or "", row[11])
+                    for row in self._sheet_rows("Siparisler", committed=True)
+                    if row[0] and row[4] == OrderStatus.DELIVERED.value
+                ),
+                materials
+            )
+        return len(self.spend)
+    
+    def get_supplier_report(self) -> List[dict]:
+        """Tedarikçi raporu: önceden hesaplanmış göstergeler, toplam sipariş tutarına göre sıralı"""
+        if not self.supplier_kpis.built:
+            self.rebuild_supplier_kpis()
+        report = [
+            {"tedarikci": s.ad, "kod": s.kod, "puan": s.puan, **self.supplier_kpis.get(s.kod)}
+            for s in self.get_all_suppliers()
+        ]
+        return sorted(report, key=lambda x: x["toplam_siparis"], reverse=True)
+    
+    def rebuild_supplier_kpis(self) -> int:
+        """Tedarikçi göstergelerini sipariş geçmişinden yeniden kur"""
+        with self._commit_lock:
+            self.supplier_kpis.rebuild(
+                (row[2] or "", row[1], row[5] or 0, row[4] == OrderStatus.DELIVERED.value, row[8], row[9])
+                for row in self._sheet_rows("Siparisler", committed=True) if row[0]
+            )
+        return len(self.supplier_kpis)
+    
+    def record_stock_history(self) -> bool:
+        """Bugünün malzeme bazında stok miktarı/değeri kaydını ekle (veri değişmediyse atlanır)"""
+        today = datetime.now().strftime("%Y-%m-%d")
+        version, tables = self._tables_snapshot()
+        if self._history_key == (version, today):
+            return False
+        self.stock_history.load()
+        materials = {}
+        for row in tables.get("Malzemeler", ()):
+            if row[0]:
+                mevcut = int(row[4]) if row[4] else 0
+                materials[row[0]] = (row[2] or "", mevcut, mevcut * (row[10] or 0))
+        try:
+            recorded = self.stock_history.record(today, materials)
+        except OSError as e:
+            print(f"Stok geçmişi yazılamadı: {e}")
+            return False
+        self._history_key = (version, today)
+        return recorded
+    
+    def get_stock_value_series(self, baslangic: str = None, bitis: str = None,
+                               kategori: str = None, malzeme_kodu: str = None) -> List[dict]:
+        """Günlük stok miktarı/değeri serisi (toplam, kategori veya tek malzeme)"""
+        self.stock_history.load()
+        if malzeme_kodu:
+            return self.stock_history.material_series(malzeme_kodu, baslangic, bitis)
+        return self.stock_history.series(baslangic, bitis, kategori)
+    
+    def get_stock_as_of(self, tarih: str, kodlar: set = None) -> dict:
+        """tarih (YYYY-MM-DD, gün sonu dahil) itibarıyla kod -> stok; en yakın aylık kontrol
+        noktasından sonra yalnızca o ayın hareketleri yeniden oynatılır (bkz. stock_checkpoints.py)"""
+        month = tarih[:7]
+        # Kontrol noktaları ile tablolar aynı kayda ait olmalı
+        with self._commit_lock:
+            if not self.checkpoints.built:
+                self.checkpoints.rebuild(
+                    (row[0], row[1], row[2], applied_quantity(row))
+                    for row in self._sheet_rows("Hareketler", committed=True) if row[0]
+                )
+            tables = self._load_tables()
+            partial = {}
+            replayed = self.movement_index.between(tables.get("Hareketler", ()), month, tarih)
+            for row in replayed:
+                partial[row[1]] = partial.get(row[1], 0) + signed_quantity(row[2], applied_quantity(row))
+            stocks = {}
+            for row in tables.get("Malzemeler", ()):
+                if row[0] and (kodlar is None or row[0] in kodlar):
+                    mevcut = int(row[4]) if row[4] else 0
+                    stocks[row[0]] = max(0, mevcut - self.checkpoints.net_after(row[0], month, partial.get(row[0], 0)))
+        self.stats.record_rows("Hareketler", len(replayed))
+        return stocks
+    
+    def materials_as_of(self, materials: List[Material], tarih: str) -> List[Material]:
+        """Malzeme listesini tarih itibarıyla stok ve durumla döndür"""
+        stocks = self.get_stock_as_of(tarih, {m.kod for m in materials})
         result = []
-        for ay, data in sorted(months.items())[-12:]:
-            result.append({
-                "ay": ay,
-                "giris": data["giris"],
-                "cikis": data["cikis"],
-                "harcama": data.get("harcama", 0)
-            })
+        for m in materials:
+            stok = stocks.get(m.kod, m.mevcut_stok)
+            result.append(m.model_copy(update={
+                "mevcut_stok": stok,
+                "durum": self._stock_status(stok, m.min_seviye, m.max_seviye)
+            }))
         return result
+    
+    def load_anomaly_detector(self) -> int:
+        """Anomali durumunu dosyadan yükleyip sonraki hareketleri işle; dosya yoksa geçmişten kur"""
+        with self._commit_lock:
+            rows = self._load_tables().get("Hareketler", ())
+            applied = self.anomalies.load()
+            if applied is not None and applied <= len(rows):
+                self.anomalies.catch_up(rows[applied:])
+            else:
+                self.anomalies.rebuild(rows)
+            self.save_anomaly_state()
+        return len(self.anomalies)
+    
+    def save_anomaly_state(self):
+        """Anomali durumunu diske yaz (kayıtlarla yarışmasın diye commit kilidi altında)"""
+        with self._commit_lock:
+            try:
+                self.anomalies.save()
+            except OSError as e:
+                print(f"Anomali durumu yazılamadı: {e}")
+    
+    def rebuild_monthly_stats(self) -> int:
+        """Aylık özet tablosunu hareket geçmişinden yeniden kur"""
+        # Kayıt sonrası artışlarla yarışmamak için commit kilidi altında
+        with self._commit_lock:
+            prices = {row[0]: row[10] or 0 for row in self._sheet_rows("Malzemeler", committed=True) if row[0]}
+            self.monthly.rebuild(
+                ((row[0], row[1], row[2], row[3]) for row in self._sheet_rows("Hareketler", committed=True) if row[0]),
+                prices
+            )
+        return len(self.monthly)
 
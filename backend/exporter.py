@@ -0,0 +1,134 @@
+"""
+Dışa aktarma akışları
+Satırlar depolama iteratöründen tek tek okunur; sunucu belleği satır sayısından
+bağımsızdır. Yalnızca CSV gerçek akıştır (ilk parça hemen gider); xlsx satırları
+geçici dosyada biriktirir ve ilk baytı dosya tamamlandıktan sonra gönderir.
+"""
+import csv
+import io
+import tempfile
+from typing import Iterable, Iterator
+from openpyxl import Workbook
+from excel_manager import ExcelManager
+
+CHUNK_SIZE = 64 * 1024
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def _cell(row, idx, default=""):
+    """Read-only modda kısa gelebilen satırlar için güvenli hücre erişimi"""
+    if idx < len(row) and row[idx] is not None:
+        return row[idx]
+    return default
+
+
+def _material_row(row):
+    mevcut = int(_cell(row, 4, 0))
+    min_s = int(_cell(row, 5, 0))
+    max_s = int(_cell(row, 6, 0) or 100)
+    return [
+        row[0], _cell(row, 1), _cell(row, 2), _cell(row, 3), mevcut, min_s, max_s,
+        _cell(row, 7), _cell(row, 8), _cell(row, 9), _cell(row, 10, 0.0),
+        ExcelManager._stock_status(mevcut, min_s, max_s)
+    ]
+
+
+def _movement_row(row):
+    return [str(row[0])] + [_cell(row, i) for i in range(1, 8)]
+
+
+def _request_row(row):
+    return [row[0], str(_cell(row, 1)), _cell(row, 3), _cell(row, 4, 0), _cell(row, 5),
+            _cell(row, 6), _cell(row, 7), _cell(row, 8)]
+
+
+def _order_row(row):
+    return [row[0], str(_cell(row, 1)), _cell(row, 3), _cell(row, 5, 0.0), _cell(row, 4), _cell(row, 6)]
+
+
+EXPORTS = {
+    "materials": {
+        "filename": "malzemeler",
+        "sheet": "Malzemeler",
+        "headers": ["Kod", "Ad", "Kategori", "Birim", "Stok", "Min", "Max", "Konum", "Raf", "Barkod", "Fiyat", "Durum"],
+        "row": _material_row,
+    },
+    "movements": {
+        "filename": "hareketler",
+        "sheet": "Hareketler",
+        "headers": ["Tarih", "Malzeme Kodu", "İşlem", "Miktar", "Kişi/Firma", "Açıklama", "Sipariş No", "Onaylayan"],
+        "row": _movement_row,
+    },
+    "requests": {
+        "filename": "talepler",
+        "sheet": "Talepler",
+        "headers": ["Talep No", "Tarih", "Malzeme", "Miktar", "Öncelik", "Talep Eden", "Departman", "Durum"],
+        "row": _request_row,
+    },
+    "orders": {
+        "filename": "siparisler",
+        "sheet": "Siparisler",
+        "headers": ["Sipariş No", "Tarih", "Tedarikçi", "Tutar", "Durum", "Oluşturan"],
+        "row": _order_row,
+    },
+}
+
+
+def iter_export_rows(manager: ExcelManager, tip: str, baslangic: str = None, bitis: str = None) -> Iterator[list]:
+    """Dışa aktarma satırlarını depolama sırasıyla üret; hareketler tarih sırasıyla (ve aralığıyla)"""
+    spec = EXPORTS[tip]
+    mapper = spec["row"]
+    if tip == "movements":
+        rows = manager.movement_rows_between(baslangic, bitis)
+    else:
+        rows = manager.iter_sheet_rows(spec["sheet"])
+    for row in rows:
+        yield mapper(row)
+
+
+def stream_csv(headers: list, rows: Iterable[list]) -> Iterator[bytes]:
+    """CSV akışı; ilk parça (BOM + başlık) hemen gönderilir"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";")
+    buffer.write("\ufeff")  # Excel'in UTF-8 olarak açması için
+    writer.writerow(headers)
+    yield buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def stream_xlsx(headers: list, rows: Iterable[list], sheet_title: str = "Veri") -> Iterator[bytes]:
+    """xlsx yanıtı (openpyxl write-only); akış değildir
+
+    Satırlar diske yazılan geçici dosyalar üzerinden birikir, bellekte tutulmaz; ancak
+    tüm kitap kaydedilmeden ilk bayt gönderilmez (istemci ilk baytı tüm satırlar
+    işlendikten sonra alır). Anında akış gereken durumlarda CSV kullanılmalıdır.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_title)
+    ws.append(headers)
+    for row in rows:
+        ws.append(row)
+
+    with tempfile.TemporaryFile() as tmp:
+        wb.save(tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
@@ -1,15 +1,88 @@
+import asyncio
+import logging
+import os
+import time
 from fastapi import FastAPI, HTTPException, Depends, Query, UploadFile, File
+from fastapi import Request as HTTPRequest
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from contextlib import asynccontextmanager
+from datetime import date
 from typing import List, Optional
-import secrets
 from models import *
 from excel_manager import ExcelManager
+from aggregates import CUBE_DIMENSIONS
+from pivot import parse_pivot_query
+from notification_hub import NotificationHub
+from write_queue import WriteQueue
+from auth_tokens import REVOCATION_ENABLED, RevocationList, TokenError, TokenSigner, claims_to_user
+from exporter import EXPORTS, MEDIA_TYPES, iter_export_rows, stream_csv, stream_xlsx
+from wire_format import encode, parse_fields, project
+from metrics import CACHE_ENTRIES, HTTP_LATENCY, HTTP_REQUESTS, QUEUE_DEPTH, REGISTRY, start_request_cost
+
+# Son Giriş güncellemeleri bu aralıkla (veya bu kadar birikince) toplu yazılır
+LOGIN_FLUSH_SECONDS = 30
+LOGIN_FLUSH_BATCH = 50
+
+# Günlük stok değeri kaydı bu aralıkla denenir; veri değişmediyse dosyaya yazılmaz
+STOCK_HISTORY_SECONDS = float(os.getenv("STOCK_HISTORY_SECONDS", "3600"))
+
+# Bu süreyi aşan istekler depolama maliyetiyle birlikte loglanır (0 = kapalı)
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+# İstemci bu başlığı gönderirse yanıta X-Storage-Cost başlığı eklenir
+DEBUG_COST_HEADER = "X-Debug-Storage"
+slow_request_log = logging.getLogger("inventory.slow_requests")
+
+async def flush_logins_periodically():
+    while True:
+        await asyncio.sleep(LOGIN_FLUSH_SECONDS)
+        try:
+            await asyncio.wrap_future(writer.submit(excel_manager.flush_last_logins))
+        except Exception as e:
+            print(f"Last-login flush failed: {e}")
+
+async def record_stock_history_periodically():
+    while True:
+        await asyncio.sleep(STOCK_HISTORY_SECONDS)
+        try:
+            await asyncio.to_thread(excel_manager.record_stock_history)
+        except Exception as e:
+            print(f"Stock history snapshot failed: {e}")
+
+async def warm_up_store():
+    try:
+        # Eksik sayfalar yazıcı kuyruğundan eklenir; paralel batch kayıtlarıyla çakışmaz
+        await asyncio.wrap_future(writer.submit(excel_manager._ensure_optional_sheets))
+        await asyncio.to_thread(excel_manager.warm_up)
+        print(f"Veri hazır: {excel_manager.tables_source} ({excel_manager.warm_seconds:.2f} sn)")
+    except Exception as e:
+        print(f"Warm-up failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Dosya yoksa oluşturulur; tablolar ve önbellekler arka planda ısınır (/health/ready)
+    await asyncio.to_thread(excel_manager.ensure_file_exists)
+    writer.start()
+    warming = asyncio.create_task(warm_up_store())
+    flusher = asyncio.create_task(flush_logins_periodically())
+    history = asyncio.create_task(record_stock_history_periodically())
+    yield
+    flusher.cancel()
+    history.cancel()
+    await warming
+    await asyncio.wrap_future(writer.submit(excel_manager.flush_last_logins))
+    await asyncio.to_thread(writer.stop)
+    excel_manager.record_stock_history()
+    excel_manager.save_anomaly_state()
+    # Sonraki açılış xlsx'i ayrıştırmadan görüntüden başlasın
+    excel_manager.save_snapshot()
 
 app = FastAPI(
     title="Sarf Malzemesi Envanter Takip Sistemi",
     description="İdari işler için kapsamlı envanter yönetim API'si",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # CORS ayarları
@@ -21,11 +94,63 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-excel_manager = ExcelManager()
+# Veri yükleme lifespan içinde yapılır (import anında xlsx ayrıştırılmaz)
+excel_manager = ExcelManager(initialize=False)
 security = HTTPBasic()
 
-# Basit token store (production'da Redis/DB kullanılmalı)
-active_sessions = {}
+# Tüm değişiklikler tek yazıcı thread'i üzerinden sırayla ve toplu kaydedilir
+writer = WriteQueue(excel_manager)
+
+notification_hub = NotificationHub(excel_manager.get_unread_count)
+excel_manager.add_notification_listener(notification_hub.publish)
+
+for cache_name in excel_manager.cache_sizes():
+    CACHE_ENTRIES.set_function(lambda name=cache_name: excel_manager.cache_sizes()[name], cache_name)
+QUEUE_DEPTH.set_function(writer.depth, "writer")
+QUEUE_DEPTH.set_function(excel_manager.pending_login_count, "pending_logins")
+QUEUE_DEPTH.set_function(notification_hub.subscriber_count, "sse_subscribers")
+
+@app.middleware("http")
+async def record_request_metrics(http_request: HTTPRequest, call_next):
+    """Route bazında istek sayısı, süre histogramı ve istek başına depolama maliyeti"""
+    started = time.perf_counter()
+    cost = start_request_cost()
+    status = 500
+    try:
+        response = await call_next(http_request)
+        status = response.status_code
+        if http_request.headers.get(DEBUG_COST_HEADER):
+            response.headers["X-Storage-Cost"] = cost.summary()
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        route = http_request.scope.get("route")
+        path = route.path if route is not None else "<eşleşmeyen>"
+        HTTP_REQUESTS.inc(http_request.method, path, str(status))
+        HTTP_LATENCY.observe(elapsed, http_request.method, path)
+        if SLOW_REQUEST_MS and elapsed * 1000 >= SLOW_REQUEST_MS:
+            slow_request_log.warning("Yavaş istek: %s %s -> %s %.0f ms [%s]",
+                                     http_request.method, path, status, elapsed * 1000, cost.summary())
+
+@app.get("/health/ready", include_in_schema=False)
+def health_ready():
+    """Hazırlık kontrolü: veri ve önbellekler ısındıysa 200, aksi halde 503"""
+    if not excel_manager.ready:
+        return JSONResponse(status_code=503, content={"durum": "hazırlanıyor"})
+    return {
+        "durum": "hazır",
+        "kaynak": excel_manager.tables_source,
+        "hazirlik_sn": round(excel_manager.warm_seconds, 3),
+    }
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrikleri"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+# Oturumlar imzalı token'larda taşınır; sunucu tarafında oturum deposu yok
+token_signer = TokenSigner()
+revoked_tokens = RevocationList() if REVOCATION_ENABLED else None
 
 # ==================== AUTH ====================
 
@@ -35,9 +160,10 @@ def login(credentials: UserLogin):
     user = excel_manager.authenticate_user(credentials.username, credentials.password)
     if not user:
         raise HTTPException(status_code=401, detail="Geçersiz kullanıcı adı veya şifre")
+    if excel_manager.pending_login_count() >= LOGIN_FLUSH_BATCH:
+        writer.submit(excel_manager.flush_last_logins)
     
-    token = secrets.token_urlsafe(32)
-    active_sessions[token] = user
+    token = token_signer.issue(user.model_dump(mode="json"))
     
     return {
         "token": token,
@@ -47,16 +173,23 @@ def login(credentials: UserLogin):
 @app.post("/api/auth/logout")
 def logout(token: str):
     """Kullanıcı çıkışı"""
-    if token in active_sessions:
-        del active_sessions[token]
+    if revoked_tokens is not None:
+        try:
+            revoked_tokens.revoke(token_signer.verify(token))
+        except TokenError:
+            pass
     return {"message": "Çıkış yapıldı"}
 
 @app.get("/api/auth/me")
 def get_current_user(token: str):
-    """Oturum bilgisi"""
-    if token not in active_sessions:
-        raise HTTPException(status_code=401, detail="Oturum geçersiz")
-    return active_sessions[token]
+    """Oturum bilgisi (imza ve süre doğrulanır, depolamaya erişilmez)"""
+    try:
+        claims = token_signer.verify(token)
+    except TokenError as e:
+        raise HTTPException(status_code=401, detail=f"Oturum geçersiz: {e}")
+    if revoked_tokens is not None and revoked_tokens.is_revoked(claims):
+        raise HTTPException(status_code=401, detail="Oturum geçersiz: çıkış yapılmış")
+    return claims_to_user(claims)
 
 # ==================== KULLANICILAR ====================
 
@@ -68,7 +201,7 @@ def get_users():
 @app.post("/api/users", response_model=User)
 def create_user(user: UserCreate):
     """Yeni kullanıcı oluştur"""
-    return excel_manager.create_user(user)
+    return writer.call(excel_manager.create_user, user)
 
 # ==================== DASHBOARD ====================
 
@@ -79,30 +212,49 @@ def get_dashboard(username: Optional[str] = None):
 
 # ==================== MALZEMELER ====================
 
+def _as_of_date(tarih: str) -> str:
+    """Tarih itibarıyla sorgular için YYYY-MM-DD doğrulaması"""
+    try:
+        return date.fromisoformat(tarih).isoformat()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Geçersiz tarih (YYYY-MM-DD)")
+
 @app.get("/api/materials", response_model=List[Material])
 def get_materials(
+    request: HTTPRequest,
     kategori: Optional[str] = None,
     durum: Optional[str] = None,
-    arama: Optional[str] = None
+    arama: Optional[str] = None,
+    tarih: Optional[str] = None,
+    fields: Optional[str] = None,
+    duzen: str = "satir"
 ):
-    """Tüm malzemeleri listele (filtreleme ile)"""
-    materials = excel_manager.get_all_materials()
+    """Tüm malzemeleri listele (filtreleme, tarih itibarıyla stok, alan seçimi ve sütunsal düzen ile)"""
+    selected = parse_fields(fields, Material)
+    if arama:
+        materials = excel_manager.search_materials(arama, limit=None)
+    else:
+        materials = excel_manager.get_all_materials()
     
     if kategori:
         materials = [m for m in materials if m.kategori == kategori]
+    if tarih:
+        materials = excel_manager.materials_as_of(materials, _as_of_date(tarih))
     if durum:
         materials = [m for m in materials if m.durum == durum]
-    if arama:
-        arama = arama.lower()
-        materials = [m for m in materials if arama in m.ad.lower() or arama in m.kod.lower() or (m.barkod and arama in m.barkod.lower())]
     
-    return materials
+    return encode(request, project(materials, selected, duzen))
 
 @app.get("/api/materials/critical", response_model=List[Material])
 def get_critical_materials():
     """Kritik stok seviyesindeki malzemeler"""
     return excel_manager.get_critical_stock_materials()
 
+@app.get("/api/materials/search", response_model=List[Material])
+def search_materials(q: str, limit: int = Query(20, ge=1, le=200)):
+    """Malzeme arama (ad, kod, barkod, konum, raf; Türkçe harf duyarlı, önek/kelime içi)"""
+    return excel_manager.search_materials(q, limit)
+
 @app.get("/api/materials/{kod}", response_model=Material)
 def get_material(kod: str):
     """Tek malzeme getir"""
@@ -111,6 +263,15 @@ def get_material(kod: str):
         raise HTTPException(status_code=404, detail="Malzeme bulunamadı")
     return material
 
+@app.get("/api/materials/{kod}/stock")
+def get_material_stock_as_of(kod: str, tarih: str):
+    """Malzemenin verilen gün sonundaki stoku"""
+    tarih = _as_of_date(tarih)
+    stocks = excel_manager.get_stock_as_of(tarih, {kod})
+    if kod not in stocks:
+        raise HTTPException(status_code=404, detail="Malzeme bulunamadı")
+    return {"malzeme_kodu": kod, "tarih": tarih, "stok": stocks[kod]}
+
 @app.get("/api/materials/by-barcode/{barcode}", response_model=Material)
 def get_material_by_barcode(barcode: str):
     """Barkod/QR kod ile malzeme getir"""
@@ -122,15 +283,16 @@ def get_material_by_barcode(barcode: str):
 @app.post("/api/materials", response_model=Material)
 def create_material(material: MaterialCreate):
     """Yeni malzeme ekle"""
-    existing = excel_manager.get_material_by_code(material.kod)
-    if existing:
-        raise HTTPException(status_code=400, detail="Bu kod zaten kullanılıyor")
-    return excel_manager.create_material(material)
+    def command():
+        if excel_manager.get_material_by_code(material.kod):
+            raise HTTPException(status_code=400, detail="Bu kod zaten kullanılıyor")
+        return excel_manager.create_material(material)
+    return writer.call(command)
 
 @app.put("/api/materials/{kod}", response_model=Material)
 def update_material(kod: str, material: MaterialCreate):
     """Malzeme güncelle"""
-    updated = excel_manager.update_material(kod, material)
+    updated = writer.call(excel_manager.update_material, kod, material)
     if not updated:
         raise HTTPException(status_code=404, detail="Malzeme bulunamadı")
     return updated
@@ -138,7 +300,7 @@ def update_material(kod: str, material: MaterialCreate):
 @app.delete("/api/materials/{kod}")
 def delete_material(kod: str):
     """Malzeme sil"""
-    deleted = excel_manager.delete_material(kod)
+    deleted = writer.call(excel_manager.delete_material, kod)
     if not deleted:
         raise HTTPException(status_code=404, detail="Malzeme bulunamadı")
     return {"message": "Malzeme silindi"}
@@ -160,8 +322,8 @@ async def import_materials_from_excel(file: UploadFile = File(...)):
             tmp.write(content)
             tmp_path = tmp.name
         
-        # Excel'i işle
-        result = excel_manager.import_materials_from_excel(tmp_path)
+        # Excel'i işle (yazıcı kuyruğunda; event loop beklerken bloklanmaz)
+        result = await asyncio.wrap_future(writer.submit(excel_manager.import_materials_from_excel, tmp_path))
         
         # Geçici dosyayı sil
         os.unlink(tmp_path)
@@ -179,24 +341,34 @@ async def import_materials_from_excel(file: UploadFile = File(...)):
 # ==================== STOK HAREKETLERİ ====================
 
 @app.get("/api/movements", response_model=List[StockMovement])
-def get_movements(malzeme_kodu: Optional[str] = None, islem_tipi: Optional[str] = None):
-    """Tüm hareketleri listele"""
-    movements = excel_manager.get_all_movements()
+def get_movements(
+    request: HTTPRequest,
+    malzeme_kodu: Optional[str] = None,
+    islem_tipi: Optional[str] = None,
+    baslangic: Optional[str] = None,
+    bitis: Optional[str] = None,
+    fields: Optional[str] = None,
+    duzen: str = "satir"
+):
+    """Hareketleri listele (tarih aralığı, alan seçimi ve sütunsal düzen ile)"""
+    selected = parse_fields(fields, StockMovement)
+    movements = excel_manager.get_all_movements(baslangic, bitis)
     
     if malzeme_kodu:
         movements = [m for m in movements if m.malzeme_kodu == malzeme_kodu]
     if islem_tipi:
         movements = [m for m in movements if m.islem_tipi == islem_tipi]
     
-    return movements
+    return encode(request, project(movements, selected, duzen))
 
 @app.post("/api/movements", response_model=StockMovement)
 def create_movement(movement: StockMovementCreate):
     """Yeni hareket ekle (stoku otomatik günceller)"""
-    material = excel_manager.get_material_by_code(movement.malzeme_kodu)
-    if not material:
-        raise HTTPException(status_code=404, detail="Malzeme bulunamadı")
-    return excel_manager.create_movement(movement)
+    def command():
+        if not excel_manager.get_material_by_code(movement.malzeme_kodu):
+            raise HTTPException(status_code=404, detail="Malzeme bulunamadı")
+        return excel_manager.create_movement(movement)
+    return writer.call(command)
 
 # ==================== TEDARİKÇİLER ====================
 
@@ -223,15 +395,16 @@ def get_supplier(kod: str):
 @app.post("/api/suppliers", response_model=Supplier)
 def create_supplier(supplier: SupplierCreate):
     """Yeni tedarikçi ekle"""
-    existing = excel_manager.get_supplier_by_code(supplier.kod)
-    if existing:
-        raise HTTPException(status_code=400, detail="Bu kod zaten kullanılıyor")
-    return excel_manager.create_supplier(supplier)
+    def command():
+        if excel_manager.get_supplier_by_code(supplier.kod):
+            raise HTTPException(status_code=400, detail="Bu kod zaten kullanılıyor")
+        return excel_manager.create_supplier(supplier)
+    return writer.call(command)
 
 @app.put("/api/suppliers/{kod}", response_model=Supplier)
 def update_supplier(kod: str, supplier: SupplierCreate):
     """Tedarikçi güncelle"""
-    updated = excel_manager.update_supplier(kod, supplier)
+    updated = writer.call(excel_manager.update_supplier, kod, supplier)
     if not updated:
         raise HTTPException(status_code=404, detail="Tedarikçi bulunamadı")
     return updated
@@ -239,7 +412,7 @@ def update_supplier(kod: str, supplier: SupplierCreate):
 @app.delete("/api/suppliers/{kod}")
 def delete_supplier(kod: str):
     """Tedarikçi sil"""
-    deleted = excel_manager.delete_supplier(kod)
+    deleted = writer.call(excel_manager.delete_supplier, kod)
     if not deleted:
         raise HTTPException(status_code=404, detail="Tedarikçi bulunamadı")
     return {"message": "Tedarikçi silindi"}
@@ -269,12 +442,12 @@ def get_order(siparis_no: str):
 @app.post("/api/orders", response_model=Order)
 def create_order(order: OrderCreate):
     """Yeni sipariş oluştur"""
-    return excel_manager.create_order(order)
+    return writer.call(excel_manager.create_order, order)
 
 @app.put("/api/orders/{siparis_no}/status")
 def update_order_status(siparis_no: str, durum: OrderStatus, onaylayan: Optional[str] = ""):
     """Sipariş durumu güncelle"""
-    updated = excel_manager.update_order_status(siparis_no, durum, onaylayan)
+    updated = writer.call(excel_manager.update_order_status, siparis_no, durum, onaylayan)
     if not updated:
         raise HTTPException(status_code=404, detail="Sipariş bulunamadı")
     return updated
@@ -309,12 +482,12 @@ def get_request(talep_no: str):
 @app.post("/api/requests", response_model=Request)
 def create_request(request: RequestCreate):
     """Yeni talep oluştur"""
-    return excel_manager.create_request(request)
+    return writer.call(excel_manager.create_request, request)
 
 @app.put("/api/requests/{talep_no}/approve")
 def approve_request(talep_no: str, onaylayan: str):
     """Talebi onayla"""
-    updated = excel_manager.update_request_status(talep_no, RequestStatus.APPROVED, onaylayan)
+    updated = writer.call(excel_manager.update_request_status, talep_no, RequestStatus.APPROVED, onaylayan)
     if not updated:
         raise HTTPException(status_code=404, detail="Talep bulunamadı")
     return updated
@@ -322,7 +495,7 @@ def approve_request(talep_no: str, onaylayan: str):
 @app.put("/api/requests/{talep_no}/reject")
 def reject_request(talep_no: str, onaylayan: str, red_nedeni: str):
     """Talebi reddet"""
-    updated = excel_manager.update_request_status(talep_no, RequestStatus.REJECTED, onaylayan, red_nedeni)
+    updated = writer.call(excel_manager.update_request_status, talep_no, RequestStatus.REJECTED, onaylayan, red_nedeni)
     if not updated:
         raise HTTPException(status_code=404, detail="Talep bulunamadı")
     return updated
@@ -334,10 +507,15 @@ def get_budget(yil: Optional[int] = None):
     """Bütçe özeti"""
     return excel_manager.get_budget_summary(yil)
 
+@app.get("/api/budget/monthly")
+def get_budget_month(yil: Optional[int] = None, ay: Optional[int] = Query(None, ge=1, le=12)):
+    """Aylık bütçe kullanımı (kategori bazında, bütçe defterinden)"""
+    return excel_manager.get_budget_month(yil, ay)
+
 @app.post("/api/budget/update")
-def update_budget_usage(yil: int, kategori: str, harcama: float):
-    """Bütçe kullanımı güncelle"""
-    excel_manager.update_budget(yil, kategori, harcama)
+def update_budget_usage(yil: int, kategori: str, harcama: float, ay: Optional[int] = Query(None, ge=1, le=12)):
+    """Bütçe kullanımı güncelle (ay verilmezse bu yıl için bu ay, diğer yıllar için Aralık)"""
+    writer.call(excel_manager.update_budget, yil, kategori, harcama, ay)
     return {"message": "Bütçe güncellendi"}
 
 # ==================== BİLDİRİMLER ====================
@@ -350,13 +528,21 @@ def get_notifications(username: str):
 @app.get("/api/notifications/unread/count")
 def get_unread_count(username: str):
     """Okunmamış bildirim sayısı"""
-    notifications = excel_manager.get_user_notifications(username)
-    return {"count": len([n for n in notifications if not n.okundu])}
+    return {"count": excel_manager.get_unread_count(username)}
+
+@app.get("/api/notifications/stream")
+async def notification_stream(username: str):
+    """Bildirim akışı (Server-Sent Events): yeni bildirimler ve okunmamış sayısı"""
+    return StreamingResponse(
+        notification_hub.stream(username),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.put("/api/notifications/{notif_id}/read")
 def mark_as_read(notif_id: str):
     """Bildirimi okundu olarak işaretle"""
-    success = excel_manager.mark_notification_read(notif_id)
+    success = writer.call(excel_manager.mark_notification_read, notif_id)
     if not success:
         raise HTTPException(status_code=404, detail="Bildirim bulunamadı")
     return {"message": "Bildirim okundu olarak işaretlendi"}
@@ -364,7 +550,7 @@ def mark_as_read(notif_id: str):
 @app.post("/api/notifications", response_model=Notification)
 def create_notification(notification: NotificationCreate):
     """Yeni bildirim oluştur"""
-    return excel_manager.create_notification(notification)
+    return writer.call(excel_manager.create_notification, notification)
 
 # ==================== RAPORLAR ====================
 
@@ -372,20 +558,23 @@ def create_notification(notification: NotificationCreate):
 def inventory_report(kategori: Optional[str] = None):
     """Envanter raporu"""
     materials = excel_manager.get_all_materials()
+    summary = excel_manager.get_material_summary()
+    totals = summary["toplam"]
     if kategori:
         materials = [m for m in materials if m.kategori == kategori]
+        totals = summary["kategori"].get(kategori, {"deger": 0, "kritik": 0})
     
     return {
         "malzemeler": materials,
-        "toplam_deger": sum(m.mevcut_stok * m.birim_fiyat for m in materials),
-        "kritik_sayisi": len([m for m in materials if m.durum == "Kritik"]),
-        "kategori_ozeti": excel_manager.get_category_distribution()
+        "toplam_deger": totals["deger"],
+        "kritik_sayisi": totals["kritik"],
+        "kategori_ozeti": {k: v["adet"] for k, v in summary["kategori"].items()}
     }
 
 @app.get("/api/reports/movements")
 def movements_report(baslangic: Optional[str] = None, bitis: Optional[str] = None, malzeme_kodu: Optional[str] = None):
-    """Hareket raporu"""
-    movements = excel_manager.get_all_movements()
+    """Hareket raporu (baslangic / bitis: YYYY-MM veya YYYY-MM-DD, her ikisi de dahil)"""
+    movements = excel_manager.get_all_movements(baslangic, bitis)
     
     if malzeme_kodu:
         movements = [m for m in movements if m.malzeme_kodu == malzeme_kodu]
@@ -407,22 +596,8 @@ def department_report(departman: Optional[str] = None):
 
 @app.get("/api/reports/suppliers")
 def suppliers_report():
-    """Tedarikçi analiz raporu"""
-    suppliers = excel_manager.get_all_suppliers()
-    orders = excel_manager.get_all_orders()
-    
-    report = []
-    for s in suppliers:
-        supplier_orders = [o for o in orders if o.tedarikci_kodu == s.kod]
-        report.append({
-            "tedarikci": s.ad,
-            "kod": s.kod,
-            "puan": s.puan,
-            "toplam_siparis": sum(o.toplam_tutar for o in supplier_orders),
-            "siparis_sayisi": len(supplier_orders)
-        })
-    
-    return sorted(report, key=lambda x: x["toplam_siparis"], reverse=True)
+    """Tedarikçi analiz raporu (sipariş sayısı, tutar, ortalama teslim süresi, zamanında teslim oranı)"""
+    return excel_manager.get_supplier_report()
 
 # ==================== ENUM DEĞERLERİ ====================
 
@@ -480,46 +655,99 @@ def get_monthly_analytics():
     """Aylık istatistikler"""
     return excel_manager.get_monthly_stats()
 
+@app.post("/api/analytics/monthly/rebuild")
+def rebuild_monthly_analytics():
+    """Aylık özet tablosunu hareket geçmişinden yeniden kur"""
+    return {"ay_sayisi": excel_manager.rebuild_monthly_stats()}
+
+@app.get("/api/analytics/spend")
+def get_spend_analytics(
+    boyutlar: str = "ay",
+    kategori: Optional[str] = None,
+    departman: Optional[str] = None,
+    tedarikci: Optional[str] = None,
+    ay_baslangic: Optional[str] = None,
+    ay_bitis: Optional[str] = None
+):
+    """Harcama küpü: boyutlar (ay, kategori, departman, tedarikci; virgülle) bazında toplam,
+    filtreler ve YYYY-MM ay aralığıyla dilimleme"""
+    secilen = [b.strip() for b in boyutlar.split(",") if b.strip()]
+    bilinmeyen = [b for b in secilen if b not in CUBE_DIMENSIONS]
+    if bilinmeyen:
+        raise HTTPException(status_code=400, detail=f"Bilinmeyen boyut(lar): {', '.join(bilinmeyen)}")
+    filtreler = {"kategori": kategori, "departman": departman, "tedarikci": tedarikci}
+    return excel_manager.get_spend(secilen, filtreler, ay_baslangic, ay_bitis)
+
+@app.post("/api/analytics/spend/rebuild")
+def rebuild_spend_analytics():
+    """Harcama küpünü hareket ve sipariş geçmişinden yeniden kur"""
+    return {"hucre_sayisi": excel_manager.rebuild_spend_cube()}
+
+@app.get("/api/analytics/pivot")
+def get_pivot(
+    kaynak: str = "hareket",
+    boyutlar: Optional[str] = None,
+    olculer: Optional[str] = None,
+    kategori: Optional[str] = None,
+    malzeme: Optional[str] = None,
+    departman: Optional[str] = None,
+    lokasyon: Optional[str] = None,
+    tedarikci: Optional[str] = None,
+    islem_tipi: Optional[str] = None,
+    ay_baslangic: Optional[str] = None,
+    ay_bitis: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Genel gruplama: kaynak (hareket/malzeme), boyutlar ve ölçüler virgülle; diğer parametreler filtre"""
+    filtreler = {
+        "kategori": kategori, "malzeme": malzeme, "departman": departman,
+        "lokasyon": lokasyon, "tedarikci": tedarikci, "islem_tipi": islem_tipi
+    }
+    dims, measures = parse_pivot_query(kaynak, boyutlar, olculer, filtreler, ay_baslangic, ay_bitis)
+    rows = excel_manager.pivot(kaynak, dims, measures, filtreler, ay_baslangic, ay_bitis)
+    return rows[:limit] if limit else rows
+
+@app.get("/api/analytics/stock-value")
+def get_stock_value_trend(
+    baslangic: Optional[str] = None,
+    bitis: Optional[str] = None,
+    kategori: Optional[str] = None,
+    malzeme_kodu: Optional[str] = None
+):
+    """Günlük stok değeri serisi (baslangic / bitis: YYYY-MM-DD)"""
+    return excel_manager.get_stock_value_series(baslangic, bitis, kategori, malzeme_kodu)
+
+@app.post("/api/analytics/stock-value/snapshot")
+def snapshot_stock_value():
+    """Bugünün stok değeri kaydını hemen al"""
+    return {"kaydedildi": excel_manager.record_stock_history()}
+
 @app.get("/api/analytics/category")
 def get_category_analytics():
     """Kategori bazlı analiz"""
-    materials = excel_manager.get_all_materials()
-    total_value = sum(m.mevcut_stok * m.birim_fiyat for m in materials)
+    summary = excel_manager.get_material_summary()
+    total_value = summary["toplam"]["deger"]
     
     result = []
-    for cat in ["Kırtasiye", "Temizlik", "Ofis Ekipmanı", "Mutfak", "Teknik", "Diğer"]:
-        cat_materials = [m for m in materials if m.kategori == cat]
-        cat_value = sum(m.mevcut_stok * m.birim_fiyat for m in cat_materials)
+    for cat in Category:
+        cat_summary = summary["kategori"].get(cat.value, {"adet": 0, "deger": 0})
         result.append({
-            "kategori": cat,
-            "miktar": len(cat_materials),
-            "deger": cat_value,
-            "oran": (cat_value / total_value * 100) if total_value > 0 else 0
+            "kategori": cat.value,
+            "miktar": cat_summary["adet"],
+            "deger": cat_summary["deger"],
+            "oran": (cat_summary["deger"] / total_value * 100) if total_value > 0 else 0
         })
     return result
 
 @app.get("/api/analytics/trends")
 def get_trends():
     """Trend analizi"""
-    movements = excel_manager.get_all_movements()
-    
     # Son 6 ayın verisi
-    months = {}
-    for m in movements:
-        month = m.tarih[:7] if m.tarih else ""
-        if month:
-            if month not in months:
-                months[month] = {"giris": 0, "cikis": 0}
-            if m.islem_tipi == "Giriş":
-                months[month]["giris"] += m.miktar
-            else:
-                months[month]["cikis"] += m.miktar
-    
-    sorted_months = sorted(months.items())[-6:]
+    months = excel_manager.get_monthly_stats(6)
     return {
-        "labels": [m[0] for m in sorted_months],
-        "giris": [m[1]["giris"] for m in sorted_months],
-        "cikis": [m[1]["cikis"] for m in sorted_months]
+        "labels": [m["ay"] for m in months],
+        "giris": [m["giris"] for m in months],
+        "cikis": [m["cikis"] for m in months]
     }
 
 # ==================== STOK TAHMİN ====================
@@ -527,87 +755,50 @@ def get_trends():
 @app.get("/api/predictions")
 def get_stock_predictions():
     """Stok tükenme tahminleri"""
-    materials = excel_manager.get_all_materials()
-    movements = excel_manager.get_all_movements()
-    
-    predictions = []
-    for mat in materials:
-        # Son 30 günlük çıkışları hesapla
-        mat_exits = [m for m in movements if m.malzeme_kodu == mat.kod and m.islem_tipi == "Çıkış"]
-        total_exit = sum(m.miktar for m in mat_exits[-30:]) if mat_exits else 0
-        daily_consumption = total_exit / 30 if total_exit > 0 else 0
-        
-        if daily_consumption > 0:
-            days_left = mat.mevcut_stok / daily_consumption
-            from datetime import datetime, timedelta
-            bitis = (datetime.now() + timedelta(days=days_left)).strftime("%Y-%m-%d")
-            onerilen = max(0, int((mat.max_seviye - mat.mevcut_stok) * 1.2))
-            
-            if days_left <= 7:
-                oncelik = "Acil"
-            elif days_left <= 14:
-                oncelik = "Yüksek"
-            elif days_left <= 30:
-                oncelik = "Normal"
-            else:
-                oncelik = "Düşük"
-            
-            predictions.append({
-                "malzeme_kodu": mat.kod,
-                "malzeme_adi": mat.ad,
-                "mevcut_stok": mat.mevcut_stok,
-                "gunluk_tuketim": round(daily_consumption, 2),
-                "tahmini_bitis": bitis,
-                "kalan_gun": int(days_left),
-                "onerilen_siparis": onerilen,
-                "oncelik": oncelik
-            })
-    
-    # Önceliğe göre sırala
-    priority_order = {"Acil": 0, "Yüksek": 1, "Normal": 2, "Düşük": 3}
-    return sorted(predictions, key=lambda x: priority_order.get(x["oncelik"], 4))
+    return excel_manager.get_stock_predictions()
+
+@app.get("/api/predictions/reorder")
+def get_reorder_recommendations(sadece_gerekli: bool = False):
+    """Yeniden sipariş önerileri: emniyet stoku, sipariş noktası, EOQ"""
+    recommendations = excel_manager.get_reorder_recommendations()
+    if sadece_gerekli:
+        recommendations = [r for r in recommendations if r["siparis_gerekli"]]
+    return recommendations
 
 # ==================== EXPORT ====================
 
+def _export_response(tip: str, bicim: str, baslangic: Optional[str] = None, bitis: Optional[str] = None) -> StreamingResponse:
+    """Dışa aktarmayı depolamadan doğrudan akıt"""
+    if bicim not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Geçersiz format (xlsx veya csv)")
+    spec = EXPORTS[tip]
+    rows = iter_export_rows(excel_manager, tip, baslangic, bitis)
+    body = stream_csv(spec["headers"], rows) if bicim == "csv" else stream_xlsx(spec["headers"], rows)
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[bicim],
+        headers={"Content-Disposition": f'attachment; filename="{spec["filename"]}.{bicim}"'}
+    )
+
 @app.get("/api/export/materials")
-def export_materials():
+def export_materials(bicim: str = "xlsx"):
     """Malzeme listesini dışa aktar"""
-    materials = excel_manager.get_all_materials()
-    return {
-        "filename": "malzemeler.xlsx",
-        "headers": ["Kod", "Ad", "Kategori", "Birim", "Stok", "Min", "Max", "Konum", "Raf", "Barkod", "Fiyat", "Durum"],
-        "data": [[m.kod, m.ad, m.kategori, m.birim, m.mevcut_stok, m.min_seviye, m.max_seviye, m.konum, m.raf, m.barkod, m.birim_fiyat, m.durum] for m in materials]
-    }
+    return _export_response("materials", bicim)
 
 @app.get("/api/export/movements")
-def export_movements():
-    """Hareketleri dışa aktar"""
-    movements = excel_manager.get_all_movements()
-    return {
-        "filename": "hareketler.xlsx",
-        "headers": ["Tarih", "Malzeme Kodu", "İşlem", "Miktar", "Kişi/Firma", "Açıklama", "Sipariş No", "Onaylayan"],
-        "data": [[m.tarih, m.malzeme_kodu, m.islem_tipi, m.miktar, m.tedarikci_teslim_alan, m.aciklama, m.siparis_no, m.onaylayan] for m in movements]
-    }
+def export_movements(bicim: str = "xlsx", baslangic: Optional[str] = None, bitis: Optional[str] = None):
+    """Hareketleri dışa aktar (isteğe bağlı tarih aralığı)"""
+    return _export_response("movements", bicim, baslangic, bitis)
 
 @app.get("/api/export/requests")
-def export_requests():
+def export_requests(bicim: str = "xlsx"):
     """Talepleri dışa aktar"""
-    requests = excel_manager.get_all_requests()
-    return {
-        "filename": "talepler.xlsx",
-        "headers": ["Talep No", "Tarih", "Malzeme", "Miktar", "Öncelik", "Talep Eden", "Departman", "Durum"],
-        "data": [[r.talep_no, r.tarih, r.malzeme_adi, r.miktar, r.oncelik, r.talep_eden, r.departman, r.durum] for r in requests]
-    }
+    return _export_response("requests", bicim)
 
 @app.get("/api/export/orders")
-def export_orders():
+def export_orders(bicim: str = "xlsx"):
     """Siparişleri dışa aktar"""
-    orders = excel_manager.get_all_orders()
-    return {
-        "filename": "siparisler.xlsx",
-        "headers": ["Sipariş No", "Tarih", "Tedarikçi", "Tutar", "Durum", "Oluşturan"],
-        "data": [[o.siparis_no, o.tarih, o.tedarikci_adi, o.toplam_tutar, o.durum, o.olusturan] for o in orders]
-    }
+    return _export_response("orders", bicim)
 
 # ==================== LOKASYONLAR ====================
 
@@ -619,12 +810,12 @@ def get_locations():
 @app.post("/api/locations")
 def create_location(location: LocationCreate):
     """Yeni lokasyon ekle"""
-    return excel_manager.create_location(location)
+    return writer.call(excel_manager.create_location, location)
 
 @app.delete("/api/locations/{kod}")
 def delete_location(kod: str):
     """Lokasyon sil"""
-    deleted = excel_manager.delete_location(kod)
+    deleted = writer.call(excel_manager.delete_location, kod)
     if not deleted:
         raise HTTPException(status_code=404, detail="Lokasyon bulunamadı")
     return {"message": "Lokasyon silindi"}
@@ -639,12 +830,12 @@ def get_stock_counts():
 @app.post("/api/stock-counts")
 def create_stock_count(count: StockCountCreate):
     """Yeni sayım planla"""
-    return excel_manager.create_stock_count(count)
+    return writer.call(excel_manager.create_stock_count, count)
 
 @app.put("/api/stock-counts/{sayim_no}/complete")
 def complete_stock_count(sayim_no: str, tamamlayan: str):
     """Sayımı tamamla"""
-    return excel_manager.complete_stock_count(sayim_no, tamamlayan)
+    return writer.call(excel_manager.complete_stock_count, sayim_no, tamamlayan)
 
 if __name__ == "__main__":
     import uvicorn
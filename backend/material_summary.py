@@ -0,0 +1,53 @@
+"""
+Malzeme özet çekirdeği
+Malzemeler tablosu tek geçişte taranır; genel toplam ile kategori, lokasyon ve
+stok durumu kırılımlarında kalem sayısı, stok miktarı, stok değeri ve kritik
+kalem sayısı birlikte hesaplanır. Envanter raporu, kategori analizi, dashboard
+ve toplam stok değeri aynı sonucu kullanır; ExcelManager sonucu veri sürümü
+başına önbelleğe alır.
+"""
+from typing import Callable, Dict, Iterable
+
+GROUPS = ("kategori", "lokasyon", "durum")
+CRITICAL = "Kritik"
+
+
+def _bucket_dict(bucket: list) -> dict:
+    return {"adet": bucket[0], "miktar": bucket[1], "deger": bucket[2], "kritik": bucket[3]}
+
+
+def summarize_materials(rows: Iterable[tuple], stock_status: Callable[[int, int, int], str]) -> dict:
+    """Malzemeler satırlarından özet
+
+    Dönüş: {"toplam": ölçüler, "kategori" / "lokasyon" / "durum": {değer: ölçüler},
+    "fiyatlar": {kod: birim fiyat}}; ölçüler = adet, miktar, deger, kritik
+    """
+    total = [0, 0, 0.0, 0]
+    groups: Dict[str, Dict[str, list]] = {group: {} for group in GROUPS}
+    prices: Dict[str, float] = {}
+    for row in rows:
+        if not row[0]:
+            continue
+        mevcut = int(row[4]) if row[4] else 0
+        min_s = int(row[5]) if row[5] else 0
+        max_s = int(row[6]) if row[6] else 100
+        fiyat = row[10] or 0.0
+        deger = mevcut * fiyat
+        durum = stock_status(mevcut, min_s, max_s)
+        kritik = 1 if durum == CRITICAL else 0
+        prices[row[0]] = fiyat
+        for bucket in (
+            total,
+            groups["kategori"].setdefault(row[2], [0, 0, 0.0, 0]),
+            groups["lokasyon"].setdefault(row[7] or "", [0, 0, 0.0, 0]),
+            groups["durum"].setdefault(durum, [0, 0, 0.0, 0]),
+        ):
+            bucket[0] += 1
+            bucket[1] += mevcut
+            bucket[2] += deger
+            bucket[3] += kritik
+
+    summary = {"toplam": _bucket_dict(total), "fiyatlar": prices}
+    for group, buckets in groups.items():
+        summary[group] = {key: _bucket_dict(bucket) for key, bucket in buckets.items()}
+    return summary
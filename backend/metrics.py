@@ -0,0 +1,232 @@
+"""
+Prometheus metin formatında metrikler
+Harici bağımlılık gerektirmeyen küçük bir sayaç / histogram / gauge kaydı,
+API route'ları ve ExcelManager depolama işlemleri için kullanılır.
+"""
+import threading
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, doc: str, labels: Iterable[str] = ()):
+        self.name, self.doc, self.labels = name, doc, tuple(labels)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values) -> float:
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, doc: str, labels: Iterable[str] = (), buckets=LATENCY_BUCKETS):
+        self.name, self.doc, self.labels = name, doc, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values: Dict[tuple, list] = {}  # key -> [bucket sayaçları..., toplam, adet]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            data = self._values.get(label_values)
+            if data is None:
+                data = self._values[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, data in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, data):
+                    le = 'le="%s"' % bound
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {count}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {data[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(data[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {data[-1]}")
+        return lines
+
+
+class Gauge:
+    """Değeri okuma anında fonksiyonlardan alınan gauge"""
+
+    def __init__(self, name: str, doc: str, labels: Iterable[str] = ()):
+        self.name, self.doc, self.labels = name, doc, tuple(labels)
+        self._sources: Dict[tuple, Callable[[], float]] = {}
+
+    def set_function(self, fn: Callable[[], float], *label_values):
+        self._sources[label_values] = fn
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} gauge"]
+        for key, fn in sorted(self._sources.items()):
+            try:
+                value = fn()
+            except Exception:
+                continue
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ---------- HTTP ----------
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "İşlenen HTTP istekleri", ("method", "route", "status")))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP istek süresi", ("method", "route")))
+
+# ---------- Depolama ----------
+
+STORAGE_LOADS = REGISTRY.register(Counter(
+    "storage_workbook_loads_total", "Çalışma kitabı yüklemeleri", ("mode",)))
+STORAGE_SAVES = REGISTRY.register(Counter(
+    "storage_workbook_saves_total", "Çalışma kitabı kayıtları"))
+STORAGE_BYTES_READ = REGISTRY.register(Counter(
+    "storage_bytes_read_total", "Yüklemelerde okunan bayt"))
+STORAGE_BYTES_WRITTEN = REGISTRY.register(Counter(
+    "storage_bytes_written_total", "Kayıtlarda yazılan bayt"))
+STORAGE_ROWS_SCANNED = REGISTRY.register(Counter(
+    "storage_rows_scanned_total", "Sayfa bazında taranan satırlar", ("table",)))
+STORAGE_LOAD_SECONDS = REGISTRY.register(Histogram(
+    "storage_load_duration_seconds", "Çalışma kitabı yükleme süresi"))
+STORAGE_SAVE_SECONDS = REGISTRY.register(Histogram(
+    "storage_save_duration_seconds", "Çalışma kitabı kayıt süresi"))
+
+# ---------- Önbellek / kuyruk ----------
+
+CACHE_ENTRIES = REGISTRY.register(Gauge(
+    "cache_entries", "Bellek içi önbelleklerdeki kayıt sayısı", ("cache",)))
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "queue_depth", "Bekleyen iş sayısı", ("queue",)))
+
+
+# ---------- İstek bazında depolama maliyeti ----------
+
+class RequestCost:
+    """Tek bir isteğin neden olduğu yükleme / kayıt / satır taraması"""
+
+    __slots__ = ("loads", "saves", "bytes_read", "bytes_written", "storage_seconds", "rows")
+
+    def __init__(self):
+        self.loads = 0
+        self.saves = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.storage_seconds = 0.0
+        self.rows: Dict[str, int] = {}
+
+    @property
+    def rows_scanned(self) -> int:
+        return sum(self.rows.values())
+
+    def summary(self) -> str:
+        """'loads=2;saves=0;rows=Malzemeler:150,Hareketler:40;storage_ms=12.3'"""
+        rows = ",".join(f"{table}:{count}" for table, count in sorted(self.rows.items()))
+        return (f"loads={self.loads};saves={self.saves};rows={rows or 0};"
+                f"bytes_read={self.bytes_read};bytes_written={self.bytes_written};"
+                f"storage_ms={self.storage_seconds * 1000:.1f}")
+
+
+_request_cost: ContextVar[Optional[RequestCost]] = ContextVar("request_cost", default=None)
+
+
+def start_request_cost() -> RequestCost:
+    """Geçerli bağlam (istek) için maliyet sayacını başlat"""
+    cost = RequestCost()
+    _request_cost.set(cost)
+    return cost
+
+
+def current_request_cost() -> Optional[RequestCost]:
+    return _request_cost.get()
+
+
+def charge_save(nbytes: int, seconds: float):
+    """Başka bir thread'de yapılan (toplu) kaydı geçerli isteğe yansıt"""
+    cost = _request_cost.get()
+    if cost is not None:
+        cost.saves += 1
+        cost.bytes_written += nbytes
+        cost.storage_seconds += seconds
+
+
+class StorageStats:
+    """ExcelManager'ın depolama olaylarını metriklere ve geçerli isteğin maliyetine aktarır"""
+
+    def __init__(self):
+        self.last_save = (0, 0.0)  # (bayt, süre) — yazıcı kuyruğu batch kaydını isteklere dağıtır
+
+    def record_load(self, nbytes: int, seconds: float, mode: str = "full"):
+        STORAGE_LOADS.inc(mode)
+        STORAGE_BYTES_READ.inc(amount=nbytes)
+        STORAGE_LOAD_SECONDS.observe(seconds)
+        cost = _request_cost.get()
+        if cost is not None:
+            cost.loads += 1
+            cost.bytes_read += nbytes
+            cost.storage_seconds += seconds
+
+    def record_save(self, nbytes: int, seconds: float):
+        STORAGE_SAVES.inc()
+        STORAGE_BYTES_WRITTEN.inc(amount=nbytes)
+        STORAGE_SAVE_SECONDS.observe(seconds)
+        self.last_save = (nbytes, seconds)
+        charge_save(nbytes, seconds)
+
+    def record_rows(self, table: str, count: int):
+        if count:
+            STORAGE_ROWS_SCANNED.inc(table, amount=count)
+            cost = _request_cost.get()
+            if cost is not None:
+                cost.rows[table] = cost.rows.get(table, 0) + count
@@ -57,6 +57,7 @@ class NotificationType(str, Enum):
     REQUEST_REJECTED = "Talep Reddedildi"
     ORDER_UPDATE = "Sipariş Güncelleme"
     BUDGET_WARNING = "Bütçe Uyarısı"
+    ANOMALY = "Olağandışı Hareket"
     SYSTEM = "Sistem"
 
 # ==================== KULLANICI ====================
@@ -175,6 +176,7 @@ class OrderBase(BaseModel):
 
 class OrderCreate(OrderBase):
     olusturan: str
+    tahmini_teslim: str = ""
 
 class Order(OrderBase):
     siparis_no: str
@@ -0,0 +1,96 @@
+"""
+Bildirim yayın merkezi
+İstemciler kullanıcı adıyla abone olur; yeni bildirimler ve güncel okunmamış
+sayıları Server-Sent Events ile anında iletilir, polling gerekmez.
+"""
+import asyncio
+import json
+import threading
+from typing import Callable, Dict, Optional, Set
+from starlette.concurrency import run_in_threadpool
+
+HEARTBEAT_SECONDS = 15
+QUEUE_SIZE = 100
+
+
+class NotificationHub:
+    def __init__(self, unread_count: Callable[[str], int]):
+        self._unread_count = unread_count
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, username: str) -> asyncio.Queue:
+        """Kullanıcı için yeni abonelik kuyruğu aç (event loop içinden çağrılır)"""
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(username, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, username: str, queue: asyncio.Queue):
+        with self._lock:
+            queues = self._subscribers.get(username)
+            if queues:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[username]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(q) for q in self._subscribers.values())
+
+    def publish(self, kullanici: str, notification=None):
+        """Bildirim ve okunmamış sayısını ilgili abonelere gönder (her thread'den çağrılabilir)
+
+        kullanici == "all" ise tüm abonelere gider.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        with self._lock:
+            if kullanici == "all":
+                targets = [(u, list(qs)) for u, qs in self._subscribers.items()]
+            else:
+                targets = [(kullanici, list(self._subscribers.get(kullanici, ())))]
+
+        for username, queues in targets:
+            if not queues:
+                continue
+            messages = []
+            if notification is not None:
+                messages.append(_sse("notification", notification.model_dump(mode="json")))
+            messages.append(_sse("unread", {"count": self._unread_count(username)}))
+            for queue in queues:
+                for message in messages:
+                    loop.call_soon_threadsafe(_offer, queue, message)
+
+    async def stream(self, username: str):
+        """Abonenin SSE akışı; boşta kalınca heartbeat gönderir"""
+        queue = self.subscribe(username)
+        try:
+            count = await run_in_threadpool(self._unread_count, username)
+            yield _sse("unread", {"count": count})
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield message
+        finally:
+            self.unsubscribe(username, queue)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _offer(queue: asyncio.Queue, message: str):
+    """Yavaş abonede kuyruk dolarsa en eski mesajı at"""
+    if queue.full():
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+    queue.put_nowait(message)
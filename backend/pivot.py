@@ -0,0 +1,111 @@
+"""
+Genel pivot / gruplama sorguları
+Bellekteki hareket veya malzeme satırları tek geçişte, istenen boyutlara göre
+gruplanır; her satır için boyut ve filtre değerleri önceden derlenmiş
+erişimcilerle okunur, model nesnesi üretilmez.
+- boyutlar: kategori, malzeme, ay, departman, lokasyon, tedarikci, islem_tipi
+- ölçüler: adet (kayıt sayısı), miktar (toplam), deger (miktar x birim fiyat)
+"""
+import re
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException
+
+GIRIS = "Giriş"
+MEASURES = ("adet", "miktar", "deger")
+SOURCES = ("hareket", "malzeme")
+_NO_MATERIAL = ("", "", 0)  # (kategori, konum, birim fiyat)
+_MONTH = re.compile(r"^\d{4}-\d{2}$")
+
+
+def _movement_fields(materials: Dict[str, tuple]) -> Dict[str, Callable]:
+    """Hareketler satırı -> boyut değeri; departman çıkışlarda, tedarikçi girişlerde teslim alan/veren sütunudur"""
+    return {
+        "ay": lambda row: str(row[0])[:7],
+        "malzeme": itemgetter(1),
+        "islem_tipi": itemgetter(2),
+        "kategori": lambda row: materials.get(row[1], _NO_MATERIAL)[0],
+        "lokasyon": lambda row: materials.get(row[1], _NO_MATERIAL)[1],
+        "departman": lambda row: "" if row[2] == GIRIS else (row[4] or ""),
+        "tedarikci": lambda row: (row[4] or "") if row[2] == GIRIS else "",
+    }
+
+
+def _material_fields() -> Dict[str, Callable]:
+    return {
+        "malzeme": itemgetter(0),
+        "kategori": lambda row: row[2] or "",
+        "lokasyon": lambda row: row[7] or "",
+    }
+
+
+def parse_pivot_query(kaynak: str, boyutlar: Optional[str], olculer: Optional[str],
+                      filtreler: Dict[str, str] = None, ay_baslangic: Optional[str] = None,
+                      ay_bitis: Optional[str] = None) -> Tuple[List[str], List[str]]:
+    """'kategori,ay' / 'miktar,deger' -> doğrulanmış boyut ve ölçü listeleri (filtreler ve ay sınırları da denetlenir)"""
+    if kaynak not in SOURCES:
+        raise HTTPException(status_code=400, detail="Geçersiz kaynak (hareket veya malzeme)")
+    for bound in (ay_baslangic, ay_bitis):
+        if bound and not _MONTH.match(bound):
+            raise HTTPException(status_code=400, detail=f"Ay YYYY-AA biçiminde olmalı: {bound}")
+    allowed = _movement_fields({}) if kaynak == "hareket" else _material_fields()
+    dims = [b.strip() for b in (boyutlar or "").split(",") if b.strip()]
+    measures = [o.strip() for o in (olculer or "").split(",") if o.strip()] or list(MEASURES)
+    unknown = [b for b in dims if b not in allowed] + [o for o in measures if o not in MEASURES]
+    unknown += [f for f, v in (filtreler or {}).items() if v and f not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Bilinmeyen boyut/ölçü: {', '.join(unknown)}")
+    return dims, measures
+
+
+def run_pivot(kaynak: str, rows: Iterable[tuple], materials: Dict[str, tuple],
+              boyutlar: List[str], olculer: List[str], filtreler: Dict[str, str] = None,
+              ay_baslangic: str = None, ay_bitis: str = None) -> List[dict]:
+    """Satırları tek geçişte grupla
+
+    rows: kaynak sayfanın ham satırları; materials: kod -> (kategori, konum, birim fiyat)
+    Sonuç ilk ölçüye göre azalan sıralıdır.
+    """
+    # Ay sınırları ay düzeyinde karşılaştırılır ("2025-03-15" -> "2025-03")
+    ay_baslangic, ay_bitis = (ay_baslangic or "")[:7], (ay_bitis or "")[:7]
+    if kaynak == "hareket":
+        fields = _movement_fields(materials)
+        qty = lambda row: row[3] or 0
+        price = lambda row: materials.get(row[1], _NO_MATERIAL)[2] or 0
+    else:
+        fields = _material_fields()
+        qty = lambda row: row[4] or 0
+        price = lambda row: row[10] or 0
+        ay_baslangic = ay_bitis = None
+
+    key_fns = [fields[b] for b in boyutlar]
+    checks = [(fields[b], v) for b, v in (filtreler or {}).items() if v]
+    month = fields.get("ay")
+    groups: Dict[tuple, list] = {}
+    for row in rows:
+        if not row[0]:
+            continue
+        if ay_baslangic or ay_bitis:
+            ay = month(row)
+            if (ay_baslangic and ay < ay_baslangic) or (ay_bitis and ay > ay_bitis):
+                continue
+        if checks and any(fn(row) != v for fn, v in checks):
+            continue
+        key = tuple(fn(row) for fn in key_fns)
+        bucket = groups.get(key)
+        if bucket is None:
+            bucket = groups[key] = [0, 0, 0.0]
+        miktar = qty(row)
+        bucket[0] += 1
+        bucket[1] += miktar
+        bucket[2] += miktar * price(row)
+
+    result = []
+    for key, (adet, miktar, deger) in groups.items():
+        item = dict(zip(boyutlar, key))
+        values = {"adet": adet, "miktar": miktar, "deger": round(deger, 2)}
+        item.update((o, values[o]) for o in olculer)
+        result.append(item)
+    if olculer:
+        result.sort(key=lambda r: r[olculer[0]], reverse=True)
+    return result
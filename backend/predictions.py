@@ -0,0 +1,167 @@
+"""
+Stok tükenme tahmini
+Çıkış hareketleri malzeme ve gün bazında tek geçişte gruplanır; günlük tüketim
+son WINDOW_DAYS günlük gerçek tarih penceresinde üstel ağırlıklı ortalama (EWMA)
+ile hesaplanır. Yeni hareketler O(1) eklenir; kayıtlarda yalnızca değişen
+malzemelerin tahmini yeniden hesaplanır, tüm liste gün dönünce yenilenir.
+"""
+import threading
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+WINDOW_DAYS = 90
+HALF_LIFE_DAYS = 14
+MAX_HORIZON_DAYS = 36500  # tahmini bitiş tarihi için üst sınır (çok düşük tüketimde taşmasın)
+CIKIS = "Çıkış"
+
+PRIORITY_ORDER = {"Acil": 0, "Yüksek": 1, "Normal": 2, "Düşük": 3}
+
+
+def _day(tarih) -> Optional[int]:
+    """'2025-01-31 10:00' / datetime -> gün sıra numarası"""
+    try:
+        return date.fromisoformat(str(tarih)[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+def _priority(days_left: float) -> str:
+    if days_left <= 7:
+        return "Acil"
+    if days_left <= 14:
+        return "Yüksek"
+    if days_left <= 30:
+        return "Normal"
+    return "Düşük"
+
+
+class ConsumptionModel:
+    """Malzeme bazında günlük çıkış toplamları (pencere içi) ve ilk hareket günü"""
+
+    def __init__(self, window_days: int = WINDOW_DAYS, half_life_days: float = HALF_LIFE_DAYS):
+        self.window_days = window_days
+        self.decay = 0.5 ** (1 / half_life_days)
+        self._lock = threading.Lock()
+        self.built = False
+        self._exits: Dict[str, Dict[int, int]] = {}  # kod -> {gün: çıkış miktarı}
+        self._first_day: Dict[str, int] = {}          # kod -> ilk hareket günü
+
+    def __len__(self):
+        return len(self._exits)
+
+    def _apply(self, tarih, kod: str, islem_tipi: str, miktar: int, horizon: int):
+        day = _day(tarih)
+        if day is None or not kod:
+            return
+        first = self._first_day.get(kod)
+        if first is None or day < first:
+            self._first_day[kod] = day
+        if islem_tipi == CIKIS and day >= horizon:
+            days = self._exits.setdefault(kod, {})
+            days[day] = days.get(day, 0) + (miktar or 0)
+
+    def rebuild(self, movements: Iterable[Tuple]):
+        """(tarih, malzeme_kodu, islem_tipi, miktar) satırlarından tek geçişte kur"""
+        horizon = date.today().toordinal() - self.window_days + 1
+        with self._lock:
+            self._exits, self._first_day = {}, {}
+            for tarih, kod, islem_tipi, miktar in movements:
+                self._apply(tarih, kod, islem_tipi, miktar, horizon)
+            self.built = True
+
+    def invalidate(self):
+        with self._lock:
+            self.built = False
+
+    def add(self, tarih, kod: str, islem_tipi: str, miktar: int):
+        with self._lock:
+            if self.built:
+                self._apply(tarih, kod, islem_tipi, miktar, date.today().toordinal() - self.window_days + 1)
+
+    def _rate(self, kod: str, days: Dict[int, int], today: int) -> float:
+        horizon = today - self.window_days + 1
+        decay = self.decay
+        weighted = 0.0
+        for day in [d for d in days if d < horizon]:
+            del days[day]
+        for day, qty in days.items():
+            if day <= today:
+                weighted += qty * decay ** (today - day)
+        if weighted <= 0:
+            return 0.0
+        span = min(self.window_days, today - self._first_day.get(kod, horizon) + 1)
+        norm = (1 - decay ** max(span, 1)) / (1 - decay)
+        return weighted / norm
+
+    def _demand(self, kod: str, days: Dict[int, int], today: int) -> Optional[Tuple[float, float]]:
+        horizon = today - self.window_days + 1
+        total = squares = 0
+        for day, qty in days.items():
+            if horizon <= day <= today:
+                total += qty
+                squares += qty * qty
+        if total <= 0:
+            return None
+        span = max(min(self.window_days, today - self._first_day.get(kod, horizon) + 1), 1)
+        mean = total / span
+        return mean, max(squares / span - mean * mean, 0.0) ** 0.5
+
+    def daily_rates(self, today: int, kodlar: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """kod -> EWMA günlük tüketim (sıfırdan büyük olanlar; kodlar verilirse yalnızca onlar)
+
+        Pencere, malzemenin ilk hareketinden bu yana geçen süreyle sınırlanır; yeni
+        malzemelerin tüketimi boş günlerle seyreltilmez. Sabit günlük c tüketimi c verir.
+        """
+        rates = {}
+        with self._lock:
+            for kod, days in self._select(kodlar):
+                rate = self._rate(kod, days, today)
+                if rate > 0:
+                    rates[kod] = rate
+        return rates
+
+    def demand_stats(self, today: int, kodlar: Optional[Iterable[str]] = None) -> Dict[str, Tuple[float, float]]:
+        """kod -> (günlük ortalama, günlük standart sapma); pencere içindeki çıkışsız günler sıfır talep sayılır"""
+        stats = {}
+        with self._lock:
+            for kod, days in self._select(kodlar):
+                demand = self._demand(kod, days, today)
+                if demand is not None:
+                    stats[kod] = demand
+        return stats
+
+    def _select(self, kodlar: Optional[Iterable[str]]):
+        if kodlar is None:
+            return list(self._exits.items())
+        return [(kod, self._exits[kod]) for kod in kodlar if kod in self._exits]
+
+
+def build_predictions(materials: Iterable[Tuple], rates: Dict[str, float], today: date,
+                      order_quantities: Optional[Dict[str, int]] = None) -> List[dict]:
+    """(kod, ad, mevcut_stok, max_seviye) satırları ve tüketim hızlarından tahmin listesi
+
+    order_quantities verilirse önerilen sipariş miktarı oradan (yeniden sipariş motoru) alınır.
+    """
+    predictions = []
+    for kod, ad, mevcut, max_seviye in materials:
+        daily = rates.get(kod)
+        if not daily:
+            continue
+        days_left = mevcut / daily
+        predictions.append({
+            "malzeme_kodu": kod,
+            "malzeme_adi": ad,
+            "mevcut_stok": mevcut,
+            "gunluk_tuketim": round(daily, 2),
+            "tahmini_bitis": (today + timedelta(days=min(days_left, MAX_HORIZON_DAYS))).strftime("%Y-%m-%d"),
+            "kalan_gun": int(days_left),
+            "onerilen_siparis": (order_quantities[kod] if order_quantities and kod in order_quantities
+                                 else max(0, int((max_seviye - mevcut) * 1.2))),
+            "oncelik": _priority(days_left),
+        })
+    return sort_predictions(predictions)
+
+
+def sort_predictions(predictions: Iterable[dict]) -> List[dict]:
+    """Önceliğe, sonra kalan güne göre sırala"""
+    return sorted(predictions, key=lambda p: (PRIORITY_ORDER[p["oncelik"]], p["kalan_gun"]))
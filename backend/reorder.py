@@ -0,0 +1,111 @@
+"""
+Yeniden sipariş önerileri
+Tüm malzemeler için tek geçişte emniyet stoku, yeniden sipariş noktası ve
+ekonomik sipariş miktarı (EOQ) hesaplanır:
+    emniyet stoku  = z x günlük talep std x karekök(tedarik süresi)
+    sipariş noktası = max(günlük ortalama x tedarik süresi + emniyet stoku, min seviye)
+    EOQ            = karekök(2 x yıllık talep x sipariş maliyeti / (elde tutma oranı x birim fiyat))
+Talep istatistikleri ConsumptionModel'den, tedarik süreleri teslim edilen
+siparişlerden (LeadTimeModel) gelir; ikisi de kayıtlarda artımlı güncellenir.
+Öneriler malzeme başına bağımsızdır; kayıtlarda yalnızca değişen malzemeler
+yeniden hesaplanıp liste yeniden sıralanır.
+"""
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from aggregates import parse_datetime
+
+SERVICE_LEVEL_Z = 1.65      # ~%95 hizmet düzeyi
+ORDER_COST = 250.0          # sipariş başına sabit maliyet (TL)
+HOLDING_RATE = 0.25         # yıllık elde tutma maliyeti / birim fiyat
+DEFAULT_LEAD_DAYS = 7.0     # teslim geçmişi olmayan malzemeler için
+
+
+class LeadTimeModel:
+    """Malzeme bazında teslim süresi toplamı ve teslim sayısı (sipariş tarihi -> teslim tarihi)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.built = False
+        self._materials: Dict[str, list] = {}  # kod -> [toplam gün, teslim sayısı]
+        self._total = [0.0, 0]
+
+    def __len__(self):
+        return len(self._materials)
+
+    def _apply(self, tarih, teslim, kodlar: Iterable[str], sign: int):
+        ordered, delivered = parse_datetime(tarih), parse_datetime(teslim)
+        if ordered is None or delivered is None:
+            return
+        days = (delivered - ordered).total_seconds() / 86400
+        self._total[0] += sign * days
+        self._total[1] += sign
+        for kod in set(kodlar):
+            entry = self._materials.setdefault(kod, [0.0, 0])
+            entry[0] += sign * days
+            entry[1] += sign
+
+    def rebuild(self, deliveries: Iterable[Tuple]):
+        """(sipariş tarihi, teslim tarihi, [malzeme kodları]) satırlarından kur"""
+        with self._lock:
+            self._materials, self._total = {}, [0.0, 0]
+            for tarih, teslim, kodlar in deliveries:
+                self._apply(tarih, teslim, kodlar, 1)
+            self.built = True
+
+    def invalidate(self):
+        with self._lock:
+            self.built = False
+
+    def add(self, tarih, teslim, kodlar: Iterable[str], sign: int = 1):
+        with self._lock:
+            if self.built:
+                self._apply(tarih, teslim, kodlar, sign)
+
+    def lead_days(self, kodlar: Optional[Iterable[str]] = None) -> Tuple[Dict[str, float], float]:
+        """(kod -> ortalama teslim günü, genel ortalama); kodlar verilirse yalnızca onlar"""
+        with self._lock:
+            entries = (self._materials.items() if kodlar is None
+                       else ((kod, self._materials[kod]) for kod in kodlar if kod in self._materials))
+            per_material = {kod: days / count for kod, (days, count) in entries if count > 0}
+            overall = self._total[0] / self._total[1] if self._total[1] > 0 else DEFAULT_LEAD_DAYS
+        return per_material, overall
+
+
+def build_recommendations(materials: Iterable[Tuple], demand: Dict[str, Tuple[float, float]],
+                          lead_days: Dict[str, float], default_lead: float) -> List[dict]:
+    """(kod, ad, mevcut, min, max, birim fiyat) satırlarından öneri listesi (sipariş gerekenler önce)"""
+    result = []
+    for kod, ad, mevcut, min_s, max_s, fiyat in materials:
+        mean, std = demand.get(kod, (0.0, 0.0))
+        lead = max(lead_days.get(kod, default_lead), 0.0)
+        safety = SERVICE_LEVEL_Z * std * lead ** 0.5
+        reorder_point = max(mean * lead + safety, min_s)
+        annual = mean * 365
+        if annual > 0 and fiyat > 0:
+            eoq = (2 * annual * ORDER_COST / (HOLDING_RATE * fiyat)) ** 0.5
+        else:
+            eoq = max(max_s - min_s, 0)
+        needed = mevcut <= reorder_point
+        quantity = 0
+        if needed:
+            # Talep varsa EOQ (en az sipariş noktasının üstüne çıkaracak kadar); yoksa max seviyeye tamamla
+            quantity = max(eoq, reorder_point - mevcut) if mean > 0 else max(max_s - mevcut, 0)
+        result.append({
+            "malzeme_kodu": kod,
+            "malzeme_adi": ad,
+            "mevcut_stok": mevcut,
+            "gunluk_ortalama": round(mean, 2),
+            "gunluk_sapma": round(std, 2),
+            "tedarik_suresi_gun": round(lead, 1),
+            "emniyet_stoku": int(round(safety)),
+            "siparis_noktasi": int(round(reorder_point)),
+            "eoq": int(round(eoq)),
+            "siparis_gerekli": needed,
+            "onerilen_siparis": int(round(quantity)),
+        })
+    return sort_recommendations(result)
+
+
+def sort_recommendations(recommendations: Iterable[dict]) -> List[dict]:
+    """Sipariş gerekenler önce, sonra sipariş noktasına en yakın stok"""
+    return sorted(recommendations, key=lambda r: (not r["siparis_gerekli"], r["mevcut_stok"] - r["siparis_noktasi"]))
@@ -0,0 +1,198 @@
+"""
+Malzeme arama indeksi
+Ad, kod, barkod, konum ve raf alanları üzerinde Türkçe harf katlamalı ters indeks.
+Önek eşleşmesi sıralı terim listesinde ikili arama ile, kelime içi eşleşme
+trigram indeksi ile bulunur; sonuçlar alan ağırlığı ve eşleşme türüne göre sıralanır.
+"""
+import heapq
+import re
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from models import Material
+
+# Alan -> ağırlık (kod/barkod tam eşleşmeleri ad eşleşmelerinden önce gelir)
+FIELD_WEIGHTS = {
+    "kod": 5.0,
+    "barkod": 5.0,
+    "ad": 3.0,
+    "konum": 1.0,
+    "raf": 1.0,
+}
+
+# Eşleşme türü çarpanları
+EXACT, PREFIX, INFIX = 3.0, 2.0, 1.0
+
+_TR_CASE = str.maketrans({"İ": "i", "I": "ı"})
+_TR_ASCII = str.maketrans({"ç": "c", "ğ": "g", "ı": "i", "ö": "o", "ş": "s", "ü": "u",
+                           "â": "a", "î": "i", "û": "u", "\u0307": None})
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def turkish_fold(text) -> str:
+    """Türkçe kurallarıyla küçük harfe çevir ve aksanları at ('İĞNE' -> 'igne', 'ışık' -> 'isik')"""
+    if text is None:
+        return ""
+    return str(text).translate(_TR_CASE).lower().translate(_TR_ASCII)
+
+
+def tokenize(text) -> List[str]:
+    return _TOKEN_RE.findall(turkish_fold(text))
+
+
+def _trigrams(token: str) -> Set[str]:
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+class MaterialSearchIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.built = False
+        self._docs: Dict[str, Material] = {}
+        self._names: Dict[str, str] = {}                      # kod -> katlanmış ad (eşit skorda sıralama)
+        self._doc_terms: Dict[str, Dict[str, float]] = {}   # kod -> {terim: ağırlık}
+        self._postings: Dict[str, Dict[str, float]] = {}    # terim -> {kod: ağırlık}
+        self._terms: List[str] = []                           # sıralı terimler (önek araması)
+        self._trigrams: Dict[str, Set[str]] = {}              # trigram -> terimler
+
+    def __len__(self):
+        return len(self._docs)
+
+    # ---------- bakım ----------
+
+    def rebuild(self, materials: Iterable[Material]):
+        with self._lock:
+            self._docs.clear()
+            self._names.clear()
+            self._doc_terms.clear()
+            self._postings.clear()
+            self._terms = []
+            self._trigrams.clear()
+            for material in materials:
+                self._add(material)
+            self.built = True
+
+    def invalidate(self):
+        with self._lock:
+            self.built = False
+
+    def upsert(self, material: Material, old_kod: Optional[str] = None):
+        """Malzemeyi ekle veya güncelle (kod değiştiyse eski kaydı kaldır)"""
+        with self._lock:
+            if not self.built:
+                return
+            self._remove(old_kod or material.kod)
+            if old_kod and old_kod != material.kod:
+                self._remove(material.kod)
+            self._add(material)
+
+    def update_document(self, kod: str, **changes):
+        """İndekslenmeyen alanları (stok, durum...) terimlere dokunmadan güncelle"""
+        with self._lock:
+            doc = self._docs.get(kod)
+            if doc is not None:
+                self._docs[kod] = doc.model_copy(update=changes)
+
+    def remove(self, kod: str):
+        with self._lock:
+            if self.built:
+                self._remove(kod)
+
+    def _add(self, material: Material):
+        terms: Dict[str, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(getattr(material, field, "")):
+                if weight > terms.get(term, 0):
+                    terms[term] = weight
+
+        self._docs[material.kod] = material
+        self._names[material.kod] = turkish_fold(material.ad)
+        self._doc_terms[material.kod] = terms
+        for term, weight in terms.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = {}
+                insort(self._terms, term)
+                for gram in _trigrams(term):
+                    self._trigrams.setdefault(gram, set()).add(term)
+            posting[material.kod] = weight
+
+    def _remove(self, kod: str):
+        terms = self._doc_terms.pop(kod, None)
+        self._docs.pop(kod, None)
+        self._names.pop(kod, None)
+        if not terms:
+            return
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(kod, None)
+            if not posting:
+                del self._postings[term]
+                idx = bisect_left(self._terms, term)
+                if idx < len(self._terms) and self._terms[idx] == term:
+                    del self._terms[idx]
+                for gram in _trigrams(term):
+                    grams = self._trigrams.get(gram)
+                    if grams is not None:
+                        grams.discard(term)
+                        if not grams:
+                            del self._trigrams[gram]
+
+    # ---------- sorgu ----------
+
+    def _matching_terms(self, q: str) -> List[Tuple[str, float]]:
+        """Sorgu terimine uyan indeks terimleri ve eşleşme çarpanları"""
+        matches = {}
+        terms = self._terms
+        idx = bisect_left(terms, q)
+        while idx < len(terms) and terms[idx].startswith(q):
+            matches[terms[idx]] = EXACT if terms[idx] == q else PREFIX
+            idx += 1
+
+        if len(q) >= 3:
+            grams = _trigrams(q)
+            candidates = None
+            for gram in sorted(grams, key=lambda g: len(self._trigrams.get(g, ()))):
+                gram_terms = self._trigrams.get(gram)
+                if not gram_terms:
+                    candidates = set()
+                    break
+                candidates = set(gram_terms) if candidates is None else candidates & gram_terms
+                if not candidates:
+                    break
+            for term in candidates or ():
+                if term not in matches and q in term:
+                    matches[term] = INFIX
+        return list(matches.items())
+
+    def search(self, query: str, limit: Optional[int] = 20) -> List[Material]:
+        """Tüm sorgu terimlerini içeren malzemeleri alakaya göre sıralı döndür"""
+        q_terms = tokenize(query)
+        if not q_terms:
+            return []
+
+        with self._lock:
+            scores: Optional[Dict[str, float]] = None
+            for q in dict.fromkeys(q_terms):
+                term_scores: Dict[str, float] = {}
+                for term, factor in self._matching_terms(q):
+                    for kod, weight in self._postings[term].items():
+                        score = weight * factor
+                        if score > term_scores.get(kod, 0):
+                            term_scores[kod] = score
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {kod: s + term_scores[kod] for kod, s in scores.items() if kod in term_scores}
+                if not scores:
+                    return []
+
+            names = self._names
+            keyed = [(-score, names[kod], kod) for kod, score in scores.items()]
+            if limit is not None:
+                keyed = heapq.nsmallest(limit, keyed)
+            else:
+                keyed.sort()
+            return [self._docs[kod] for _, _, kod in keyed]
@@ -0,0 +1,87 @@
+"""
+İkili veri görüntüsü
+Çalışma kitabının ayrıştırılmış sayfa satırları msgpack ile xlsx dosyasının yanına
+yazılır. Görüntü, yazıldığı andaki xlsx dosyasının boyutunu ve değişiklik zamanını
+taşır; açılışta bunlar güncel dosyayla eşleşiyorsa xlsx ayrıştırılmadan görüntü
+yüklenir, eşleşmiyorsa (dosya sonradan değiştiyse) görüntü yok sayılır.
+msgpack kurulu değilse görüntü devre dışıdır ve her açılışta xlsx ayrıştırılır.
+"""
+import os
+from datetime import date, datetime, time
+from typing import Dict, List, Optional
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FORMAT_VERSION = 1
+
+# Hücrelerde openpyxl'in döndürebildiği tarih/saat türleri için msgpack uzantı kodları
+_EXT_DATETIME, _EXT_DATE, _EXT_TIME = 1, 2, 3
+
+
+def snapshot_path(source_path: str) -> str:
+    return f"{source_path}.snapshot"
+
+
+def _source_stamp(source_path: str) -> List[int]:
+    stat = os.stat(source_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, value.isoformat().encode("ascii"))
+    if isinstance(value, date):
+        return msgpack.ExtType(_EXT_DATE, value.isoformat().encode("ascii"))
+    if isinstance(value, time):
+        return msgpack.ExtType(_EXT_TIME, value.isoformat().encode("ascii"))
+    raise TypeError(f"Görüntüye yazılamayan değer türü: {type(value).__name__}")
+
+
+def _decode(code: int, data: bytes):
+    text = data.decode("ascii")
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(text)
+    if code == _EXT_DATE:
+        return date.fromisoformat(text)
+    if code == _EXT_TIME:
+        return time.fromisoformat(text)
+    return msgpack.ExtType(code, data)
+
+
+def save_snapshot(source_path: str, tables: Dict[str, list]) -> bool:
+    """Sayfa satırlarını görüntü dosyasına yaz (geçici dosya + taşıma)"""
+    if msgpack is None:
+        return False
+    body = {
+        "surum": FORMAT_VERSION,
+        "kaynak": _source_stamp(source_path),
+        "tablolar": tables,
+    }
+    path = snapshot_path(source_path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(msgpack.packb(body, default=_encode, use_bin_type=True))
+    os.replace(tmp_path, path)
+    return True
+
+
+def load_snapshot(source_path: str) -> Optional[Dict[str, tuple]]:
+    """Görüntü xlsx dosyasının güncel hâline aitse sayfa satırlarını döndür"""
+    path = snapshot_path(source_path)
+    if msgpack is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            body = msgpack.unpackb(f.read(), raw=False, use_list=False, ext_hook=_decode,
+                                   strict_map_key=False)
+    except Exception as e:
+        print(f"Snapshot okunamadı, xlsx ayrıştırılacak: {e}")
+        return None
+    if not isinstance(body, dict) or body.get("surum") != FORMAT_VERSION:
+        return None
+    if list(body.get("kaynak", ())) != _source_stamp(source_path):
+        return None
+    return body["tablolar"]
@@ -0,0 +1,94 @@
+"""
+Geçmiş tarihli stok sorguları için aylık kontrol noktaları
+Her malzeme için ay sonlarındaki kümülatif net hareket (giriş - çıkış) tutulur;
+yalnızca o ay hareket gören malzemeler için nokta eklenir. T tarihindeki stok:
+    güncel stok - (toplam net - T anındaki kümülatif net)
+T anındaki kümülatif net = T'nin ayından önceki en yakın kontrol noktası + o ayın
+başından T'ye kadarki hareketler. Böylece sorgu tüm geçmişi değil, en fazla bir
+aylık hareketi yeniden oynatır.
+Çıkışlar stoku sıfırın altına düşürmez (create_movement kırpar); bu yüzden net
+hesabında istenen miktar değil, Hareketler sayfasındaki "Uygulanan" sütununa
+yazılan gerçek stok değişimi kullanılır. Sütundan önce kaydedilmiş hareketlerde
+istenen miktara düşülür.
+Stok yalnızca hareketlerle değişmiş varsayılır; T'den sonraki elle düzeltmeler
+(malzeme güncelleme, sayım) geriye doğru yansıtılmaz.
+"""
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple
+
+GIRIS = "Giriş"
+APPLIED_COLUMN = 8  # Hareketler: "Uygulanan"
+
+
+def signed_quantity(islem_tipi: str, miktar) -> int:
+    return (miktar or 0) if islem_tipi == GIRIS else -(miktar or 0)
+
+
+def applied_quantity(row) -> int:
+    """Hareket satırının stoka uygulanan miktarı (eski satırlarda istenen miktar)"""
+    if len(row) > APPLIED_COLUMN and row[APPLIED_COLUMN] not in (None, ""):
+        return row[APPLIED_COLUMN]
+    return row[3]
+
+
+class StockCheckpoints:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.built = False
+        self._months: Dict[str, List[str]] = {}   # kod -> sıralı aylar ("YYYY-MM")
+        self._cumulative: Dict[str, List[int]] = {}  # kod -> aylara paralel ay sonu kümülatif net
+
+    def __len__(self):
+        return sum(len(months) for months in self._months.values())
+
+    def rebuild(self, movements: Iterable[Tuple]):
+        """(tarih, malzeme_kodu, islem_tipi, miktar) satırlarından tek geçişte kur"""
+        monthly: Dict[str, Dict[str, int]] = {}
+        for tarih, kod, islem_tipi, miktar in movements:
+            month = str(tarih)[:7]
+            if kod and len(month) == 7:
+                by_month = monthly.setdefault(kod, {})
+                by_month[month] = by_month.get(month, 0) + signed_quantity(islem_tipi, miktar)
+        months, cumulative = {}, {}
+        for kod, by_month in monthly.items():
+            ordered = sorted(by_month)
+            running, values = 0, []
+            for month in ordered:
+                running += by_month[month]
+                values.append(running)
+            months[kod], cumulative[kod] = ordered, values
+        with self._lock:
+            self._months, self._cumulative = months, cumulative
+            self.built = True
+
+    def invalidate(self):
+        with self._lock:
+            self.built = False
+
+    def add(self, tarih, kod: str, islem_tipi: str, miktar: int):
+        """Kaydedilen yeni hareketi (en son ay) ekle"""
+        month = str(tarih)[:7]
+        with self._lock:
+            if not self.built:
+                return
+            months = self._months.setdefault(kod, [])
+            values = self._cumulative.setdefault(kod, [])
+            delta = signed_quantity(islem_tipi, miktar)
+            if months and months[-1] == month:
+                values[-1] += delta
+            elif not months or months[-1] < month:
+                months.append(month)
+                values.append((values[-1] if values else 0) + delta)
+            else:
+                self.built = False  # geçmiş tarihli hareket: sonraki sorguda yeniden kurulur
+
+    def net_after(self, kod: str, month: str, partial: int) -> int:
+        """month'un başından önceki kontrol noktası + partial (ayın içindeki net) sonrasındaki net hareket"""
+        with self._lock:
+            months = self._months.get(kod)
+            if not months:
+                return -partial
+            idx = bisect_left(months, month)
+            before = self._cumulative[kod][idx - 1] if idx else 0
+            return self._cumulative[kod][-1] - before - partial
@@ -0,0 +1,122 @@
+"""
+Günlük stok değeri zaman serisi
+Her kayıt, malzeme bazında stok miktarı ve değerinin bir önceki kayda göre
+değişen kısmını (delta) ve o anın kategori toplamlarını taşır; değişmeyen
+malzemeler yer kaplamaz. Kayıtlar xlsx dosyasının yanındaki JSON satırları
+dosyasına eklenir; aynı güne ait birden çok kayıt varsa sonuncusu geçerlidir.
+Toplam değer serisi gün sayısıyla (O(gün)), tek malzemenin serisi o malzemenin
+değişiklik sayısıyla orantılı okunur.
+"""
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+
+def history_path(source_path: str) -> str:
+    return f"{source_path}.stock-history.jsonl"
+
+
+class StockHistory:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.loaded = False
+        self._state: Dict[str, list] = {}               # kod -> [kategori, miktar, deger] (son kayıt)
+        self._changes: Dict[str, List[tuple]] = {}      # kod -> [(gün, miktar, deger)] değişiklik günlüğü
+        self._days: List[str] = []                      # sıralı günler
+        self._totals: List[dict] = []                   # günlere paralel: {kategori: [miktar, deger]}
+
+    def __len__(self):
+        return len(self._days)
+
+    def _apply(self, record: dict):
+        gun = record["gun"]
+        for kod, (kategori, miktar, deger) in record.get("malzemeler", {}).items():
+            self._state[kod] = [kategori, miktar, deger]
+            log = self._changes.setdefault(kod, [])
+            if log and log[-1][0] == gun:
+                log[-1] = (gun, miktar, deger)
+            else:
+                log.append((gun, miktar, deger))
+        if self._days and self._days[-1] == gun:
+            self._totals[-1] = record["kategoriler"]
+        else:
+            self._days.append(gun)
+            self._totals.append(record["kategoriler"])
+
+    def load(self):
+        """Dosyadaki kayıtları sırayla uygula (yarım kalmış son satır atlanır)"""
+        with self._lock:
+            if self.loaded:
+                return
+            if os.path.exists(self.path):
+                with open(self.path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            self._apply(json.loads(line))
+                        except (ValueError, KeyError) as e:
+                            print(f"Stok geçmişi satırı atlandı: {e}")
+            self.loaded = True
+
+    def record(self, gun: str, materials: Dict[str, Tuple[str, int, float]]) -> bool:
+        """Güncel stok durumunu kaydet; önceki kayda göre değişiklik yoksa ve gün aynıysa yazmaz
+
+        materials: kod -> (kategori, miktar, deger)
+        """
+        with self._lock:
+            delta = {}
+            for kod, (kategori, miktar, deger) in materials.items():
+                deger = round(deger, 2)
+                if self._state.get(kod) != [kategori, miktar, deger]:
+                    delta[kod] = [kategori, miktar, deger]
+            for kod, (kategori, miktar, _) in self._state.items():
+                if kod not in materials and miktar:
+                    delta[kod] = [kategori, 0, 0.0]  # silinen malzeme
+            if not delta and self._days and self._days[-1] == gun:
+                return False
+
+            categories: Dict[str, list] = {}
+            for kategori, miktar, deger in materials.values():
+                bucket = categories.setdefault(kategori, [0, 0.0])
+                bucket[0] += miktar
+                bucket[1] += deger
+            record = {
+                "gun": gun,
+                "malzemeler": delta,
+                "kategoriler": {k: [m, round(d, 2)] for k, (m, d) in categories.items()},
+            }
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._apply(record)
+            return True
+
+    def series(self, baslangic: Optional[str] = None, bitis: Optional[str] = None,
+               kategori: Optional[str] = None) -> List[dict]:
+        """[baslangic, bitis] aralığındaki günlük toplam (veya kategori) miktar ve değer"""
+        with self._lock:
+            start = bisect_left(self._days, baslangic) if baslangic else 0
+            end = bisect_right(self._days, bitis) if bitis else len(self._days)
+            result = []
+            for gun, totals in zip(self._days[start:end], self._totals[start:end]):
+                if kategori:
+                    miktar, deger = totals.get(kategori, (0, 0.0))
+                else:
+                    miktar = sum(t[0] for t in totals.values())
+                    deger = sum(t[1] for t in totals.values())
+                result.append({"tarih": gun, "miktar": miktar, "deger": round(deger, 2)})
+            return result
+
+    def material_series(self, kod: str, baslangic: Optional[str] = None,
+                        bitis: Optional[str] = None) -> List[dict]:
+        """Tek malzemenin değişiklik günlerindeki miktar ve değeri (aralık başındaki değer dahil)"""
+        with self._lock:
+            log = self._changes.get(kod, [])
+            days = [entry[0] for entry in log]
+            start = bisect_right(days, baslangic) - 1 if baslangic else 0
+            end = bisect_right(days, bitis) if bitis else len(log)
+            return [
+                {"tarih": max(gun, baslangic) if baslangic else gun, "miktar": miktar, "deger": deger}
+                for gun, miktar, deger in log[max(start, 0):end]
+            ]
@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_manager import ExcelManager  # noqa: E402
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Örnek verili geçici çalışma kitabı üzerinde ısınmamış yönetici"""
+    return ExcelManager(str(tmp_path / "inventory_data.xlsx"))
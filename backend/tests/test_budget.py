@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from openpyxl import load_workbook
+
+from excel_manager import ExcelManager
+
+
+def _with_budget(manager, yil: int) -> ExcelManager:
+    wb = load_workbook(manager.file_path)
+    wb["Butce"].append([yil, "Kırtasiye", 5000, 60000, 0, 60000])
+    wb.save(manager.file_path)
+    return ExcelManager(manager.file_path)
+
+
+def test_update_budget_books_past_year_into_december(manager):
+    gecen_yil = datetime.now().year - 1
+    manager = _with_budget(manager, gecen_yil)
+
+    manager.update_budget(gecen_yil, "Kırtasiye", 750)
+
+    assert manager.get_budget_month(gecen_yil, 12)["harcama"] == 750
+    assert sum(manager.get_budget_month(gecen_yil, ay)["harcama"] for ay in range(1, 13)) == 750
+    assert manager.get_budget_summary(gecen_yil).kullanilan == 750
+
+
+def test_update_budget_books_given_month(manager):
+    gecen_yil = datetime.now().year - 1
+    manager = _with_budget(manager, gecen_yil)
+
+    manager.update_budget(gecen_yil, "Kırtasiye", 300, ay=3)
+
+    assert manager.get_budget_month(gecen_yil, 3)["harcama"] == 300
+    assert manager.get_budget_month(gecen_yil, 12)["harcama"] == 0
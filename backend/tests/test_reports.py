@@ -0,0 +1,17 @@
+from models import MovementType, StockMovementCreate
+
+
+def _exit(kod: str, teslim_alan: str, miktar: int) -> StockMovementCreate:
+    return StockMovementCreate(malzeme_kodu=kod, islem_tipi=MovementType.CIKIS, miktar=miktar,
+                               tedarikci_teslim_alan=teslim_alan)
+
+
+def test_blank_recipient_does_not_merge_with_bilinmiyor_department(manager):
+    manager.create_movement(_exit("MAL002", "", 2))
+    manager.create_movement(_exit("MAL002", "Bilinmiyor", 3))
+    manager.create_movement(_exit("MAL003", "Bilinmiyor", 1))
+
+    rows = manager.get_department_consumption("Bilinmiyor")
+
+    assert sorted((r["toplam_miktar"], r["kalem_sayisi"]) for r in rows) == [(2, 1), (4, 2)]
+    assert all(r["departman"] == "Bilinmiyor" for r in rows)
@@ -0,0 +1,28 @@
+import threading
+
+from models import Category, MaterialCreate, Unit
+
+
+def _material(kod: str) -> MaterialCreate:
+    return MaterialCreate(kod=kod, ad="Zımba Teli 24/6", kategori=Category.KIRTASIYE, birim=Unit.KUTU,
+                          mevcut_stok=5, min_seviye=1, max_seviye=20, konum="Depo A", raf="A-1",
+                          barkod="", birim_fiyat=3.5)
+
+
+def test_commit_during_lazy_rebuild_is_searchable(manager):
+    index = manager.search_index
+    original_rebuild = index.rebuild
+    writer = threading.Thread(target=manager.create_material, args=(_material("MALZT1"),))
+
+    def rebuild_with_concurrent_commit(materials):
+        # Kurulum sürerken başka bir thread malzeme kaydetsin
+        materials = list(materials)
+        writer.start()
+        writer.join(0.5)
+        original_rebuild(materials)
+
+    index.rebuild = rebuild_with_concurrent_commit
+    manager.search_materials("kalem")
+    writer.join()
+
+    assert "MALZT1" in [m.kod for m in manager.search_materials("zımba teli")]
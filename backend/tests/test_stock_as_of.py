@@ -0,0 +1,26 @@
+from datetime import date, timedelta
+
+from models import MovementType, StockMovementCreate
+
+
+def _movement(tip: MovementType, miktar: int) -> StockMovementCreate:
+    return StockMovementCreate(malzeme_kodu="MAL002", islem_tipi=tip, miktar=miktar,
+                               tedarikci_teslim_alan="IT", aciklama="")
+
+
+def test_clamped_exit_does_not_inflate_past_stock(manager):
+    dun = (date.today() - timedelta(days=1)).isoformat()
+    assert manager.get_stock_as_of(dun, {"MAL002"}) == {"MAL002": 100}
+
+    manager.create_movement(_movement(MovementType.CIKIS, 250))  # stok 0'da kırpılır
+    manager.create_movement(_movement(MovementType.GIRIS, 3))
+
+    assert manager.get_stock_as_of(dun, {"MAL002"}) == {"MAL002": 100}
+    assert manager.get_stock_as_of(date.today().isoformat(), {"MAL002"}) == {"MAL002": 3}
+
+
+def test_clamped_exit_survives_checkpoint_rebuild(manager):
+    manager.create_movement(_movement(MovementType.CIKIS, 250))
+    manager.checkpoints.invalidate()
+    dun = (date.today() - timedelta(days=1)).isoformat()
+    assert manager.get_stock_as_of(dun, {"MAL002"}) == {"MAL002": 100}
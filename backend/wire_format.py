@@ -0,0 +1,94 @@
+"""
+Liste yanıtları için kodlama katmanı
+- fields= ile alan seçimi (projeksiyon)
+- satır veya sütunsal (grafik serileri için) JSON düzeni
+- içerik müzakeresi: orjson / MessagePack, eşik üstü gövdelerde brotli / gzip
+orjson, msgpack ve brotli kurulu değilse standart kütüphaneye düşülür.
+"""
+import gzip
+import json
+from typing import Iterable, List, Optional
+from fastapi import HTTPException
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_BYTES = 1024
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+LAYOUTS = ("satir", "kolon")
+
+
+def parse_fields(fields: Optional[str], model) -> Optional[List[str]]:
+    """'kod,ad,mevcut_stok' -> model sırasıyla alan listesi; boşsa tüm alanlar"""
+    if not fields:
+        return None
+    selected = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = selected - set(model.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Bilinmeyen alan(lar): {', '.join(sorted(unknown))}")
+    return [f for f in model.model_fields if f in selected]
+
+
+def project(items: Iterable[BaseModel], fields: Optional[List[str]], duzen: str = "satir"):
+    """Modelleri seçili alanlarla sözlüğe çevir; 'kolon' düzeninde alan -> değer listesi"""
+    if duzen not in LAYOUTS:
+        raise HTTPException(status_code=400, detail="Geçersiz düzen (satir veya kolon)")
+    include = set(fields) if fields else None
+    rows = [item.model_dump(mode="json", include=include) for item in items]
+    if duzen == "satir":
+        return rows
+
+    if fields is None:
+        fields = list(rows[0]) if rows else []
+    return {f: [row[f] for row in rows] for f in fields}
+
+
+def _accepted_tokens(header: str) -> set:
+    tokens = set()
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        if token:
+            tokens.add(token.strip().lower())
+    return tokens
+
+
+def encode(request, data) -> Response:
+    """İstemcinin Accept / Accept-Encoding başlıklarına göre yanıtı kodla"""
+    accept = _accepted_tokens(request.headers.get("accept", ""))
+    if msgpack is not None and accept.intersection(MSGPACK_MEDIA_TYPES):
+        body = msgpack.packb(data, use_bin_type=True)
+        media_type = "application/msgpack"
+    elif orjson is not None:
+        body = orjson.dumps(data)
+        media_type = "application/json"
+    else:
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        media_type = "application/json"
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if len(body) >= COMPRESS_MIN_BYTES:
+        encodings = _accepted_tokens(request.headers.get("accept-encoding", ""))
+        if brotli is not None and "br" in encodings:
+            body = brotli.compress(body, quality=5)
+            headers["Content-Encoding"] = "br"
+        elif "gzip" in encodings:
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,121 @@
+"""
+Tek yazıcı kuyruğu
+Tüm değişiklik komutları tek bir thread'de, geliş sırasıyla uygulanır. Kuyrukta
+biriken komutlar aynı çalışma kitabı üzerinde çalıştırılır ve tek kayıtla diske
+yazılır; eşzamanlı yükle/değiştir/kaydet döngülerindeki kayıp güncellemeler ortadan kalkar.
+Komutlar gönderen isteğin bağlamında çalışır; yükleme/tarama maliyeti ve batch kaydı o isteğe yazılır.
+"""
+import contextvars
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable
+
+from excel_manager import ExcelManager
+from metrics import charge_save
+
+MAX_BATCH = 64
+
+_STOP = object()
+
+
+class WriteQueue:
+    def __init__(self, manager: ExcelManager, max_batch: int = MAX_BATCH):
+        self.manager = manager
+        self.max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = None
+        self._inline_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self):
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="excel-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Kuyruktaki komutları bitir ve thread'i durdur"""
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Komutu kuyruğa ekle; sonuç batch diske yazıldıktan sonra Future'a düşer"""
+        future = Future()
+        item = (contextvars.copy_context(), fn, args, kwargs, future)
+        if not self.running:
+            # Yazıcı başlatılmadıysa (script/test kullanımı) komutu sırayla yerinde çalıştır
+            with self._inline_lock:
+                self._apply([item])
+            return future
+        self._queue.put(item)
+        return future
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """Komutu kuyruğa ekle ve sonucunu bekle (sync endpoint'ler için)"""
+        if self._thread is not None and threading.current_thread() is self._thread:
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._apply(batch)
+
+    def _apply(self, batch):
+        """Komutları tek kitapta uygula ve tek kayıtla yaz
+
+        Bir komut hata verirse batch geri alınır, hata o komuta iletilir ve
+        kalan komutlar (aynı sırayla) yeniden tek batch olarak uygulanır.
+        """
+        manager = self.manager
+        while batch:
+            results = []
+            manager.begin_batch()
+            try:
+                for ctx, fn, args, kwargs, _ in batch:
+                    results.append(ctx.run(fn, *args, **kwargs))
+            except Exception as e:
+                manager.rollback_batch()
+                failed = len(results)
+                batch[failed][4].set_exception(e)
+                batch = batch[:failed] + batch[failed + 1:]
+                continue
+
+            try:
+                # Kayıt hiçbir isteğin bağlamında yapılmaz; maliyeti aşağıda her isteğe yazılır
+                saved = contextvars.Context().run(manager.commit_batch)
+            except Exception as e:
+                manager.rollback_batch()
+                for *_, future in batch:
+                    future.set_exception(e)
+                return
+
+            nbytes, seconds = manager.stats.last_save
+            for (ctx, *_, future), result in zip(batch, results):
+                if saved:
+                    ctx.run(charge_save, nbytes, seconds)
+                future.set_result(result)
+            return
@@ -347,16 +347,14 @@ const QRScanToAddModal = ({ open, onClose, onSuccess, toast }) => {
 const chartOptions = { responsive: true, maintainAspectRatio: false, plugins: { legend: { display: true, labels: { color: '#9ca3af' } } }, scales: { x: { grid: { color: 'rgba(255,255,255,0.1)' }, ticks: { color: '#9ca3af' } }, y: { grid: { color: 'rgba(255,255,255,0.1)' }, ticks: { color: '#9ca3af' } } } }
 
 // Excel Export Helper
-const exportExcel = async (type, toast) => {
-    const data = await api.get(`/export/${type}`)
-    if (data) {
-        const ws = XLSX.utils.aoa_to_sheet([data.headers, ...data.data])
-        const wb = XLSX.utils.book_new()
-        XLSX.utils.book_append_sheet(wb, ws, 'Veri')
-        const buf = XLSX.write(wb, { bookType: 'xlsx', type: 'array' })
-        saveAs(new Blob([buf], { type: 'application/octet-stream' }), data.filename)
+const exportExcel = async (type, toast, bicim = 'xlsx') => {
+    try {
+        const r = await fetch(`${API}/export/${type}?bicim=${bicim}`)
+        if (!r.ok) { toast(`Dışa aktarma başarısız (${r.status})`, 'error'); return }
+        const match = /filename="([^"]+)"/.exec(r.headers.get('Content-Disposition') || '')
+        saveAs(await r.blob(), match ? match[1] : `${type}.${bicim}`)
         toast('Excel indirildi', 'success')
-    }
+    } catch { toast('Bağlantı hatası', 'error') }
 }
 
 // Print Label Function